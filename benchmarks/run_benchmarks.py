@@ -0,0 +1,419 @@
+"""Benchmark the indexer against a synthetic vault and report the results as JSON.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --notes 5000 --output results.json
+
+Everything happens in a temporary directory that is removed afterwards.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+from watchdog.events import FileModifiedEvent
+
+from obsidian_index_service.db.database import Database
+from obsidian_index_service.db.migrations import MIGRATIONS
+from obsidian_index_service.db.operations import DEFAULT_BATCH_SIZE
+from obsidian_index_service.db.reader import METADATA_COLUMNS
+from obsidian_index_service.db.writer import DatabaseWriter
+from obsidian_index_service.file_watcher.handlers import VaultEventHandler
+from obsidian_index_service.file_watcher.scanner import VaultScanner
+from obsidian_index_service.note_processor.processor import NoteProcessor
+
+from .vault_generator import FRONTMATTER_STYLES, WORDS, generate_vault
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the JSON report changes
+REPORT_VERSION = 2
+
+# How often the event benchmark checks whether the writer has committed
+COMMIT_POLL_SECONDS = 0.0002
+
+# How long the event benchmark waits for a commit before counting the event as lost
+EVENT_TIMEOUT_SECONDS = 10.0
+
+# Queries consumers run directly against the notes table, timed with and
+# without the secondary indexes added by the schema migrations
+CONSUMER_QUERIES = {
+    "folder_listing": "SELECT path, title FROM notes WHERE parent_folder = ? ORDER BY path",
+    "recently_modified": (
+        "SELECT path, title, modified_date FROM notes ORDER BY modified_date DESC LIMIT 20"
+    ),
+    "error_listing": "SELECT path, error_message FROM notes WHERE status = 'error' ORDER BY path",
+    "title_lookup": "SELECT path FROM notes WHERE title = ?",
+}
+
+
+def run_benchmarks(
+    work_dir,
+    notes=1000,
+    seed=0,
+    median_size=2000,
+    frontmatter="mixed",
+    link_density=3.0,
+    folder_depth=2,
+    workers=1,
+    batch_size=DEFAULT_BATCH_SIZE,
+    compress_content=False,
+    rescan_fraction=0.01,
+    events=200,
+    query_repeats=50,
+):
+    """Generate a vault in work_dir and time scanning, events and reads on it.
+
+    Args:
+        work_dir (str or Path): Empty directory for the vault and database
+        notes (int): Number of notes to generate
+        seed (int): Seed for the vault and for every random choice made while benchmarking
+        median_size (int): Median note size in bytes
+        frontmatter (str): Frontmatter style, one of FRONTMATTER_STYLES
+        link_density (float): Average links per note
+        folder_depth (int): Depth of the folder tree
+        workers (int): Scanner worker processes
+        batch_size (int): Notes written per transaction during scans
+        compress_content (bool): Store note content compressed
+        rescan_fraction (float): Fraction of notes modified before the incremental rescan
+        events (int): Number of modify events timed through VaultEventHandler
+        query_repeats (int): Repetitions of each timed read query
+
+    Returns:
+        dict: The benchmark report
+    """
+    work_dir = Path(work_dir)
+    vault_path = work_dir / "vault"
+    db_path = str(work_dir / "index.db")
+    rng = random.Random(seed)
+
+    started = time.perf_counter()
+    vault = generate_vault(
+        vault_path,
+        notes=notes,
+        seed=seed,
+        median_size=median_size,
+        frontmatter=frontmatter,
+        link_density=link_density,
+        folder_depth=folder_depth,
+    )
+    vault["generate_seconds"] = time.perf_counter() - started
+
+    processor = NoteProcessor(str(vault_path))
+    paths = sorted(str(path) for path, _ in processor.iter_markdown_files())
+
+    results = {}
+    with Database(db_path, compress_content) as database:
+        scanner = VaultScanner(processor, database, batch_size=batch_size, workers=workers)
+        results["full_scan"] = _time_scan(scanner, vault["bytes"])
+        results["noop_rescan"] = _time_scan(scanner)
+
+        touched = rng.sample(paths, max(1, int(len(paths) * rescan_fraction)))
+        for path in touched:
+            _append_line(path, "Edited for the incremental rescan.")
+        results["incremental_rescan"] = _time_scan(scanner)
+
+        results["event_latency"] = _time_events(processor, database, rng.choices(paths, k=events))
+        note_paths = [str(Path(path).relative_to(vault_path)) for path in paths]
+        results["queries"] = _time_queries(database, note_paths, rng, query_repeats)
+
+    results["query_plans"] = _time_query_plans(db_path, rng, query_repeats)
+
+    return {
+        "report_version": REPORT_VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": _environment(),
+        "parameters": {
+            "notes": notes,
+            "seed": seed,
+            "median_size": median_size,
+            "frontmatter": frontmatter,
+            "link_density": link_density,
+            "folder_depth": folder_depth,
+            "workers": workers,
+            "batch_size": batch_size,
+            "compress_content": compress_content,
+            "rescan_fraction": rescan_fraction,
+            "events": events,
+            "query_repeats": query_repeats,
+        },
+        "vault": vault,
+        "results": results,
+    }
+
+
+def _time_scan(scanner, total_bytes=None):
+    """Run one scan and report its duration and counters."""
+    started = time.perf_counter()
+    processed, total, errors, skipped, parsed = scanner.scan_existing_files()
+    seconds = time.perf_counter() - started
+    result = {
+        "seconds": seconds,
+        "files": total,
+        "parsed": parsed,
+        "written": processed,
+        "skipped": skipped,
+        "errors": errors,
+        "files_per_second": total / seconds if seconds else None,
+    }
+    if total_bytes is not None:
+        result["megabytes_per_second"] = total_bytes / 1e6 / seconds if seconds else None
+    return result
+
+
+def _time_events(processor, database, paths):
+    """Time each modify event from the handler call until the writer commits it.
+
+    Debouncing is off, so the figures cover parsing, queueing and the
+    commit; a configured debounce window adds its quiet period on top.
+    """
+    writer = DatabaseWriter(database)
+    writer.start()
+    handler = VaultEventHandler(processor, database, writer=writer)
+    latencies = []
+    lost = 0
+    try:
+        for number, path in enumerate(paths):
+            _append_line(path, f"Edited by event {number}.")
+            committed = writer.stats()["committed_changes"]
+            started = time.perf_counter()
+            handler.on_modified(FileModifiedEvent(path))
+            while writer.stats()["committed_changes"] <= committed:
+                if time.perf_counter() - started > EVENT_TIMEOUT_SECONDS:
+                    lost += 1
+                    break
+                time.sleep(COMMIT_POLL_SECONDS)
+            else:
+                latencies.append(time.perf_counter() - started)
+    finally:
+        writer.stop()
+    return dict(_summarize(latencies), lost=lost)
+
+
+def _time_queries(database, paths, rng, repeats):
+    """Time the read queries other services run against the index.
+
+    Each entry also reports the mean number of rows returned, so a query
+    that suddenly returns nothing doesn't pass for a fast one.
+    """
+    tag_counts = database.get_tag_counts()
+    common_tag = max(tag_counts, key=tag_counts.get) if tag_counts else "project/alpha"
+    samples = rng.choices(paths, k=repeats)
+    words = rng.choices(WORDS, k=repeats)
+
+    def timed(query, arguments):
+        latencies = []
+        rows = 0
+        for argument in arguments:
+            started = time.perf_counter()
+            result = query(argument)
+            latencies.append(time.perf_counter() - started)
+            rows += result if isinstance(result, int) else len(result or ())
+        return dict(_summarize(latencies), mean_rows=rows / len(latencies))
+
+    return {
+        "search": timed(database.search, words),
+        "notes_by_tag": timed(database.get_notes_by_tag, [common_tag] * repeats),
+        "notes_by_tag_prefix": timed(database.get_notes_by_tag_prefix, ["project"] * repeats),
+        "backlinks": timed(database.get_backlinks, samples),
+        "outlinks": timed(database.get_outlinks, samples),
+        "note_content": timed(lambda path: [database.get_note_content(path)], samples),
+        "iter_notes_metadata": timed(
+            lambda columns: sum(1 for _ in database.iter_notes(columns)), [METADATA_COLUMNS]
+        ),
+        "iter_notes_full": timed(lambda columns: sum(1 for _ in database.iter_notes(columns)), [None]),
+        "similar_notes": timed(database.similar_notes, samples),
+        "similar_to_text": timed(
+            database.similar_to_text, [" ".join(rng.choices(WORDS, k=12)) for _ in range(repeats)]
+        ),
+    }
+
+
+def _time_query_plans(db_path, rng, repeats):
+    """Compare consumer queries on a pre-migration copy of the index and after upgrading it.
+
+    The copy has the migrated indexes dropped and its user_version reset,
+    so opening it with Database runs the migrations in place, as it would
+    for an index written by an older release.
+    """
+    legacy_path = f"{db_path}.legacy"
+    shutil.copyfile(db_path, legacy_path)
+    conn = sqlite3.connect(legacy_path, isolation_level=None)
+    try:
+        for index in _migrated_indexes():
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        conn.execute("PRAGMA user_version = 0")
+        folder = conn.execute(
+            "SELECT parent_folder FROM notes GROUP BY parent_folder ORDER BY COUNT(*) DESC LIMIT 1"
+        ).fetchone()[0]
+        titles = [row[0] for row in conn.execute("SELECT title FROM notes")]
+        arguments = {
+            "folder_listing": [(folder,)] * repeats,
+            "recently_modified": [()] * repeats,
+            "error_listing": [()] * repeats,
+            "title_lookup": [(title,) for title in rng.choices(titles, k=repeats)],
+        }
+        before = _time_consumer_queries(conn, arguments)
+    finally:
+        conn.close()
+
+    started = time.perf_counter()
+    with Database(legacy_path) as database:
+        migration_seconds = time.perf_counter() - started
+        schema_version = database.connection.schema_version
+        after = _time_consumer_queries(database.connection.conn, arguments)
+
+    return {
+        "schema_version": schema_version,
+        "migration_seconds": migration_seconds,
+        "queries": {
+            name: {"before": before[name], "after": after[name]} for name in CONSUMER_QUERIES
+        },
+    }
+
+
+def _migrated_indexes():
+    """Names of the indexes created by the schema migrations."""
+    return [
+        match.group(1)
+        for _, _, steps in MIGRATIONS
+        for step in steps
+        if isinstance(step, str)
+        for match in [re.search(r"CREATE INDEX IF NOT EXISTS (\w+)", step)]
+        if match
+    ]
+
+
+def _time_consumer_queries(conn, arguments):
+    """Report the query plan and latencies of each consumer query."""
+    timings = {}
+    for name, query in CONSUMER_QUERIES.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", arguments[name][0])]
+        latencies = []
+        rows = 0
+        for params in arguments[name]:
+            started = time.perf_counter()
+            rows += len(conn.execute(query, params).fetchall())
+            latencies.append(time.perf_counter() - started)
+        timings[name] = dict(_summarize(latencies), plan=plan, mean_rows=rows / len(latencies))
+    return timings
+
+
+def _summarize(latencies):
+    """Reduce a list of durations in seconds to summary statistics in milliseconds."""
+    if not latencies:
+        return {"count": 0}
+    ordered = sorted(latencies)
+    percentile = lambda fraction: ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50) * 1000,
+        "p95_ms": percentile(0.95) * 1000,
+        "p99_ms": percentile(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def _append_line(path, line):
+    """Append a line to a note so its content hash changes."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"\n{line}\n")
+
+
+def _environment():
+    """Describe the build and machine the report was produced on."""
+    try:
+        version = metadata.version("obsidian-index-service")
+    except metadata.PackageNotFoundError:
+        version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "package_version": version,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+    }
+
+
+def parse_args():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the Obsidian Index Service")
+    parser.add_argument("--notes", type=int, default=1000, help="Number of notes to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--median-size", type=int, default=2000, help="Median note size in bytes")
+    parser.add_argument("--frontmatter", choices=FRONTMATTER_STYLES, default="mixed")
+    parser.add_argument("--link-density", type=float, default=3.0, help="Average links per note")
+    parser.add_argument("--folder-depth", type=int, default=2, help="Depth of the folder tree")
+    parser.add_argument("--workers", type=int, default=1, help="Scanner worker processes")
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Notes written per transaction"
+    )
+    parser.add_argument("--compress-content", action="store_true", help="Store content compressed")
+    parser.add_argument(
+        "--rescan-fraction",
+        type=float,
+        default=0.01,
+        help="Fraction of notes modified before the incremental rescan",
+    )
+    parser.add_argument("--events", type=int, default=200, help="Modify events to time")
+    parser.add_argument("--query-repeats", type=int, default=50, help="Repetitions per read query")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+
+def main():
+    """Run the benchmarks and emit the JSON report."""
+    args = parse_args()
+    # Per-note log lines would dominate the timings
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory(prefix="obsidian-index-bench-") as work_dir:
+        report = run_benchmarks(
+            work_dir,
+            notes=args.notes,
+            seed=args.seed,
+            median_size=args.median_size,
+            frontmatter=args.frontmatter,
+            link_density=args.link_density,
+            folder_depth=args.folder_depth,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            compress_content=args.compress_content,
+            rescan_fraction=args.rescan_fraction,
+            events=args.events,
+            query_repeats=args.query_repeats,
+        )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Deterministic synthetic Obsidian vault generator for benchmarks."""
+
+import argparse
+import json
+import logging
+import random
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Frontmatter styles; "mixed" draws from the other three
+FRONTMATTER_STYLES = ("none", "simple", "complex", "mixed")
+MIXED_WEIGHTS = {"none": 0.4, "simple": 0.4, "complex": 0.2}
+
+WORDS = (
+    "index vault note sqlite query latency write ahead log page cache batch "
+    "commit link graph tag folder scan event watcher parser header content "
+    "token vector search rank snippet schema migration backlog release metric "
+    "project meeting idea draft review archive daily weekly reading journal "
+    "alpha beta gamma delta python library service monitor storage network"
+).split()
+
+TAGS = (
+    "project/alpha", "project/beta", "project/gamma", "area/work", "area/home",
+    "reading", "meeting", "idea", "daily", "review",
+)
+
+
+def generate_vault(
+    vault_path,
+    notes=1000,
+    seed=0,
+    median_size=2000,
+    size_spread=0.8,
+    frontmatter="mixed",
+    link_density=3.0,
+    folder_depth=2,
+    folders_per_level=4,
+):
+    """Write a synthetic vault whose content depends only on the arguments.
+
+    Args:
+        vault_path (str or Path): Directory to create the notes in
+        notes (int): Number of notes
+        seed (int): Random seed; the same arguments always produce the same vault
+        median_size (int): Median body size in bytes; sizes are log-normal
+        size_spread (float): Sigma of the log-normal size distribution
+        frontmatter (str): One of FRONTMATTER_STYLES
+        link_density (float): Average number of links per note
+        folder_depth (int): Depth of the folder tree; 0 puts every note at the root
+        folders_per_level (int): Subfolders per folder
+
+    Returns:
+        dict: Counts of the generated notes, folders, links and bytes
+    """
+    if frontmatter not in FRONTMATTER_STYLES:
+        raise ValueError(f"Unknown frontmatter style: {frontmatter}")
+
+    rng = random.Random(seed)
+    vault_path = Path(vault_path)
+    folders = _folder_tree(folder_depth, folders_per_level)
+    names = [f"note-{i:05d}" for i in range(notes)]
+
+    total_bytes = 0
+    total_links = 0
+    for name in names:
+        folder = rng.choice(folders)
+        note_dir = vault_path / folder if folder else vault_path
+        note_dir.mkdir(parents=True, exist_ok=True)
+
+        style = frontmatter
+        if style == "mixed":
+            style = rng.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+        size = max(64, int(rng.lognormvariate(0, size_spread) * median_size))
+        link_count = _poisson(rng, link_density)
+
+        text = _frontmatter(rng, name, style) + _body(rng, name, size, link_count, names)
+        data = text.encode("utf-8")
+        (note_dir / f"{name}.md").write_bytes(data)
+        total_bytes += len(data)
+        total_links += link_count
+
+    return {
+        "notes": notes,
+        "folders": len(folders),
+        "links": total_links,
+        "bytes": total_bytes,
+    }
+
+
+def _folder_tree(depth, per_level):
+    """List every folder of a balanced tree, including the vault root ('')."""
+    folders = [""]
+    level = [""]
+    for d in range(depth):
+        level = [
+            f"{parent}/level{d}-{i}" if parent else f"level{d}-{i}"
+            for parent in level for i in range(per_level)
+        ]
+        folders.extend(level)
+    return folders
+
+
+def _poisson(rng, mean):
+    """Draw from a Poisson distribution (Knuth's method, fine for small means)."""
+    if mean <= 0:
+        return 0
+    limit = pow(2.718281828459045, -mean)
+    count, product = 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def _frontmatter(rng, name, style):
+    """Build a frontmatter header in the given style."""
+    if style == "none":
+        return ""
+    tags = rng.sample(TAGS, rng.randint(1, 3))
+    if style == "simple":
+        return f"---\ntitle: {name}\ntags: [{', '.join(tags)}]\n---\n\n"
+    tag_lines = "".join(f"  - {tag}\n" for tag in tags)
+    return (
+        "---\n"
+        f"title: \"{name}: {rng.choice(WORDS)} notes\"\n"
+        f"created: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 09:30:00\n"
+        f"tags:\n{tag_lines}"
+        f"aliases: [\"{name.upper()}\", '{rng.choice(WORDS)}']\n"
+        "meta:\n"
+        f"  priority: {rng.randint(1, 5)}\n"
+        f"  owner: {{name: {rng.choice(WORDS)}, team: {rng.choice(WORDS)}}}\n"
+        "summary: >\n"
+        f"  {' '.join(rng.choices(WORDS, k=12))}\n"
+        "---\n\n"
+    )
+
+
+def _body(rng, name, size, link_count, names):
+    """Build a markdown body of roughly size bytes containing link_count links."""
+    links = []
+    for _ in range(link_count):
+        target = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.6:
+            links.append(f"[[{target}]]")
+        elif kind < 0.75:
+            links.append(f"[[{target}|{rng.choice(WORDS)}]]")
+        elif kind < 0.85:
+            links.append(f"![[{rng.choice(WORDS)}.png]]")
+        else:
+            links.append(f"[{rng.choice(WORDS)}]({target}.md)")
+
+    parts = [f"# {name}\n\n"]
+    length = len(parts[0])
+    while length < size or links:
+        sentence = " ".join(rng.choices(WORDS, k=rng.randint(6, 16))).capitalize()
+        if links and rng.random() < 0.5:
+            sentence += f" {links.pop()}"
+        sentence += ".\n\n" if rng.random() < 0.2 else ". "
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts).rstrip() + "\n"
+
+
+def main():
+    """Generate a vault from the command line and print its summary as JSON."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic Obsidian vault")
+    parser.add_argument("vault_path", help="Directory to write the vault to")
+    parser.add_argument("--notes", type=int, default=1000, help="Number of notes")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--median-size", type=int, default=2000, help="Median note size in bytes")
+    parser.add_argument("--size-spread", type=float, default=0.8, help="Sigma of the log-normal sizes")
+    parser.add_argument("--frontmatter", choices=FRONTMATTER_STYLES, default="mixed")
+    parser.add_argument("--link-density", type=float, default=3.0, help="Average links per note")
+    parser.add_argument("--folder-depth", type=int, default=2, help="Depth of the folder tree")
+    parser.add_argument("--folders-per-level", type=int, default=4, help="Subfolders per folder")
+    args = parser.parse_args()
+
+    summary = generate_vault(
+        args.vault_path,
+        notes=args.notes,
+        seed=args.seed,
+        median_size=args.median_size,
+        size_spread=args.size_spread,
+        frontmatter=args.frontmatter,
+        link_density=args.link_density,
+        folder_depth=args.folder_depth,
+        folders_per_level=args.folders_per_level,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
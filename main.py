@@ -10,7 +10,11 @@ from dotenv import load_dotenv
 
 from obsidian_index_service.config import Config
 from obsidian_index_service.db.database import Database
+from obsidian_index_service.db.operations import DEFAULT_DUPLICATE_THRESHOLD
+from obsidian_index_service.metrics import MetricsServer, StatsFileWriter, metrics
+from obsidian_index_service.note_processor.logging_config import NOTE_LOG_MODES, set_note_log_mode
 from obsidian_index_service.note_processor.processor import NoteProcessor
+from obsidian_index_service.file_watcher.poller import WATCH_MODES
 from obsidian_index_service.file_watcher.watcher import FileWatcher
 
 # Configure logging
@@ -30,20 +34,161 @@ def parse_args():
         action="store_true",
         help="Only scan existing files without watching for changes",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Number of notes written per database transaction during scans",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of worker processes parsing notes during scans",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        help="Seconds without new events before a changed note is re-indexed "
+        "(0 re-indexes on every event)",
+    )
+    parser.add_argument(
+        "--writer-queue-size",
+        type=int,
+        help="Changes queued for the database writer thread before parsing blocks",
+    )
+    parser.add_argument(
+        "--rebuild-search-index",
+        action="store_true",
+        default=None,
+        help="Rebuild the full-text search index once after scanning instead of per note",
+    )
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        metavar="PATTERN",
+        help="Gitignore-style pattern for paths to leave out of the index (repeatable)",
+    )
+    parser.add_argument(
+        "--compress-content",
+        action="store_true",
+        default=None,
+        help="Store note content zlib-compressed in a separate table (migrates existing content)",
+    )
+    parser.add_argument(
+        "--compression-level",
+        type=int,
+        help="zlib compression level for stored content, 0-9",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on this local port",
+    )
+    parser.add_argument(
+        "--stats-file",
+        help="Periodically write metrics in the Prometheus text format to this file",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        help="Seconds between writes of the stats file",
+    )
+    parser.add_argument(
+        "--note-log",
+        choices=NOTE_LOG_MODES,
+        help="Log each note at info, at debug, or sampled (one in --note-log-sample at info)",
+    )
+    parser.add_argument(
+        "--note-log-sample",
+        type=int,
+        help="Log one in this many notes at info when --note-log is sampled",
+    )
+    parser.add_argument(
+        "--change-retention-days",
+        type=float,
+        help="Days of change feed kept for downstream consumers, 0 to keep everything",
+    )
+    parser.add_argument(
+        "--watch-mode",
+        choices=WATCH_MODES,
+        help="Detect changes with inotify events, by polling, or auto (poll on network and host-shared mounts)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Seconds between polls of the vault in polling mode",
+    )
+    parser.add_argument(
+        "--poll-stat-budget",
+        type=int,
+        help="Notes stat'ed per poll to catch in-place edits",
+    )
+    parser.add_argument(
+        "--vector-dim",
+        type=int,
+        help="Hash buckets of the note vectors used by similarity search, 0 to disable",
+    )
+    parser.add_argument(
+        "--find-duplicates",
+        nargs="?",
+        const=DEFAULT_DUPLICATE_THRESHOLD,
+        type=float,
+        metavar="THRESHOLD",
+        help="List clusters of near-duplicate notes above this estimated Jaccard similarity "
+        f"(default {DEFAULT_DUPLICATE_THRESHOLD}) and exit; with --scan-only, scan first",
+    )
     return parser.parse_args()
 
 
-def setup_signal_handlers(file_watcher, db):
+def start_metrics_exporters(config):
+    """Start the metrics endpoint and stats file writer that are configured.
+
+    Args:
+        config (Config): Service configuration
+
+    Returns:
+        list: Started exporters, each with a stop() method
+    """
+    exporters = []
+    if config.metrics_port is not None:
+        exporters.append(MetricsServer(metrics, config.metrics_port))
+    if config.stats_file:
+        exporters.append(StatsFileWriter(metrics, config.stats_file, config.stats_interval))
+    for exporter in exporters:
+        exporter.start()
+    return exporters
+
+
+def print_duplicate_clusters(db, threshold):
+    """Print the clusters of near-duplicate notes in the index.
+
+    Args:
+        db (Database): Database to read the signatures from
+        threshold (float): Minimum estimated Jaccard similarity
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"Duplicate threshold must be above 0 and at most 1: {threshold}")
+    clusters = db.find_duplicates(threshold)
+    for cluster in clusters:
+        print(f"{len(cluster['paths'])} notes, similarity >= {cluster['similarity']:.2f}")
+        for path in cluster["paths"]:
+            print(f"  {path}")
+    logger.info(f"Found {len(clusters)} clusters of near-duplicate notes")
+
+
+def setup_signal_handlers(file_watcher, db, exporters=()):
     """Set up signal handlers for graceful shutdown.
 
     Args:
         file_watcher: The file watcher to stop
         db: The database connection to close
+        exporters (list): Metrics exporters to stop
     """
 
     def signal_handler(sig, frame):
         logger.info("Received shutdown signal, stopping services...")
         file_watcher.stop_watching()
+        for exporter in exporters:
+            exporter.stop()
         db.close()
         logger.info("Shutdown complete, exiting")
         sys.exit(0)
@@ -65,35 +210,82 @@ def main():
         config = Config(
             vault_path=args.vault_path or os.getenv("OBSIDIAN_VAULT_PATH"),
             db_path=args.db_path or os.getenv("DB_PATH"),
+            batch_size=args.batch_size,
+            workers=args.workers,
+            debounce_seconds=args.debounce,
+            writer_queue_size=args.writer_queue_size,
+            rebuild_search_index=args.rebuild_search_index,
+            ignore_patterns=args.ignore,
+            compress_content=args.compress_content,
+            compression_level=args.compression_level,
+            metrics_port=args.metrics_port,
+            stats_file=args.stats_file,
+            stats_interval=args.stats_interval,
+            note_log=args.note_log,
+            note_log_sample=args.note_log_sample,
+            change_retention_days=args.change_retention_days,
+            watch_mode=args.watch_mode,
+            poll_interval=args.poll_interval,
+            poll_stat_budget=args.poll_stat_budget,
+            vector_dim=args.vector_dim,
         )
+        set_note_log_mode(config.note_log, config.note_log_sample)
+        exporters = start_metrics_exporters(config)
 
         # Initialize database
-        db = Database(config.db_path)
+        db = Database(
+            config.db_path,
+            config.compress_content,
+            config.compression_level,
+            config.change_retention_days,
+            config.vector_dim,
+        )
         logger.info(f"Database initialized at: {config.db_path}")
 
         # Initialize note processor
-        note_processor = NoteProcessor(config.vault_path)
+        note_processor = NoteProcessor(config.vault_path, config.ignore_patterns)
         logger.info(f"Note processor initialized for vault: {config.vault_path}")
 
         # Initialize file watcher
-        file_watcher = FileWatcher(note_processor, db)
+        file_watcher = FileWatcher(
+            note_processor,
+            db,
+            batch_size=config.batch_size,
+            workers=config.workers,
+            debounce_seconds=config.debounce_seconds,
+            writer_queue_size=config.writer_queue_size,
+            rebuild_search_index=config.rebuild_search_index,
+            watch_mode=config.watch_mode,
+            poll_interval=config.poll_interval,
+            poll_stat_budget=config.poll_stat_budget,
+        )
 
         # Set up signal handlers for graceful shutdown
-        setup_signal_handlers(file_watcher, db)
+        setup_signal_handlers(file_watcher, db, exporters)
 
-        # Perform initial scan of existing files
-        logger.info("Starting initial scan of existing files...")
-        file_watcher.scan_existing_files()
+        # List near-duplicates and exit, scanning first with --scan-only
+        if args.find_duplicates is not None:
+            if args.scan_only:
+                file_watcher.scan_existing_files()
+            print_duplicate_clusters(db, args.find_duplicates)
+            for exporter in exporters:
+                exporter.stop()
+            db.close()
+            return
 
-        # If scan-only mode, exit after scanning
+        # If scan-only mode, scan in the foreground and exit
         if args.scan_only:
-            logger.info("Scan-only mode enabled, exiting after initial scan")
+            logger.info("Scan-only mode enabled, scanning existing files...")
+            file_watcher.scan_existing_files()
+            for exporter in exporters:
+                exporter.stop()
             db.close()
             return
 
-        # Start monitoring for changes
-        logger.info("Starting file monitoring service...")
-        file_watcher.start_watching()  # This will block until interrupted
+        # Watch first, so no edit made during the initial scan is missed, and
+        # scan in the background behind live events
+        logger.info("Starting file monitoring service with a background initial scan...")
+        file_watcher.start_watching(initial_scan=True)  # This will block until interrupted
 
     except KeyboardInterrupt:
         logger.info("Application interrupted by user")
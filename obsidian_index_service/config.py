@@ -2,6 +2,20 @@ import os
 import logging
 from pathlib import Path
 
+from obsidian_index_service.db.operations import DEFAULT_CHANGE_RETENTION_DAYS
+from obsidian_index_service.db.vectors import DEFAULT_VECTOR_DIM
+from obsidian_index_service.file_watcher.poller import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_STAT_BUDGET,
+    WATCH_MODES,
+)
+from obsidian_index_service.metrics import DEFAULT_STATS_INTERVAL
+from obsidian_index_service.note_processor.ignore import DEFAULT_IGNORE_PATTERNS
+from obsidian_index_service.note_processor.logging_config import (
+    DEFAULT_NOTE_LOG_SAMPLE,
+    NOTE_LOG_MODES,
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -10,12 +24,52 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class Config:
-    def __init__(self, vault_path=None, db_path=None):
+    def __init__(
+        self,
+        vault_path=None,
+        db_path=None,
+        batch_size=None,
+        workers=None,
+        debounce_seconds=None,
+        writer_queue_size=None,
+        rebuild_search_index=None,
+        ignore_patterns=None,
+        compress_content=None,
+        compression_level=None,
+        metrics_port=None,
+        stats_file=None,
+        stats_interval=None,
+        note_log=None,
+        note_log_sample=None,
+        change_retention_days=None,
+        watch_mode=None,
+        poll_interval=None,
+        poll_stat_budget=None,
+        vector_dim=None,
+    ):
         """Initialize configuration with paths.
         
         Args:
             vault_path (str, optional): Path to the Obsidian vault. Defaults to environment variable.
             db_path (str, optional): Path to the SQLite database. Defaults to environment variable.
+            batch_size (int, optional): Notes written per transaction during scans. Defaults to environment variable.
+            workers (int, optional): Processes used to parse notes during scans. Defaults to environment variable.
+            debounce_seconds (float, optional): Quiet window for coalescing file events. Defaults to environment variable.
+            writer_queue_size (int, optional): Changes queued for the writer thread before parsing blocks. Defaults to environment variable.
+            rebuild_search_index (bool, optional): Rebuild the full-text index after scans instead of per note. Defaults to environment variable.
+            ignore_patterns (list, optional): Gitignore-style patterns added to the default ignores. Defaults to environment variable.
+            compress_content (bool, optional): Store note content zlib-compressed in a separate table. Defaults to environment variable.
+            compression_level (int, optional): zlib level used for compressed content. Defaults to environment variable.
+            metrics_port (int, optional): Local port serving Prometheus metrics. Defaults to environment variable.
+            stats_file (str, optional): File the metrics are periodically written to. Defaults to environment variable.
+            stats_interval (float, optional): Seconds between stats file writes. Defaults to environment variable.
+            note_log (str, optional): Per-note logging mode: info, debug or sampled. Defaults to environment variable.
+            note_log_sample (int, optional): Log one in this many notes in sampled mode. Defaults to environment variable.
+            change_retention_days (float, optional): Days of change feed kept, 0 for all. Defaults to environment variable.
+            watch_mode (str, optional): How changes are detected: auto, events or polling. Defaults to environment variable.
+            poll_interval (float, optional): Seconds between polls in polling mode. Defaults to environment variable.
+            poll_stat_budget (int, optional): Notes stat'ed per poll to catch in-place edits. Defaults to environment variable.
+            vector_dim (int, optional): Hash buckets of the note vectors used by similarity search, 0 to disable. Defaults to environment variable.
         """
         # Set default vault path from environment variable or use provided one
         self.vault_path = vault_path or os.environ.get("OBSIDIAN_VAULT_PATH")
@@ -41,6 +95,139 @@ class Config:
         self.db_path = os.path.abspath(self.db_path)
         logger.info(f"Database path set to: {self.db_path}")
         
+        # Number of notes written per transaction during bulk scans
+        self.batch_size = int(batch_size or os.environ.get("SCAN_BATCH_SIZE", 500))
+        if self.batch_size < 1:
+            error_msg = f"Batch size must be at least 1: {self.batch_size}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Number of processes parsing notes during scans; 1 parses in-process
+        if workers is None:
+            workers = os.environ.get("SCAN_WORKERS", 1)
+        self.workers = int(workers)
+        if self.workers < 1:
+            error_msg = f"Worker count must be at least 1: {self.workers}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Quiet window for coalescing bursts of file events per path; 0 dispatches each event at once
+        if debounce_seconds is None:
+            debounce_seconds = os.environ.get("EVENT_DEBOUNCE_SECONDS", 0.5)
+        self.debounce_seconds = float(debounce_seconds)
+        if self.debounce_seconds < 0:
+            error_msg = f"Debounce window cannot be negative: {self.debounce_seconds}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Changes queued for the database writer thread before producers block
+        self.writer_queue_size = int(writer_queue_size or os.environ.get("WRITER_QUEUE_SIZE", 1000))
+        if self.writer_queue_size < 1:
+            error_msg = f"Writer queue size must be at least 1: {self.writer_queue_size}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Rebuild the full-text index once after a scan instead of updating it per note
+        if rebuild_search_index is None:
+            rebuild_search_index = os.environ.get("REBUILD_SEARCH_INDEX", "").lower() in ("1", "true", "yes")
+        self.rebuild_search_index = rebuild_search_index
+        
+        # Paths never indexed: the defaults plus comma-separated gitignore-style patterns
+        if ignore_patterns is None:
+            ignore_patterns = [p for p in os.environ.get("IGNORE_PATTERNS", "").split(",") if p.strip()]
+        self.ignore_patterns = DEFAULT_IGNORE_PATTERNS + [p.strip() for p in ignore_patterns]
+        
+        # Store note content compressed outside the notes table
+        if compress_content is None:
+            compress_content = os.environ.get("COMPRESS_CONTENT", "").lower() in ("1", "true", "yes")
+        self.compress_content = compress_content
+        
+        # zlib level for compressed content, from 0 (store) to 9 (smallest)
+        if compression_level is None:
+            compression_level = os.environ.get("COMPRESSION_LEVEL", 6)
+        self.compression_level = int(compression_level)
+        if not 0 <= self.compression_level <= 9:
+            error_msg = f"Compression level must be between 0 and 9: {self.compression_level}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Local port serving metrics in the Prometheus text format; unset disables it
+        if metrics_port is None:
+            metrics_port = os.environ.get("METRICS_PORT") or None
+        self.metrics_port = int(metrics_port) if metrics_port is not None else None
+        if self.metrics_port is not None and not 1 <= self.metrics_port <= 65535:
+            error_msg = f"Metrics port must be between 1 and 65535: {self.metrics_port}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # File the metrics are written to periodically; unset disables it
+        stats_file = stats_file or os.environ.get("STATS_FILE")
+        self.stats_file = os.path.abspath(stats_file) if stats_file else None
+        
+        # Seconds between writes of the stats file
+        if stats_interval is None:
+            stats_interval = os.environ.get("STATS_INTERVAL", DEFAULT_STATS_INTERVAL)
+        self.stats_interval = float(stats_interval)
+        if self.stats_interval <= 0:
+            error_msg = f"Stats interval must be positive: {self.stats_interval}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # How per-note log lines are emitted: info, debug, or sampled at info
+        self.note_log = (note_log or os.environ.get("NOTE_LOG", "info")).lower()
+        if self.note_log not in NOTE_LOG_MODES:
+            error_msg = f"Note log mode must be one of {', '.join(NOTE_LOG_MODES)}: {self.note_log}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # One in this many notes is logged at info in sampled mode
+        self.note_log_sample = int(note_log_sample or os.environ.get("NOTE_LOG_SAMPLE", DEFAULT_NOTE_LOG_SAMPLE))
+        if self.note_log_sample < 1:
+            error_msg = f"Note log sample interval must be at least 1: {self.note_log_sample}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Days of change feed kept for downstream consumers; 0 keeps everything
+        if change_retention_days is None:
+            change_retention_days = os.environ.get("CHANGE_RETENTION_DAYS", DEFAULT_CHANGE_RETENTION_DAYS)
+        self.change_retention_days = float(change_retention_days)
+        if self.change_retention_days < 0:
+            error_msg = f"Change retention must not be negative: {self.change_retention_days}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # inotify events, polling, or polling only on file systems without events
+        self.watch_mode = (watch_mode or os.environ.get("WATCH_MODE", "auto")).lower()
+        if self.watch_mode not in WATCH_MODES:
+            error_msg = f"Watch mode must be one of {', '.join(WATCH_MODES)}: {self.watch_mode}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Seconds between polls of the vault in polling mode
+        if poll_interval is None:
+            poll_interval = os.environ.get("POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+        self.poll_interval = float(poll_interval)
+        if self.poll_interval <= 0:
+            error_msg = f"Poll interval must be positive: {self.poll_interval}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Notes stat'ed per poll to catch in-place edits, which bounds the cost of a poll
+        self.poll_stat_budget = int(poll_stat_budget or os.environ.get("POLL_STAT_BUDGET", DEFAULT_STAT_BUDGET))
+        if self.poll_stat_budget < 1:
+            error_msg = f"Poll stat budget must be at least 1: {self.poll_stat_budget}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        # Hash buckets of the note vectors kept for similarity search; 0 disables them
+        if vector_dim is None:
+            vector_dim = os.environ.get("VECTOR_DIM", DEFAULT_VECTOR_DIM)
+        self.vector_dim = int(vector_dim)
+        if self.vector_dim < 0:
+            error_msg = f"Vector dimension must not be negative: {self.vector_dim}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
     @property
     def file_extensions(self):
         """List of file extensions to monitor and index.
@@ -3,10 +3,12 @@
 import os
 import sqlite3
 import logging
+import zlib
 from pathlib import Path
 from typing import Optional
 
 from .errors import DatabaseError
+from .migrations import migrate
 
 # Configure logging
 logging.basicConfig(
@@ -14,22 +16,95 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Columns added after the initial schema, applied to existing databases on startup
+FINGERPRINT_COLUMNS = {
+    "file_size": "INTEGER",
+    "mtime_ns": "INTEGER",
+    "inode": "INTEGER",
+    "content_hash": "TEXT",
+}
+
+# Fills note_tags from the JSON tag lists stored in notes
+FILL_TAGS_QUERY = """
+    INSERT OR IGNORE INTO note_tags (path, tag)
+    SELECT notes.path, CAST(tag.value AS TEXT)
+    FROM notes, json_each(
+        CASE WHEN json_valid(notes.tags) THEN notes.tags ELSE '[]' END) AS tag
+    WHERE tag.value IS NOT NULL AND tag.type != 'array' AND tag.type != 'object'
+"""
+
+# Rows the external-content notes_fts index reads its columns from, so note
+# content is stored once: inline in notes or compressed in note_content, which
+# the view decompresses with the decompress() function. Tags come from
+# note_tags; FTS5 can't read a view that uses json_each.
+SEARCH_SOURCE_VIEW = """
+    CREATE VIEW notes_fts_source AS
+    SELECT notes.rowid AS note_rowid, notes.path AS path, notes.title AS title,
+           {content} AS content,
+           (SELECT group_concat(note_tags.tag, ' ') FROM note_tags
+            WHERE note_tags.path = notes.path) AS tags
+    FROM notes {join}
+"""
+
+# Chunks with their text, sliced from the note content so it isn't stored twice;
+# start and end are character offsets, and substr() counts from 1
+CHUNK_TEXT_VIEW = """
+    CREATE VIEW chunk_texts AS
+    SELECT chunks.path AS path, chunks.ordinal AS ordinal, chunks.heading_path AS heading_path,
+           chunks.start AS start, chunks.end AS end, chunks.hash AS hash,
+           substr({content}, chunks.start + 1, chunks.end - chunks.start) AS text
+    FROM chunks JOIN notes ON notes.path = chunks.path {join}
+"""
+
+# Refills the full-text index from notes_fts_source
+REBUILD_SEARCH_INDEX_QUERY = "INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')"
+
+# zlib level used when content compression is enabled
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Notes converted per transaction when content storage changes mode
+MIGRATION_BATCH_SIZE = 500
+
+
+def compress_content(content: Optional[str], level: int = DEFAULT_COMPRESSION_LEVEL) -> bytes:
+    """Compress note content for the note_content table."""
+    return zlib.compress((content or "").encode("utf-8"), level)
+
+
+def decompress_content(data: Optional[bytes]) -> Optional[str]:
+    """Decompress note content stored by compress_content."""
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
+
 
 class DatabaseConnection:
     """Manages SQLite database connection and setup."""
 
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        compress_content: bool = False,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+    ):
         """
         Initialize database connection and setup tables.
 
         Args:
             db_path (str): Path to the SQLite database file
+            compress_content (bool): Store note content zlib-compressed in the
+                note_content table instead of inline in notes
+            compression_level (int): zlib compression level, 0-9
 
         Raises:
             DatabaseError: If database initialization fails
         """
         self.db_path = db_path
         self.conn = None
+        self.fts_enabled = False
+        self.compress_content = compress_content
+        self.compression_level = compression_level
+        self.schema_version = 0
         self._setup_database()
 
     def _setup_database(self) -> None:
@@ -37,6 +112,13 @@ class DatabaseConnection:
         self._ensure_db_directory()
         self._initialize_connection()
         self._create_tables()
+        self._create_tags_table()
+        self._create_links_table()
+        self._create_content_table()
+        self._migrate_content_storage()
+        self._create_search_index()
+        self._apply_migrations()
+        self._create_chunk_view()
 
     def _ensure_db_directory(self) -> None:
         """Create database directory if it doesn't exist."""
@@ -53,6 +135,7 @@ class DatabaseConnection:
             )
             self.conn.execute("PRAGMA journal_mode=WAL")
             self.conn.row_factory = sqlite3.Row
+            self.conn.create_function("decompress", 1, decompress_content, deterministic=True)
             logger.info(f"Database connection established: {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"Failed to initialize database connection: {e}")
@@ -74,15 +157,233 @@ class DatabaseConnection:
                         content TEXT,
                         status TEXT DEFAULT 'success',
                         error_message TEXT,
-                        last_indexed TEXT
+                        last_indexed TEXT,
+                        file_size INTEGER,
+                        mtime_ns INTEGER,
+                        inode INTEGER,
+                        content_hash TEXT
                     )
                 """
                 )
+                self._add_missing_columns("notes", FINGERPRINT_COLUMNS)
             logger.info("Database tables verified/created")
         except sqlite3.Error as e:
             logger.error(f"Table creation failed: {e}")
             raise DatabaseError(f"Table creation failed: {e}")
 
+    def _create_tags_table(self) -> None:
+        """Create the normalized note_tags table, filling it for existing databases."""
+        try:
+            with self.conn:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'note_tags'"
+                ).fetchone()
+                self.conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS note_tags (
+                        path TEXT NOT NULL,
+                        tag TEXT NOT NULL,
+                        PRIMARY KEY (path, tag)
+                    ) WITHOUT ROWID
+                """
+                )
+                self.conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_note_tags_tag ON note_tags (tag, path)"
+                )
+                if not exists:
+                    self.conn.execute(FILL_TAGS_QUERY)
+            logger.info("Tags table verified/created")
+        except sqlite3.Error as e:
+            logger.error(f"Tags table creation failed: {e}")
+            raise DatabaseError(f"Tags table creation failed: {e}")
+
+    def _create_links_table(self) -> None:
+        """Create the links table and the indexes link resolution relies on.
+
+        Links can only be extracted from note files, so databases created
+        before the table existed have their fingerprints cleared and every
+        note is re-parsed by the next scan.
+        """
+        try:
+            with self.conn:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'links'"
+                ).fetchone()
+                self.conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS links (
+                        src_path TEXT NOT NULL,
+                        target TEXT NOT NULL,
+                        kind TEXT NOT NULL,
+                        subpath TEXT,
+                        alias TEXT,
+                        line INTEGER,
+                        target_key TEXT NOT NULL,
+                        target_name TEXT NOT NULL,
+                        target_path TEXT
+                    )
+                """
+                )
+                self.conn.execute("CREATE INDEX IF NOT EXISTS idx_links_src ON links (src_path)")
+                self.conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_links_target_path ON links (target_path)"
+                )
+                self.conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_links_target_name ON links (target_name)"
+                )
+                self.conn.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_notes_title ON notes (title COLLATE NOCASE)"
+                )
+                if not exists:
+                    self.conn.execute("UPDATE notes SET mtime_ns = NULL, content_hash = NULL")
+            logger.info("Links table verified/created")
+        except sqlite3.Error as e:
+            logger.error(f"Links table creation failed: {e}")
+            raise DatabaseError(f"Links table creation failed: {e}")
+
+    def _create_content_table(self) -> None:
+        """Create the note_content table holding compressed note content."""
+        try:
+            with self.conn:
+                self.conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS note_content (
+                        path TEXT PRIMARY KEY,
+                        data BLOB NOT NULL
+                    )
+                """
+                )
+            logger.info("Content table verified/created")
+        except sqlite3.Error as e:
+            logger.error(f"Content table creation failed: {e}")
+            raise DatabaseError(f"Content table creation failed: {e}")
+
+    def _migrate_content_storage(self) -> None:
+        """Move stored content into the configured storage mode.
+
+        With compression enabled, inline content is compressed into
+        note_content and cleared from notes; with it disabled, compressed
+        content is restored inline. Notes are converted in batches, one
+        transaction each, so an interrupted migration resumes on the next start.
+        """
+        if self.compress_content:
+            select = "SELECT path, content FROM notes WHERE content IS NOT NULL LIMIT ?"
+        else:
+            select = "SELECT path, data FROM note_content LIMIT ?"
+
+        converted = 0
+        try:
+            while True:
+                with self.conn:
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    rows = self.conn.execute(select, (MIGRATION_BATCH_SIZE,)).fetchall()
+                    if not rows:
+                        break
+                    if self.compress_content:
+                        self.conn.executemany(
+                            "INSERT OR REPLACE INTO note_content (path, data) VALUES (?, ?)",
+                            [
+                                (path, compress_content(content, self.compression_level))
+                                for path, content in rows
+                            ],
+                        )
+                        self.conn.executemany(
+                            "UPDATE notes SET content = NULL WHERE path = ?", [(row[0],) for row in rows]
+                        )
+                    else:
+                        self.conn.executemany(
+                            "UPDATE notes SET content = ? WHERE path = ?",
+                            [(decompress_content(data), path) for path, data in rows],
+                        )
+                        self.conn.executemany(
+                            "DELETE FROM note_content WHERE path = ?", [(row[0],) for row in rows]
+                        )
+                converted += len(rows)
+        except (sqlite3.Error, zlib.error) as e:
+            logger.error(f"Content storage migration failed: {e}")
+            raise DatabaseError(f"Content storage migration failed: {e}")
+
+        if converted:
+            mode = "compressed" if self.compress_content else "inline"
+            logger.info(f"Migrated content of {converted} notes to {mode} storage")
+
+    def _create_search_index(self) -> None:
+        """Create the FTS5 full-text index over notes, filling it for existing databases.
+
+        The index shares rowids with the notes table and stores no copy of
+        the notes: it reads them from the notes_fts_source view, recreated
+        for the content storage mode on every start. The view only calls
+        decompress() in compressed mode, so other SQLite clients can read
+        snippets of inline content. Indexes written by older versions,
+        which kept their own copy of every note, are rebuilt. Search is
+        disabled when the SQLite build lacks the FTS5 extension.
+        """
+        content, join = self._content_source()
+        try:
+            with self.conn:
+                row = self.conn.execute(
+                    "SELECT sql FROM sqlite_master WHERE name = 'notes_fts'"
+                ).fetchone()
+                legacy = row is not None and "notes_fts_source" not in row[0]
+                if legacy:
+                    self.conn.execute("DROP TABLE notes_fts")
+                self.conn.execute("DROP VIEW IF EXISTS notes_fts_source")
+                self.conn.execute(SEARCH_SOURCE_VIEW.format(content=content, join=join))
+                self.conn.execute(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                        title, content, tags,
+                        content='notes_fts_source', content_rowid='note_rowid'
+                    )
+                """
+                )
+                if row is None or legacy:
+                    self.conn.execute(REBUILD_SEARCH_INDEX_QUERY)
+            self.fts_enabled = True
+            if legacy:
+                logger.info("Rebuilt the full-text index without its copy of the note content")
+            logger.info("Full-text search index verified/created")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Full-text search disabled, FTS5 is unavailable: {e}")
+
+    def _create_chunk_view(self) -> None:
+        """Recreate the chunk_texts view for the content storage mode."""
+        content, join = self._content_source()
+        try:
+            with self.conn:
+                self.conn.execute("DROP VIEW IF EXISTS chunk_texts")
+                self.conn.execute(CHUNK_TEXT_VIEW.format(content=content, join=join))
+            logger.info("Chunk text view verified/created")
+        except sqlite3.Error as e:
+            logger.error(f"Chunk text view creation failed: {e}")
+            raise DatabaseError(f"Chunk text view creation failed: {e}")
+
+    def _content_source(self) -> tuple:
+        """Expression reading note content in views, and the join it needs."""
+        if self.compress_content:
+            return (
+                "COALESCE(notes.content, decompress(note_content.data))",
+                "LEFT JOIN note_content ON note_content.path = notes.path",
+            )
+        return "notes.content", ""
+
+    def _apply_migrations(self) -> None:
+        """Bring the schema up to date with the versioned migrations."""
+        try:
+            self.schema_version = migrate(self.conn)
+            logger.info(f"Database schema version {self.schema_version}")
+        except sqlite3.Error as e:
+            logger.error(f"Schema migration failed: {e}")
+            raise DatabaseError(f"Schema migration failed: {e}")
+
+    def _add_missing_columns(self, table: str, columns: dict) -> None:
+        """Add columns that databases created by older versions are missing."""
+        existing = {row["name"] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+                logger.info(f"Added column {table}.{name}")
+
     def close(self) -> None:
         """Safely close the database connection."""
         if self.conn:
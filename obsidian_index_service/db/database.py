@@ -1,28 +1,69 @@
 """Database interface for the Obsidian indexing service."""
 
 import logging
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from .connection import DatabaseConnection
-from .operations import NoteOperations
+from .connection import DEFAULT_COMPRESSION_LEVEL, DatabaseConnection
+from .operations import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHANGE_RETENTION_DAYS,
+    DEFAULT_DUPLICATE_THRESHOLD,
+    NoteOperations,
+)
+from .reader import DEFAULT_PAGE_SIZE, NoteReader
+from .vectors import DEFAULT_VECTOR_DIM
 
 logger = logging.getLogger(__name__)
 
 class Database:
     """Main database interface that combines connection and operations."""
     
-    def __init__(self, db_path: str):
+    def __init__(
+        self,
+        db_path: str,
+        compress_content: bool = False,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        change_retention_days: float = DEFAULT_CHANGE_RETENTION_DAYS,
+        vector_dim: int = DEFAULT_VECTOR_DIM,
+    ):
         """
         Initialize database components.
         
         Args:
             db_path (str): Path to the SQLite database file
+            compress_content (bool): Store note content zlib-compressed in a
+                separate table; existing content is migrated on open
+            compression_level (int): zlib compression level, 0-9
+            change_retention_days (float): Days of change feed kept; 0 keeps everything
+            vector_dim (int): Hash buckets of the note vectors kept for similarity
+                search in a matrix file next to the database; 0 disables them
         """
-        self.connection = DatabaseConnection(db_path)
-        self.notes = NoteOperations(self.connection)
+        self.db_path = db_path
+        self.compress_content = compress_content
+        self.compression_level = compression_level
+        self.change_retention_days = change_retention_days
+        self.vector_dim = vector_dim
+        self.connection = DatabaseConnection(db_path, compress_content, compression_level)
+        self.notes = NoteOperations(self.connection, change_retention_days, vector_dim)
+        self._reader = None
+        
+    def clone(self) -> "Database":
+        """
+        Open a second Database on the same file with the same settings.
+        
+        Returns:
+            Database: A new instance with its own connection
+        """
+        return Database(
+            self.db_path, self.compress_content, self.compression_level,
+            self.change_retention_days, self.vector_dim,
+        )
         
     def close(self) -> None:
         """Close database connection."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
         self.connection.close()
         
     def insert_or_update_note(self, note_data: Dict) -> bool:
@@ -37,6 +78,25 @@ class Database:
         """
         return self.notes.insert_or_update_note(note_data)
         
+    def bulk_insert_or_update_notes(
+        self,
+        notes: Iterable[Dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        update_search_index: bool = True,
+    ) -> int:
+        """
+        Insert or update many notes, committing once per batch.
+        
+        Args:
+            notes (iterable): Note metadata dicts with required 'path' key
+            batch_size (int): Number of notes written per transaction
+            update_search_index (bool): Keep the full-text index in sync row by row
+            
+        Returns:
+            int: Number of notes written successfully
+        """
+        return self.notes.bulk_insert_or_update_notes(notes, batch_size, update_search_index)
+        
     def delete_note(self, path: str) -> bool:
         """
         Delete a note from the database.
@@ -49,14 +109,332 @@ class Database:
         """
         return self.notes.delete_note(path)
         
-    def get_all_notes(self) -> List[Dict]:
+    def delete_notes(self, paths: Iterable[str]) -> int:
+        """
+        Delete many notes in a single transaction.
+        
+        Args:
+            paths (iterable): Paths of the notes to delete
+            
+        Returns:
+            int: Number of notes deleted; 0 if the transaction failed
+        """
+        return self.notes.delete_notes(paths)
+        
+    def move_note(self, old_path: str, new_path: str) -> bool:
+        """
+        Move a note to a new path without re-reading it.
+        
+        Args:
+            old_path (str): Current path of the note
+            new_path (str): Path the note was moved to
+            
+        Returns:
+            bool: True if the note existed and was moved
+        """
+        return self.notes.move_note(old_path, new_path)
+        
+    def move_folder(self, old_folder: str, new_folder: str) -> bool:
         """
-        Retrieve all notes from the database.
+        Move every note below a folder with prefix-based UPDATEs.
+        
+        Args:
+            old_folder (str): Vault-relative folder that was moved
+            new_folder (str): Vault-relative folder it was moved to
+            
+        Returns:
+            bool: Success status of the operation
+        """
+        return self.notes.move_folder(old_folder, new_folder)
+        
+    def delete_folder(self, folder: str) -> bool:
+        """
+        Delete every note below a folder with prefix-based DELETEs.
+        
+        Args:
+            folder (str): Vault-relative folder that was deleted
+            
+        Returns:
+            bool: Success status of the operation
+        """
+        return self.notes.delete_folder(folder)
+        
+    def apply_changes(self, changes: List[Tuple]) -> int:
+        """
+        Apply a group of queued changes in a single transaction.
+        
+        Args:
+            changes (list): Change tuples such as (CHANGE_UPSERT, note_data)
+                or (CHANGE_MOVE, old_path, new_path)
+            
+        Returns:
+            int: Number of changes applied successfully
+        """
+        return self.notes.apply_changes(changes)
+        
+    def changes_since(self, seq: int = 0, limit: int = 1000) -> List[Dict]:
+        """
+        Retrieve the change feed entries recorded after a sequence number.
+        
+        Args:
+            seq (int): Last sequence number the caller has processed; 0 reads from the start
+            limit (int): Maximum number of entries returned
+            
+        Returns:
+            list: Dicts with seq, path, op, old_path and ts, oldest first
+        """
+        return self.notes.changes_since(seq, limit)
+        
+    def get_change_feed_bounds(self) -> Tuple[int, int]:
+        """
+        Retrieve the range of sequence numbers the change feed still holds.
+        
+        Returns:
+            tuple: (first_seq, last_seq); first_seq is last_seq + 1 when the feed is empty
+        """
+        return self.notes.get_change_feed_bounds()
+        
+    def prune_changes(self, max_age_days: Optional[float] = None) -> int:
+        """
+        Delete change feed entries older than the retention period.
+        
+        Args:
+            max_age_days (float, optional): Age limit in days; defaults to
+                change_retention_days. 0 keeps everything.
+            
+        Returns:
+            int: Number of entries deleted
+        """
+        return self.notes.prune_changes(max_age_days)
+        
+    def get_all_notes(self, include_content: bool = True) -> List[Dict]:
+        """
+        Retrieve all notes from the database at once.
+        
+        Large vaults are better read with iter_notes, which streams pages
+        from a read-only connection.
+        
+        Args:
+            include_content (bool): Include each note's content; False skips
+                reading and decompressing it
         
         Returns:
             list: List of note dictionaries
         """
-        return self.notes.get_all_notes()
+        return self.notes.get_all_notes(include_content)
+        
+    def iter_notes(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        parent_folder: Optional[str] = None,
+        include_subfolders: bool = False,
+        status: Optional[str] = None,
+        modified_after: Optional[str] = None,
+        modified_before: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Yield notes ordered by path from a read-only connection, one page at a time.
+        
+        Args:
+            columns (sequence, optional): Columns to return; defaults to all of them
+            parent_folder (str, optional): Only notes in this folder
+            include_subfolders (bool): Also include notes in folders below parent_folder
+            status (str, optional): Only notes with this status
+            modified_after (str, optional): Only notes modified at or after this ISO timestamp
+            modified_before (str, optional): Only notes modified before this ISO timestamp
+            page_size (int): Notes fetched per query
+            
+        Yields:
+            dict: One note per row
+        """
+        if self._reader is None:
+            self._reader = NoteReader(self.db_path)
+        return self._reader.iter_notes(
+            columns, parent_folder, include_subfolders, status,
+            modified_after, modified_before, page_size,
+        )
+        
+    def get_note_content(self, path: str) -> Optional[str]:
+        """
+        Retrieve the content of one note, decompressing it if needed.
+        
+        Args:
+            path (str): Path of the note
+            
+        Returns:
+            str: Note content, or None if the note isn't indexed
+        """
+        return self.notes.get_note_content(path)
+        
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Full-text search over note titles, content and tags.
+        
+        Args:
+            query (str): FTS5 match expression
+            limit (int): Maximum number of results
+            offset (int): Number of results to skip, for paging
+            
+        Returns:
+            list: Dicts with path, title, snippet and rank, best match first
+        """
+        return self.notes.search(query, limit, offset)
+        
+    def rebuild_search_index(self) -> bool:
+        """
+        Rebuild the full-text index from the notes table.
+        
+        Returns:
+            bool: Success status of the operation
+        """
+        return self.notes.rebuild_search_index()
+        
+    def similar_notes(self, path: str, k: int = 10) -> List[Dict]:
+        """
+        Find the notes most similar to an indexed note by TF-IDF cosine similarity.
+        
+        Args:
+            path (str): Path of the note
+            k (int): Maximum number of results
+            
+        Returns:
+            list: Dicts with path and score, best match first, without the note itself
+        """
+        return self.notes.similar_notes(path, k)
+        
+    def similar_to_text(self, text: str, k: int = 10) -> List[Dict]:
+        """
+        Find the notes most similar to a piece of text by TF-IDF cosine similarity.
+        
+        Args:
+            text (str): Text to compare the notes with
+            k (int): Maximum number of results
+            
+        Returns:
+            list: Dicts with path and score, best match first
+        """
+        return self.notes.similar_to_text(text, k)
+        
+    def rebuild_vector_index(self) -> bool:
+        """
+        Rebuild the note vectors used by similarity search from the notes table.
+        
+        Returns:
+            bool: Success status of the operation
+        """
+        return self.notes.rebuild_vector_index()
+        
+    def find_duplicates(self, threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> List[Dict]:
+        """
+        Group notes whose content is nearly identical, using MinHash LSH buckets.
+        
+        Args:
+            threshold (float): Minimum estimated Jaccard similarity of the notes' word triples
+            
+        Returns:
+            list: Dicts with paths and similarity, largest cluster first
+        """
+        return self.notes.find_duplicates(threshold)
+        
+    def get_notes_by_tag(self, tag: str) -> List[str]:
+        """
+        Retrieve the paths of notes carrying a tag.
+        
+        Args:
+            tag (str): Exact tag, e.g. 'project/alpha'
+            
+        Returns:
+            list: Sorted note paths
+        """
+        return self.notes.get_notes_by_tag(tag)
+        
+    def get_notes_by_tag_prefix(self, prefix: str) -> List[str]:
+        """
+        Retrieve the paths of notes carrying a tag or any tag nested under it.
+        
+        Args:
+            prefix (str): Parent tag, e.g. 'project' matches 'project/alpha'
+            
+        Returns:
+            list: Sorted, distinct note paths
+        """
+        return self.notes.get_notes_by_tag_prefix(prefix)
+        
+    def get_tag_counts(self) -> Dict[str, int]:
+        """
+        Count the notes carrying each tag.
+        
+        Returns:
+            dict: Mapping of tag to number of notes
+        """
+        return self.notes.get_tag_counts()
+        
+    def get_outlinks(self, path: str) -> List[Dict]:
+        """
+        Retrieve the links going out of a note.
+        
+        Args:
+            path (str): Path of the linking note
+            
+        Returns:
+            list: Dicts with target, kind, subpath, alias, line and target_path
+        """
+        return self.notes.get_outlinks(path)
+        
+    def get_backlinks(self, path: str) -> List[Dict]:
+        """
+        Retrieve the links pointing at a note.
+        
+        Args:
+            path (str): Path of the linked note
+            
+        Returns:
+            list: Dicts with src_path, target, kind, subpath, alias and line
+        """
+        return self.notes.get_backlinks(path)
+        
+    def get_chunks(self, path: str) -> List[Dict]:
+        """
+        Retrieve the heading-delimited chunks of a note.
+        
+        Args:
+            path (str): Path of the note
+            
+        Returns:
+            list: Dicts with ordinal, heading_path, start, end, text and hash, in document order
+        """
+        return self.notes.get_chunks(path)
+        
+    def get_content_hash(self, path: str) -> Optional[str]:
+        """
+        Retrieve the content hash stored for a successfully indexed note.
+        
+        Args:
+            path (str): Path of the note
+            
+        Returns:
+            str: Hex digest, or None if the note isn't indexed
+        """
+        return self.notes.get_content_hash(path)
+        
+    def get_indexed_paths(self) -> set:
+        """
+        Retrieve the path of every indexed note, including notes that failed to parse.
+        
+        Returns:
+            set: Note paths
+        """
+        return self.notes.get_indexed_paths()
+        
+    def get_fingerprints(self) -> Dict[str, Tuple]:
+        """
+        Retrieve the stored file fingerprints of successfully indexed notes.
+        
+        Returns:
+            dict: Mapping of note path to (file_size, mtime_ns, inode)
+        """
+        return self.notes.get_fingerprints()
         
     def __enter__(self):
         """Support for context manager protocol."""
@@ -0,0 +1,171 @@
+"""Versioned schema migrations keyed on SQLite's PRAGMA user_version."""
+
+import logging
+import sqlite3
+from typing import Callable, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# A migration step is either an SQL statement or a callable taking the connection
+MigrationStep = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _drop_chunk_text(conn: sqlite3.Connection) -> None:
+    """Drop chunks.text if the table still has it, so the step can run twice."""
+    if any(row[1] == "text" for row in conn.execute("PRAGMA table_info(chunks)")):
+        conn.execute("ALTER TABLE chunks DROP COLUMN text")
+
+
+# Migrations as (version, description, steps), in version order. Each one
+# upgrades the schema from the previous version and runs in its own
+# transaction together with the user_version bump. Shipped migrations are
+# never edited; schema changes are appended as a new version.
+MIGRATIONS: Tuple[Tuple[int, str, Tuple[MigrationStep, ...]], ...] = (
+    (
+        1,
+        "secondary indexes for folder listing, recent notes, errors and title lookup",
+        (
+            # Notes in a folder, ordered by path: the keyset pages of
+            # NoteReader.iter_notes and folder listings by title
+            "CREATE INDEX IF NOT EXISTS idx_notes_folder ON notes (parent_folder, path, title)",
+            # Recently modified notes, newest first
+            "CREATE INDEX IF NOT EXISTS idx_notes_modified ON notes (modified_date, path, title)",
+            # Notes that failed to parse, with their errors
+            "CREATE INDEX IF NOT EXISTS idx_notes_status ON notes (status, path, error_message)",
+            # Exact title lookup; idx_notes_title only serves NOCASE comparisons
+            "CREATE INDEX IF NOT EXISTS idx_notes_title_lookup ON notes (title, path)",
+        ),
+    ),
+    (
+        2,
+        "append-only change feed",
+        (
+            # AUTOINCREMENT keeps sequence numbers from being reused once
+            # retention has deleted the newest rows
+            """
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                op TEXT NOT NULL,
+                old_path TEXT,
+                ts TEXT NOT NULL DEFAULT (datetime('now'))
+            )
+            """,
+        ),
+    ),
+    (
+        3,
+        "heading-aware note chunks",
+        (
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                path TEXT NOT NULL,
+                ordinal INTEGER NOT NULL,
+                heading_path TEXT NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (path, ordinal)
+            )
+            """,
+            # Chunks are split while parsing, so the next scan re-parses every note
+            "UPDATE notes SET mtime_ns = NULL, content_hash = NULL",
+        ),
+    ),
+    (
+        4,
+        "rows of the note vector matrix",
+        (
+            # Rows whose path is NULL belong to deleted notes and are reused;
+            # the vectors themselves live in the matrix file next to the database
+            """
+            CREATE TABLE IF NOT EXISTS note_vectors (
+                row INTEGER PRIMARY KEY,
+                path TEXT UNIQUE
+            )
+            """,
+        ),
+    ),
+    (
+        5,
+        "MinHash signatures and LSH buckets for near-duplicate detection",
+        (
+            "CREATE TABLE IF NOT EXISTS note_minhash (path TEXT PRIMARY KEY, signature BLOB NOT NULL)",
+            # Notes sharing a (band, bucket) are candidate duplicates
+            """
+            CREATE TABLE IF NOT EXISTS minhash_bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                path TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, path)
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_minhash_bands_path ON minhash_bands (path)",
+            # Signatures are computed while parsing, so the next scan re-parses every note
+            "UPDATE notes SET mtime_ns = NULL, content_hash = NULL",
+        ),
+    ),
+    (
+        6,
+        "chunk text sliced from the note content instead of stored",
+        (
+            # Chunks are ranges of the note content, which is stored once (compressed
+            # with --compress-content); the chunk_texts view slices their text
+            _drop_chunk_text,
+        ),
+    ),
+)
+
+# Schema version of a fully migrated database
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database file."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, migrations=MIGRATIONS) -> int:
+    """
+    Apply every migration newer than the database's schema version.
+
+    The version is re-read inside each write transaction, so two processes
+    opening the same database at once don't apply a migration twice. An
+    interrupted upgrade resumes from the last committed version.
+
+    Args:
+        conn (sqlite3.Connection): Connection in autocommit mode
+        migrations (tuple): Migrations to apply, defaults to MIGRATIONS
+
+    Returns:
+        int: Schema version after migrating
+
+    Raises:
+        sqlite3.Error: If a migration fails; its transaction is rolled back
+    """
+    latest = migrations[-1][0] if migrations else 0
+    version = get_schema_version(conn)
+    if version > latest:
+        logger.warning(
+            f"Database schema version {version} is newer than this release supports ({latest})"
+        )
+        return version
+
+    for target, description, steps in migrations:
+        if target <= version:
+            continue
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = get_schema_version(conn)
+            if target <= version:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {int(target)}")
+        version = target
+        logger.info(f"Migrated database schema to version {target}: {description}")
+    return version
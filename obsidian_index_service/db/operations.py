@@ -1,25 +1,171 @@
 """Database operations for note management."""
 
+import json
+import os
 import sqlite3
 import logging
-from typing import Dict, List, Optional
+from collections import deque
+from contextlib import contextmanager
+from itertools import groupby, islice
+from pathlib import Path
+from time import monotonic, perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .connection import DatabaseConnection
+from obsidian_index_service.metrics import metrics
+from obsidian_index_service.note_processor.minhash import band_buckets, estimate_jaccard
+
+from .connection import REBUILD_SEARCH_INDEX_QUERY, DatabaseConnection, compress_content
 from .errors import DatabaseError
+from .vectors import DEFAULT_VECTOR_DIM, VectorIndex, vector_file_path, vectors_available
 
 logger = logging.getLogger(__name__)
 
+# Number of notes written per transaction by bulk operations
+DEFAULT_BATCH_SIZE = 500
+
+# Kinds of queued changes accepted by NoteOperations.apply_changes
+CHANGE_UPSERT = "upsert"
+CHANGE_DELETE = "delete"
+CHANGE_MOVE = "move"
+CHANGE_MOVE_FOLDER = "move_folder"
+CHANGE_DELETE_FOLDER = "delete_folder"
+CHANGE_DELETE_MANY = "delete_many"
+
+# Days the change feed is kept; 0 keeps it forever
+DEFAULT_CHANGE_RETENTION_DAYS = 30
+
+# Seconds between prunes of the change feed by a writing connection
+CHANGE_PRUNE_INTERVAL = 3600
+
+# Appends to the change feed; op is CHANGE_UPSERT, CHANGE_DELETE or CHANGE_MOVE
+INSERT_CHANGE_QUERY = 'INSERT INTO changes (path, op, old_path) VALUES (?, ?, ?)'
+
+# Estimated Jaccard similarity above which notes count as near-duplicates
+DEFAULT_DUPLICATE_THRESHOLD = 0.8
+
+# Members of every LSH bucket holding more than one note, grouped by bucket
+DUPLICATE_CANDIDATES_QUERY = '''
+    SELECT band, bucket, path FROM minhash_bands
+    WHERE (band, bucket) IN (
+        SELECT band, bucket FROM minhash_bands GROUP BY band, bucket HAVING COUNT(*) > 1
+    )
+    ORDER BY band, bucket, path
+'''
+
+INSERT_CHUNK_QUERY = '''
+    INSERT INTO chunks (path, ordinal, heading_path, start, end, hash)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# Updates rows in place on conflict so a note keeps its rowid, which the
+# full-text index is keyed on
+UPSERT_NOTE_QUERY = '''
+    INSERT INTO notes 
+    (path, title, parent_folder, tags, created_date, modified_date, 
+     content, status, error_message, last_indexed,
+     file_size, mtime_ns, inode, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'), ?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+        title = excluded.title,
+        parent_folder = excluded.parent_folder,
+        tags = excluded.tags,
+        created_date = excluded.created_date,
+        modified_date = excluded.modified_date,
+        content = excluded.content,
+        status = excluded.status,
+        error_message = excluded.error_message,
+        last_indexed = excluded.last_indexed,
+        file_size = excluded.file_size,
+        mtime_ns = excluded.mtime_ns,
+        inode = excluded.inode,
+        content_hash = excluded.content_hash
+'''
+
+# notes_fts reads its columns from the notes_fts_source view, so a note is
+# indexed after it's written and unindexed before it changes, while the view
+# still shows what was indexed
+INDEX_SEARCH_QUERY = '''
+    INSERT INTO notes_fts (rowid, title, content, tags)
+    SELECT note_rowid, title, content, tags FROM notes_fts_source WHERE path = ?
+'''
+
+# Unindexing a note that isn't indexed would corrupt the index, so only rows
+# present in notes_fts_docsize, which holds one row per indexed note, are deleted
+UNINDEX_SEARCH_QUERY = '''
+    DELETE FROM notes_fts WHERE rowid IN (
+        SELECT id FROM notes_fts_docsize
+        WHERE id IN (SELECT rowid FROM notes WHERE {where}))
+'''
+
+INSERT_TAG_QUERY = 'INSERT OR IGNORE INTO note_tags (path, tag) VALUES (?, ?)'
+
+UPSERT_CONTENT_QUERY = 'INSERT OR REPLACE INTO note_content (path, data) VALUES (?, ?)'
+
+# Columns of the notes table as returned by the read APIs, in table order
+NOTE_COLUMNS = (
+    'path', 'title', 'parent_folder', 'tags', 'created_date', 'modified_date',
+    'content', 'status', 'error_message', 'last_indexed',
+    'file_size', 'mtime_ns', 'inode', 'content_hash',
+)
+
+# Inline content, or compressed content decompressed on read
+CONTENT_EXPRESSION = 'COALESCE(notes.content, decompress(note_content.data))'
+
+INSERT_LINK_QUERY = '''
+    INSERT INTO links
+    (src_path, target, kind, subpath, alias, line, target_key, target_name)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# File extensions a link target may omit
+NOTE_EXTENSIONS = ('.md', '.markdown')
+
+SEARCH_QUERY = '''
+    SELECT notes.path, notes.title,
+           snippet(notes_fts, 1, '[', ']', '...', 16) AS snippet,
+           bm25(notes_fts) AS rank
+    FROM notes_fts JOIN notes ON notes.rowid = notes_fts.rowid
+    WHERE notes_fts MATCH ?
+    ORDER BY rank
+    LIMIT ? OFFSET ?
+'''
+
 class NoteOperations:
     """Manages note-related database operations."""
     
-    def __init__(self, db_connection: DatabaseConnection):
+    def __init__(
+        self,
+        db_connection: DatabaseConnection,
+        change_retention_days: float = DEFAULT_CHANGE_RETENTION_DAYS,
+        vector_dim: int = DEFAULT_VECTOR_DIM,
+    ):
         """
         Initialize with a database connection.
         
         Args:
             db_connection: An initialized DatabaseConnection instance
+            change_retention_days (float): Days of change feed kept by the
+                hourly prune that runs with writes; 0 keeps everything
+            vector_dim (int): Hash buckets of the note vectors used by
+                similarity search; 0 disables them
         """
         self.conn = db_connection.conn
+        self.fts_enabled = db_connection.fts_enabled
+        self.compress_content = db_connection.compress_content
+        self.compression_level = db_connection.compression_level
+        self.change_retention_days = change_retention_days
+        # Notes and chunks written by the open transaction, counted once it commits
+        self._written_in_transaction = 0
+        self._chunks_in_transaction = 0
+        # Prune the change feed with the first write
+        self._next_prune = 0.0
+        self.vectors = None
+        if vector_dim and db_connection.db_path != ':memory:':
+            if vectors_available():
+                self.vectors = VectorIndex(vector_file_path(db_connection.db_path), vector_dim)
+                self._ensure_vector_index()
+            else:
+                logger.info("NumPy is not installed, similarity search is disabled")
 
     def insert_or_update_note(self, note_data: Dict) -> bool:
         """
@@ -36,25 +182,40 @@ class NoteOperations:
             logger.error("Cannot process note with empty path")
             return False
 
-        query = '''
-            INSERT OR REPLACE INTO notes 
-            (path, title, parent_folder, tags, created_date, modified_date, 
-             content, status, error_message, last_indexed)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
-        '''
-        params = (
-            path,
-            note_data.get('title', ''),
-            note_data.get('parent_folder', ''),
-            note_data.get('tags', ''),
-            note_data.get('created_date', ''),
-            note_data.get('modified_date', ''),
-            note_data.get('content', ''),
-            note_data.get('status', 'success'),
-            note_data.get('error_message', '')
+        return self._execute_transaction(
+            f"insert/update note {path}", self._write_notes, [note_data]
         )
 
-        return self._execute_transaction(query, params, f"insert/update note {path}")
+    def bulk_insert_or_update_notes(
+        self,
+        notes: Iterable[Dict],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        update_search_index: bool = True,
+    ) -> int:
+        """
+        Insert or update many notes, committing once per batch.
+        
+        Args:
+            notes (iterable): Note metadata dicts with required 'path' key
+            batch_size (int): Number of notes written per transaction
+            update_search_index (bool): Keep the full-text index in sync row by row.
+                Pass False when rebuild_search_index() runs after the bulk write.
+            
+        Returns:
+            int: Number of notes written successfully
+        """
+        written = 0
+        valid_notes = (note for note in notes if self._has_path(note))
+        while True:
+            batch = list(islice(valid_notes, batch_size))
+            if not batch:
+                return written
+            try:
+                with self._transaction():
+                    self._write_notes(batch, update_search_index)
+                written += len(batch)
+            except sqlite3.Error as e:
+                logger.error(f"Error during bulk insert/update of {len(batch)} notes: {e}")
 
     def delete_note(self, path: str) -> bool:
         """
@@ -76,17 +237,195 @@ class NoteOperations:
             logger.warning(f"Note not found for deletion: {path}")
             return False
 
-        delete_query = 'DELETE FROM notes WHERE path = ?'
-        return self._execute_transaction(delete_query, (path,), f"delete note {path}")
+        return self._execute_transaction(f"delete note {path}", self._remove_note, path)
+
+    def delete_notes(self, paths: Iterable[str]) -> int:
+        """
+        Delete many notes in a single transaction.
+        
+        Args:
+            paths (iterable): Paths of the notes to delete
+            
+        Returns:
+            int: Number of notes deleted; 0 if the transaction failed
+        """
+        paths = [path for path in paths if path]
+        if not paths:
+            return 0
+        try:
+            with self._transaction():
+                return self._delete_notes(paths)
+        except sqlite3.Error as e:
+            logger.error(f"Error during delete of {len(paths)} notes: {e}")
+            return 0
+
+    def move_note(self, old_path: str, new_path: str) -> bool:
+        """
+        Move a note to a new path without re-reading it.
+        
+        Rewrites path, title and parent_folder in place, along with the note's
+        tags and search entry, in one transaction. Any note already at the new
+        path is replaced.
+        
+        Args:
+            old_path (str): Current path of the note
+            new_path (str): Path the note was moved to
+            
+        Returns:
+            bool: True if the note existed and was moved
+        """
+        if not old_path or not new_path:
+            logger.error("Cannot move note with empty path")
+            return False
+        try:
+            with self._transaction():
+                moved = self._move_note(old_path, new_path)
+        except sqlite3.Error as e:
+            logger.error(f"Error during move note {old_path} -> {new_path}: {e}")
+            return False
+        if not moved:
+            logger.warning(f"Note not found for move: {old_path}")
+        return moved
+
+    def move_folder(self, old_folder: str, new_folder: str) -> bool:
+        """
+        Move every note below a folder with prefix-based UPDATEs in one transaction.
+        
+        Args:
+            old_folder (str): Vault-relative folder that was moved
+            new_folder (str): Vault-relative folder it was moved to
+            
+        Returns:
+            bool: Success status of the operation
+        """
+        if not old_folder or not new_folder:
+            logger.error("Cannot move folder with empty path")
+            return False
+        return self._execute_transaction(
+            f"move folder {old_folder} -> {new_folder}", self._move_folder, old_folder, new_folder
+        )
+
+    def delete_folder(self, folder: str) -> bool:
+        """
+        Delete every note below a folder with prefix-based DELETEs in one transaction.
+        
+        Args:
+            folder (str): Vault-relative folder that was deleted
+            
+        Returns:
+            bool: Success status of the operation
+        """
+        if not folder:
+            logger.error("Cannot delete folder with empty path")
+            return False
+        return self._execute_transaction(f"delete folder {folder}", self._delete_folder, folder)
+
+    def apply_changes(self, changes: List[Tuple]) -> int:
+        """
+        Apply a group of queued changes in a single transaction.
+        
+        Each change is a tuple whose first item is its kind: (CHANGE_UPSERT, note_data),
+        (CHANGE_DELETE, path), (CHANGE_MOVE, old_path, new_path),
+        (CHANGE_MOVE_FOLDER, old_folder, new_folder), (CHANGE_DELETE_FOLDER, folder) or
+        (CHANGE_DELETE_MANY, paths). If the group fails, the changes are retried one
+        transaction each so a single bad change doesn't discard the others.
+        
+        Args:
+            changes (list): Change tuples in the order they were queued
+            
+        Returns:
+            int: Number of changes applied successfully
+        """
+        try:
+            with self._transaction():
+                for change in changes:
+                    self._apply_change(change)
+            return len(changes)
+        except sqlite3.Error as e:
+            logger.warning(f"Group commit of {len(changes)} changes failed, retrying singly: {e}")
+
+        return sum(
+            self._execute_transaction(f"{change[0]} {change[1]}", self._apply_change, change)
+            for change in changes
+        )
+
+    def changes_since(self, seq: int = 0, limit: int = 1000) -> List[Dict]:
+        """
+        Retrieve the change feed entries recorded after a sequence number.
+        
+        Every upsert, delete and move of a note appends an entry in the same
+        transaction as the write, so a consumer that stores the last seq it
+        processed can catch up by reading only what changed. Folder moves and
+        deletes produce one entry per note.
+        
+        Args:
+            seq (int): Last sequence number the caller has processed; 0 reads from the start
+            limit (int): Maximum number of entries returned
+            
+        Returns:
+            list: Dicts with seq, path, op ('upsert', 'delete' or 'move'),
+                old_path (set for moves) and ts, oldest first
+        """
+        return self._fetch_rows(
+            'SELECT seq, path, op, old_path, ts FROM changes WHERE seq > ? ORDER BY seq LIMIT ?',
+            (seq, limit),
+            f"changes since {seq}",
+        )
+
+    def get_change_feed_bounds(self) -> Tuple[int, int]:
+        """
+        Retrieve the range of sequence numbers the change feed still holds.
+        
+        A consumer whose last processed seq is below first_seq - 1 has missed
+        pruned entries and has to re-read the notes table.
+        
+        Returns:
+            tuple: (first_seq, last_seq); first_seq is last_seq + 1 when the
+                feed is empty, and both are 0 for a feed that never had entries
+        """
+        try:
+            first = self.conn.execute('SELECT MIN(seq) FROM changes').fetchone()[0]
+            row = self.conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving change feed bounds: {e}")
+            return 0, 0
+        last = row[0] if row else 0
+        return (first if first is not None else last + 1), last
 
-    def get_all_notes(self) -> List[Dict]:
+    def prune_changes(self, max_age_days: Optional[float] = None) -> int:
+        """
+        Delete change feed entries older than the retention period.
+        
+        Args:
+            max_age_days (float, optional): Age limit in days; defaults to
+                change_retention_days. 0 keeps everything.
+            
+        Returns:
+            int: Number of entries deleted
+        """
+        try:
+            with self._transaction():
+                return self._prune_changes(max_age_days)
+        except sqlite3.Error as e:
+            logger.error(f"Error pruning the change feed: {e}")
+            return 0
+
+    def get_all_notes(self, include_content: bool = True) -> List[Dict]:
         """
         Retrieve all notes from the database.
         
+        Args:
+            include_content (bool): Include each note's content. Pass False for
+                metadata-only reads, which then never touch compressed content.
+        
         Returns:
             list: List of note dictionaries
         """
-        query = 'SELECT * FROM notes'
+        query = f'SELECT {self._note_columns(include_content)} FROM notes'
+        if include_content:
+            query += ' LEFT JOIN note_content ON note_content.path = notes.path'
         try:
             with self.conn:
                 cursor = self.conn.execute(query)
@@ -95,12 +434,1011 @@ class NoteOperations:
             logger.error(f"Failed to retrieve notes: {e}")
             return []
 
-    def _execute_transaction(self, query: str, params: tuple, operation: str) -> bool:
-        """Execute a database transaction with verification."""
+    def get_note_content(self, path: str) -> Optional[str]:
+        """
+        Retrieve the content of one note, decompressing it if needed.
+        
+        Args:
+            path (str): Path of the note
+            
+        Returns:
+            str: Note content, or None if the note isn't indexed
+        """
+        query = f'''
+            SELECT {CONTENT_EXPRESSION} FROM notes
+            LEFT JOIN note_content ON note_content.path = notes.path
+            WHERE notes.path = ?
+        '''
+        try:
+            row = self.conn.execute(query, (path,)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve content of {path}: {e}")
+            return None
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """
+        Full-text search over note titles, content and tags.
+        
+        Args:
+            query (str): FTS5 match expression, e.g. 'sqlite AND "write ahead"'
+            limit (int): Maximum number of results
+            offset (int): Number of results to skip, for paging
+            
+        Returns:
+            list: Dicts with path, title, snippet and rank, best match first
+        """
+        if not self.fts_enabled:
+            logger.error("Full-text search is unavailable in this SQLite build")
+            return []
         try:
-            with self.conn:
-                self.conn.execute('BEGIN IMMEDIATE')
-                self.conn.execute(query, params)
+            cursor = self.conn.execute(SEARCH_QUERY, (query, limit, offset))
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Search failed for {query!r}: {e}")
+            return []
+
+    def rebuild_search_index(self) -> bool:
+        """
+        Rebuild the full-text index from the notes table in one transaction.
+        
+        Returns:
+            bool: Success status of the operation
+        """
+        if not self.fts_enabled:
+            return False
+        return self._execute_transaction("rebuild search index", self._rebuild_search_index)
+
+    def similar_notes(self, path: str, k: int = 10) -> List[Dict]:
+        """
+        Find the notes most similar to an indexed note.
+        
+        Args:
+            path (str): Path of the note
+            k (int): Maximum number of results
+            
+        Returns:
+            list: Dicts with path and score (TF-IDF cosine similarity, 0-1),
+                best match first, without the note itself
+        """
+        if not self._vectors_enabled():
+            return []
+        try:
+            row = self.conn.execute(
+                'SELECT row FROM note_vectors WHERE path = ?', (path,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to look up the vector of {path}: {e}")
+            return []
+        vector = self.vectors.vector(row[0]) if row else None
+        if vector is None:
+            return []
+        return self._similar(vector, k, row[0])
+
+    def similar_to_text(self, text: str, k: int = 10) -> List[Dict]:
+        """
+        Find the notes most similar to a piece of text.
+        
+        Args:
+            text (str): Text to compare the notes with
+            k (int): Maximum number of results
+            
+        Returns:
+            list: Dicts with path and score (TF-IDF cosine similarity, 0-1), best match first
+        """
+        if not self._vectors_enabled():
+            return []
+        return self._similar(self.vectors.vectorize(text), k)
+
+    def rebuild_vector_index(self) -> bool:
+        """
+        Rebuild the note vectors from the notes table in one transaction.
+        
+        Returns:
+            bool: Success status of the operation
+        """
+        if not self._vectors_enabled():
+            return False
+        return self._execute_transaction("rebuild vector index", self._rebuild_vector_index)
+
+    def find_duplicates(self, threshold: float = DEFAULT_DUPLICATE_THRESHOLD) -> List[Dict]:
+        """
+        Group notes whose content is nearly identical.
+        
+        Only notes sharing an LSH bucket are compared, each with the first
+        note of the bucket, so the work grows with the number of notes
+        rather than the number of pairs. Thresholds well below 0.7 miss
+        pairs, since such notes rarely share a bucket.
+        
+        Args:
+            threshold (float): Minimum estimated Jaccard similarity of the
+                notes' word triples, above 0 and at most 1
+            
+        Returns:
+            list: Dicts with paths (sorted) and similarity (the lowest
+                estimate that joined the cluster), largest cluster first
+        """
+        try:
+            rows = self.conn.execute(DUPLICATE_CANDIDATES_QUERY).fetchall()
+            signatures = dict(self._select_paths(
+                'SELECT path, signature FROM note_minhash WHERE path IN ({})',
+                list({row[2] for row in rows}),
+            ))
+        except sqlite3.Error as e:
+            logger.error(f"Failed to find duplicate notes: {e}")
+            return []
+
+        parents = {}
+        similarity = {}
+
+        def find(path):
+            parents.setdefault(path, path)
+            while parents[path] != path:
+                parents[path] = parents[parents[path]]
+                path = parents[path]
+            return path
+
+        for _, bucket in groupby(rows, key=lambda row: (row[0], row[1])):
+            leader, *others = [row[2] for row in bucket]
+            for other in others:
+                root, other_root = find(leader), find(other)
+                if root == other_root:
+                    continue
+                score = estimate_jaccard(signatures[leader], signatures[other])
+                if score >= threshold:
+                    parents[other_root] = root
+                    similarity[root] = min(
+                        score, similarity.get(root, 1.0), similarity.pop(other_root, 1.0)
+                    )
+
+        clusters = {}
+        for path in parents:
+            clusters.setdefault(find(path), []).append(path)
+        return sorted(
+            (
+                {'paths': sorted(paths), 'similarity': similarity[root]}
+                for root, paths in clusters.items() if len(paths) > 1
+            ),
+            key=lambda cluster: (-len(cluster['paths']), cluster['paths'][0]),
+        )
+
+    def get_notes_by_tag(self, tag: str) -> List[str]:
+        """
+        Retrieve the paths of notes carrying a tag.
+        
+        Args:
+            tag (str): Exact tag, e.g. 'project/alpha'
+            
+        Returns:
+            list: Sorted note paths
+        """
+        query = 'SELECT path FROM note_tags WHERE tag = ? ORDER BY path'
+        return self._fetch_column(query, (tag,), f"notes with tag {tag}")
+
+    def get_notes_by_tag_prefix(self, prefix: str) -> List[str]:
+        """
+        Retrieve the paths of notes carrying a tag or any tag nested under it.
+        
+        Args:
+            prefix (str): Parent tag, e.g. 'project' matches 'project' and 'project/alpha'
+            
+        Returns:
+            list: Sorted, distinct note paths
+        """
+        prefix = prefix.rstrip('/')
+        # '0' sorts right after '/', so this range covers exactly 'prefix/...'
+        query = '''
+            SELECT DISTINCT path FROM note_tags
+            WHERE tag = ? OR (tag >= ? AND tag < ?)
+            ORDER BY path
+        '''
+        params = (prefix, prefix + '/', prefix + '0')
+        return self._fetch_column(query, params, f"notes with tag prefix {prefix}")
+
+    def get_tag_counts(self) -> Dict[str, int]:
+        """
+        Count the notes carrying each tag.
+        
+        Returns:
+            dict: Mapping of tag to number of notes, ordered by tag
+        """
+        query = 'SELECT tag, COUNT(*) FROM note_tags GROUP BY tag ORDER BY tag'
+        try:
+            return {row[0]: row[1] for row in self.conn.execute(query)}
+        except sqlite3.Error as e:
+            logger.error(f"Failed to count tags: {e}")
+            return {}
+
+    def get_outlinks(self, path: str) -> List[Dict]:
+        """
+        Retrieve the links going out of a note.
+        
+        Args:
+            path (str): Path of the linking note
+            
+        Returns:
+            list: Dicts with target, kind, subpath, alias, line and target_path,
+                which is None for links that don't resolve to a note
+        """
+        query = '''
+            SELECT target, kind, subpath, alias, line, target_path FROM links
+            WHERE src_path = ? ORDER BY rowid
+        '''
+        return self._fetch_rows(query, (path,), f"outlinks of {path}")
+
+    def get_backlinks(self, path: str) -> List[Dict]:
+        """
+        Retrieve the links pointing at a note.
+        
+        Args:
+            path (str): Path of the linked note
+            
+        Returns:
+            list: Dicts with src_path, target, kind, subpath, alias and line,
+                ordered by linking note
+        """
+        query = '''
+            SELECT src_path, target, kind, subpath, alias, line FROM links
+            WHERE target_path = ? ORDER BY src_path, rowid
+        '''
+        return self._fetch_rows(query, (path,), f"backlinks of {path}")
+
+    def get_chunks(self, path: str) -> List[Dict]:
+        """
+        Retrieve the heading-delimited chunks of a note.
+        
+        Args:
+            path (str): Path of the note
+            
+        Returns:
+            list: Dicts with ordinal, heading_path (JSON list of the enclosing
+                headings), start, end (offsets into the content), hash and
+                text, in document order
+        """
+        chunks = self._fetch_rows(
+            'SELECT ordinal, heading_path, start, end, hash FROM chunks '
+            'WHERE path = ? ORDER BY ordinal',
+            (path,),
+            f"chunks of {path}",
+        )
+        if chunks:
+            # Chunk text isn't stored; it's a slice of the note content
+            content = self.get_note_content(path) or ''
+            for chunk in chunks:
+                chunk['text'] = content[chunk['start']:chunk['end']]
+        return chunks
+
+    def get_content_hash(self, path: str) -> Optional[str]:
+        """
+        Retrieve the content hash stored for a successfully indexed note.
+        
+        Args:
+            path (str): Path of the note
+            
+        Returns:
+            str: Hex digest, or None if the note isn't indexed or has no hash
+        """
+        query = "SELECT content_hash FROM notes WHERE path = ? AND status = 'success'"
+        try:
+            row = self.conn.execute(query, (path,)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve content hash for {path}: {e}")
+            return None
+
+    def get_indexed_paths(self) -> set:
+        """
+        Retrieve the path of every indexed note, including notes that failed to parse.
+        
+        Returns:
+            set: Note paths
+        """
+        try:
+            return {row[0] for row in self.conn.execute('SELECT path FROM notes')}
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve indexed paths: {e}")
+            return set()
+
+    def get_fingerprints(self) -> Dict[str, Tuple]:
+        """
+        Retrieve the stored file fingerprints of successfully indexed notes.
+        
+        Returns:
+            dict: Mapping of note path to (file_size, mtime_ns, inode)
+        """
+        query = '''
+            SELECT path, file_size, mtime_ns, inode FROM notes
+            WHERE status = 'success'
+        '''
+        try:
+            cursor = self.conn.execute(query)
+            return {row[0]: (row[1], row[2], row[3]) for row in cursor}
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve note fingerprints: {e}")
+            return {}
+
+    def _fetch_column(self, query: str, params: tuple, description: str) -> List:
+        """Run a read query and return its first column as a list."""
+        try:
+            return [row[0] for row in self.conn.execute(query, params)]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve {description}: {e}")
+            return []
+
+    @staticmethod
+    def _note_columns(include_content: bool) -> str:
+        """Select list of the notes columns, reading content from wherever it's stored."""
+        columns = []
+        for column in NOTE_COLUMNS:
+            if column != 'content':
+                columns.append(f'notes.{column}')
+            elif include_content:
+                columns.append(f'{CONTENT_EXPRESSION} AS content')
+        return ', '.join(columns)
+
+    def _fetch_rows(self, query: str, params: tuple, description: str) -> List[Dict]:
+        """Run a read query and return its rows as dicts."""
+        try:
+            return [dict(row) for row in self.conn.execute(query, params)]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to retrieve {description}: {e}")
+            return []
+
+    @staticmethod
+    def _has_path(note_data: Dict) -> bool:
+        """Check that note data carries a path, logging when it doesn't."""
+        if note_data.get('path'):
+            return True
+        logger.error("Cannot process note with empty path")
+        return False
+
+    def _note_params(self, note_data: Dict) -> tuple:
+        """Build the parameters of UPSERT_NOTE_QUERY from note data."""
+        return (
+            note_data.get('path', ''),
+            note_data.get('title', ''),
+            note_data.get('parent_folder', ''),
+            note_data.get('tags', ''),
+            note_data.get('created_date', ''),
+            note_data.get('modified_date', ''),
+            None if self.compress_content else note_data.get('content', ''),
+            note_data.get('status', 'success'),
+            note_data.get('error_message', ''),
+            note_data.get('file_size'),
+            note_data.get('mtime_ns'),
+            note_data.get('inode'),
+            note_data.get('content_hash')
+        )
+
+    def _apply_change(self, change: Tuple) -> None:
+        """Apply one queued change inside the current transaction."""
+        kind = change[0]
+        if kind == CHANGE_UPSERT:
+            self._write_notes([change[1]])
+        elif kind == CHANGE_DELETE:
+            self._remove_note(change[1])
+        elif kind == CHANGE_MOVE:
+            if not self._move_note(change[1], change[2]):
+                logger.warning(f"Note not found for move: {change[1]}")
+        elif kind == CHANGE_MOVE_FOLDER:
+            self._move_folder(change[1], change[2])
+        elif kind == CHANGE_DELETE_FOLDER:
+            self._delete_folder(change[1])
+        elif kind == CHANGE_DELETE_MANY:
+            self._delete_notes(change[1])
+        else:
+            raise ValueError(f"Unknown change kind: {kind}")
+
+    def _write_notes(self, notes: List[Dict], update_search_index: bool = True) -> None:
+        """Write notes inside the current transaction."""
+        self._written_in_transaction += len(notes)
+        paths = [note['path'] for note in notes]
+        new_titles = self._new_note_titles(notes)
+        if self.fts_enabled:
+            # Even when the index is rebuilt afterwards, so it never holds stale rows
+            self.conn.executemany(
+                UNINDEX_SEARCH_QUERY.format(where='path = ?'), [(path,) for path in paths]
+            )
+        self.conn.executemany(UPSERT_NOTE_QUERY, [self._note_params(note) for note in notes])
+        self.conn.executemany(INSERT_CHANGE_QUERY, [(path, CHANGE_UPSERT, None) for path in paths])
+        self.conn.executemany(
+            'DELETE FROM note_tags WHERE path = ?', [(path,) for path in paths]
+        )
+        self.conn.executemany(INSERT_TAG_QUERY, [
+            (note['path'], tag) for note in notes for tag in self._tag_list(note)
+        ])
+        if self.compress_content:
+            self.conn.executemany(UPSERT_CONTENT_QUERY, [
+                (note['path'], compress_content(note.get('content'), self.compression_level))
+                for note in notes
+            ])
+        else:
+            self.conn.executemany(
+                'DELETE FROM note_content WHERE path = ?', [(path,) for path in paths]
+            )
+        self._write_chunks(notes)
+        self._stage_vectors(notes)
+        self._write_minhashes(notes)
+        self.conn.executemany('DELETE FROM links WHERE src_path = ?', [(path,) for path in paths])
+        link_rows = [row for note in notes for row in self._link_rows(note)]
+        self.conn.executemany(INSERT_LINK_QUERY, link_rows)
+        if self.fts_enabled and update_search_index:
+            self.conn.executemany(INDEX_SEARCH_QUERY, [(path,) for path in paths])
+        # New links, and links a new note may now resolve, get their targets
+        self._resolve_links(new_titles | {row[7] for row in link_rows})
+
+    def _write_chunks(self, notes: List[Dict]) -> None:
+        """Bring the chunks of written notes up to date inside the current transaction.
+
+        Stored chunks are matched with the new ones by hash, in document
+        order, so a section added or removed in the middle of a note
+        doesn't touch the ones after it: matched rows are kept and only get
+        their new ordinal and offsets, chunks whose hash is new are
+        inserted, and stored chunks left unmatched are deleted. Notes
+        without 'chunks' lose their stored ones.
+        """
+        stored = self._stored_chunks([note['path'] for note in notes])
+        inserts = []
+        shifts = []
+        reorders = []
+        deletes = []
+        for note in notes:
+            path = note['path']
+            by_hash = {}
+            for rowid, ordinal, chunk_hash, start, end in stored.get(path, ()):
+                by_hash.setdefault(chunk_hash, deque()).append((rowid, ordinal, start, end))
+            for ordinal, (heading_path, start, end, chunk_hash) in enumerate(note.get('chunks') or ()):
+                matches = by_hash.get(chunk_hash)
+                if not matches:
+                    inserts.append((path, ordinal, heading_path, start, end, chunk_hash))
+                    continue
+                rowid, old_ordinal, old_start, old_end = matches.popleft()
+                if old_ordinal != ordinal:
+                    reorders.append((ordinal, start, end, rowid))
+                elif (old_start, old_end) != (start, end):
+                    shifts.append((start, end, rowid))
+            deletes.extend((row[0],) for rows in by_hash.values() for row in rows)
+        self.conn.executemany('DELETE FROM chunks WHERE rowid = ?', deletes)
+        self.conn.executemany('UPDATE chunks SET start = ?, end = ? WHERE rowid = ?', shifts)
+        # Renumbered rows pass through negative ordinals, so no two rows of a
+        # note share an ordinal while the others are being renumbered
+        self.conn.executemany(
+            'UPDATE chunks SET ordinal = -1 - ?, start = ?, end = ? WHERE rowid = ?', reorders
+        )
+        self.conn.executemany(
+            'UPDATE chunks SET ordinal = -1 - ordinal WHERE rowid = ?',
+            [(rowid,) for _, _, _, rowid in reorders],
+        )
+        self.conn.executemany(INSERT_CHUNK_QUERY, inserts)
+        self._chunks_in_transaction += len(inserts)
+
+    def _stored_chunks(self, paths: List[str]) -> Dict[str, List[Tuple]]:
+        """Map each note path to its stored chunks as (rowid, ordinal, hash, start, end) in ordinal order."""
+        stored = {}
+        for row in self._select_paths(
+            'SELECT path, rowid, ordinal, hash, start, end FROM chunks '
+            'WHERE path IN ({}) ORDER BY ordinal',
+            paths,
+        ):
+            stored.setdefault(row[0], []).append(tuple(row[1:]))
+        return stored
+
+    def _write_minhashes(self, notes: List[Dict]) -> None:
+        """Store the MinHash signatures and LSH buckets of written notes inside the current transaction.
+
+        Notes whose signature didn't change keep their rows; notes without
+        one, such as notes that failed to parse, lose them.
+        """
+        stored = dict(self._select_paths(
+            'SELECT path, signature FROM note_minhash WHERE path IN ({})',
+            [note['path'] for note in notes],
+        ))
+        changed = [note for note in notes if note.get('minhash') != stored.get(note['path'])]
+        if not changed:
+            return
+        self.conn.executemany(
+            'DELETE FROM minhash_bands WHERE path = ?', [(note['path'],) for note in changed]
+        )
+        self.conn.executemany('DELETE FROM note_minhash WHERE path = ?', [
+            (note['path'],) for note in changed if not note.get('minhash')
+        ])
+        signed = [note for note in changed if note.get('minhash')]
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO note_minhash (path, signature) VALUES (?, ?)',
+            [(note['path'], note['minhash']) for note in signed],
+        )
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO minhash_bands (band, bucket, path) VALUES (?, ?, ?)',
+            [
+                (band, bucket, note['path'])
+                for note in signed for band, bucket in band_buckets(note['minhash'])
+            ],
+        )
+
+    def _select_paths(self, query: str, paths: List[str]) -> Iterable[tuple]:
+        """Run a query whose 'path IN ({})' placeholder takes the paths, 500 at a time."""
+        for offset in range(0, len(paths), 500):
+            batch = paths[offset:offset + 500]
+            yield from self.conn.execute(query.format(', '.join('?' * len(batch))), batch)
+
+    def _stage_vectors(self, notes: List[Dict]) -> None:
+        """Give each written note a vector row and stage its vector inside the current transaction.
+
+        Notes that failed to parse give up their row.
+        """
+        if self.vectors is None:
+            self._free_vector_rows('path IN ({})'.format(', '.join('?' * len(notes))),
+                                   [note['path'] for note in notes])
+            return
+        started = perf_counter()
+        for note in notes:
+            if note.get('status', 'success') != 'success':
+                self._free_vector_rows('path = ?', (note['path'],))
+                continue
+            vector = self.vectors.vectorize(note.get('content'), note.get('terms'))
+            self.vectors.stage(self._vector_row(note['path']), vector)
+        metrics.observe_stage("vectorize", perf_counter() - started)
+
+    def _vector_row(self, path: str) -> int:
+        """Return the vector row of a note, claiming a free or new one if it has none."""
+        row = self.conn.execute('SELECT row FROM note_vectors WHERE path = ?', (path,)).fetchone()
+        if row:
+            return row[0]
+        row = self.conn.execute('SELECT row FROM note_vectors WHERE path IS NULL LIMIT 1').fetchone()
+        if row:
+            self.conn.execute('UPDATE note_vectors SET path = ? WHERE row = ?', (path, row[0]))
+            return row[0]
+        return self.conn.execute('INSERT INTO note_vectors (path) VALUES (?)', (path,)).lastrowid
+
+    def _free_vector_rows(self, where: str, params) -> None:
+        """Release the vector rows of the notes matching a condition on path, zeroing them."""
+        rows = [row[0] for row in self.conn.execute(
+            f'SELECT row FROM note_vectors WHERE {where}', params
+        )]
+        if not rows:
+            return
+        self.conn.execute(f'UPDATE note_vectors SET path = NULL WHERE {where}', params)
+        if self.vectors is not None:
+            for row in rows:
+                self.vectors.stage(row, None)
+
+    def _remove_note(self, path: str) -> None:
+        """Delete a note inside the current transaction."""
+        row = self.conn.execute('SELECT title FROM notes WHERE path = ?', (path,)).fetchone()
+        if row is not None:
+            self.conn.execute(INSERT_CHANGE_QUERY, (path, CHANGE_DELETE, None))
+        if self.fts_enabled:
+            self.conn.execute(UNINDEX_SEARCH_QUERY.format(where='path = ?'), (path,))
+        self.conn.execute('DELETE FROM note_tags WHERE path = ?', (path,))
+        self.conn.execute('DELETE FROM links WHERE src_path = ?', (path,))
+        self.conn.execute('DELETE FROM note_content WHERE path = ?', (path,))
+        self.conn.execute('DELETE FROM chunks WHERE path = ?', (path,))
+        self.conn.execute('DELETE FROM note_minhash WHERE path = ?', (path,))
+        self.conn.execute('DELETE FROM minhash_bands WHERE path = ?', (path,))
+        self._free_vector_rows('path = ?', (path,))
+        self.conn.execute('DELETE FROM notes WHERE path = ?', (path,))
+        if row is not None:
+            self._resolve_links({self._title_name(row[0])})
+
+    def _move_note(self, old_path: str, new_path: str) -> bool:
+        """Move a note inside the current transaction, returning False if it doesn't exist."""
+        if old_path == new_path:
+            return True
+        row = self.conn.execute('SELECT title FROM notes WHERE path = ?', (old_path,)).fetchone()
+        if not row:
+            return False
+
+        self._remove_note(new_path)
+        if self.fts_enabled:
+            # The title changes with the path
+            self.conn.execute(UNINDEX_SEARCH_QUERY.format(where='path = ?'), (old_path,))
+        self.conn.execute(INSERT_CHANGE_QUERY, (new_path, CHANGE_MOVE, old_path))
+        title, parent_folder = self._path_fields(new_path)
+        self.conn.execute(
+            '''
+            UPDATE notes SET path = ?, title = ?, parent_folder = ?, last_indexed = datetime('now')
+            WHERE path = ?
+            ''',
+            (new_path, title, parent_folder, old_path),
+        )
+        self.conn.execute('UPDATE note_tags SET path = ? WHERE path = ?', (new_path, old_path))
+        self.conn.execute('UPDATE links SET src_path = ? WHERE src_path = ?', (new_path, old_path))
+        self.conn.execute('UPDATE note_content SET path = ? WHERE path = ?', (new_path, old_path))
+        self.conn.execute('UPDATE chunks SET path = ? WHERE path = ?', (new_path, old_path))
+        self.conn.execute('UPDATE note_vectors SET path = ? WHERE path = ?', (new_path, old_path))
+        self.conn.execute('UPDATE note_minhash SET path = ? WHERE path = ?', (new_path, old_path))
+        self.conn.execute('UPDATE minhash_bands SET path = ? WHERE path = ?', (new_path, old_path))
+        if self.fts_enabled:
+            self.conn.execute(INDEX_SEARCH_QUERY, (new_path,))
+        self._resolve_links({self._title_name(row[0]), self._title_name(title)})
+        return True
+
+    def _move_folder(self, old_folder: str, new_folder: str) -> None:
+        """Move all notes below a folder inside the current transaction."""
+        low, high = self._folder_range(old_folder)
+        # Text after the old folder name, including the leading separator
+        suffix_start = len(old_folder) + 1
+
+        # Notes already at the destination paths are replaced, as a file rename would
+        collisions = self.conn.execute(
+            '''
+            SELECT existing.path FROM notes AS moved
+            JOIN notes AS existing ON existing.path = ? || substr(moved.path, ?)
+            WHERE moved.path >= ? AND moved.path < ?
+            ''',
+            (new_folder, suffix_start, low, high),
+        ).fetchall()
+        for row in collisions:
+            self._remove_note(row[0])
+
+        self.conn.execute(
+            '''
+            INSERT INTO changes (path, op, old_path)
+            SELECT ? || substr(path, ?), ?, path FROM notes
+            WHERE path >= ? AND path < ? ORDER BY path
+            ''',
+            (new_folder, suffix_start, CHANGE_MOVE, low, high),
+        )
+        self.conn.execute(
+            'UPDATE note_tags SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?',
+            (new_folder, suffix_start, low, high),
+        )
+        self.conn.execute(
+            'UPDATE links SET src_path = ? || substr(src_path, ?) WHERE src_path >= ? AND src_path < ?',
+            (new_folder, suffix_start, low, high),
+        )
+        self.conn.execute(
+            'UPDATE note_content SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?',
+            (new_folder, suffix_start, low, high),
+        )
+        self.conn.execute(
+            'UPDATE chunks SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?',
+            (new_folder, suffix_start, low, high),
+        )
+        for table in ('note_vectors', 'note_minhash', 'minhash_bands'):
+            self.conn.execute(
+                f'UPDATE {table} SET path = ? || substr(path, ?) WHERE path >= ? AND path < ?',
+                (new_folder, suffix_start, low, high),
+            )
+        cursor = self.conn.execute(
+            '''
+            UPDATE notes SET
+                path = ? || substr(path, ?),
+                parent_folder = ? || substr(parent_folder, ?),
+                last_indexed = datetime('now')
+            WHERE path >= ? AND path < ?
+            ''',
+            (new_folder, suffix_start, new_folder, suffix_start, low, high),
+        )
+        logger.info(f"Moved {cursor.rowcount} notes from {old_folder} to {new_folder}")
+        # Path-qualified and shortest-path links to the moved notes may resolve differently now
+        new_low, new_high = self._folder_range(new_folder)
+        self._resolve_links(self._titles_in_range(new_low, new_high))
+
+    def _delete_folder(self, folder: str) -> None:
+        """Delete all notes below a folder inside the current transaction."""
+        low, high = self._folder_range(folder)
+        titles = self._titles_in_range(low, high)
+        self.conn.execute(
+            'INSERT INTO changes (path, op) '
+            'SELECT path, ? FROM notes WHERE path >= ? AND path < ? ORDER BY path',
+            (CHANGE_DELETE, low, high),
+        )
+        if self.fts_enabled:
+            self.conn.execute(
+                UNINDEX_SEARCH_QUERY.format(where='path >= ? AND path < ?'), (low, high)
+            )
+        self.conn.execute('DELETE FROM note_tags WHERE path >= ? AND path < ?', (low, high))
+        self.conn.execute('DELETE FROM links WHERE src_path >= ? AND src_path < ?', (low, high))
+        self.conn.execute('DELETE FROM note_content WHERE path >= ? AND path < ?', (low, high))
+        self.conn.execute('DELETE FROM chunks WHERE path >= ? AND path < ?', (low, high))
+        self.conn.execute('DELETE FROM note_minhash WHERE path >= ? AND path < ?', (low, high))
+        self.conn.execute('DELETE FROM minhash_bands WHERE path >= ? AND path < ?', (low, high))
+        self._free_vector_rows('path >= ? AND path < ?', (low, high))
+        cursor = self.conn.execute('DELETE FROM notes WHERE path >= ? AND path < ?', (low, high))
+        logger.info(f"Deleted {cursor.rowcount} notes below {folder}")
+        self._resolve_links(titles)
+
+    def _delete_notes(self, paths: List[str]) -> int:
+        """Delete a set of notes inside the current transaction, returning how many existed.
+
+        The paths go into a temporary table so every table is cleaned with
+        one set-based DELETE instead of a statement per note.
+        """
+        self.conn.execute(
+            'CREATE TEMP TABLE IF NOT EXISTS doomed_paths (path TEXT PRIMARY KEY) WITHOUT ROWID'
+        )
+        self.conn.execute('DELETE FROM temp.doomed_paths')
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO temp.doomed_paths (path) VALUES (?)', [(path,) for path in paths]
+        )
+        doomed = 'SELECT path FROM temp.doomed_paths'
+        # Only links that resolved to a deleted note can change target
+        names = [row[0] for row in self.conn.execute(
+            f'SELECT DISTINCT target_name FROM links WHERE target_path IN ({doomed})'
+        )]
+        self.conn.execute(
+            f'INSERT INTO changes (path, op) '
+            f'SELECT path, ? FROM notes WHERE path IN ({doomed}) ORDER BY path',
+            (CHANGE_DELETE,),
+        )
+        if self.fts_enabled:
+            self.conn.execute(UNINDEX_SEARCH_QUERY.format(where=f'path IN ({doomed})'))
+        self.conn.execute(f'DELETE FROM note_tags WHERE path IN ({doomed})')
+        self.conn.execute(f'DELETE FROM links WHERE src_path IN ({doomed})')
+        self.conn.execute(f'DELETE FROM note_content WHERE path IN ({doomed})')
+        self.conn.execute(f'DELETE FROM chunks WHERE path IN ({doomed})')
+        self.conn.execute(f'DELETE FROM note_minhash WHERE path IN ({doomed})')
+        self.conn.execute(f'DELETE FROM minhash_bands WHERE path IN ({doomed})')
+        self._free_vector_rows(f'path IN ({doomed})', ())
+        deleted = self.conn.execute(f'DELETE FROM notes WHERE path IN ({doomed})').rowcount
+        self.conn.execute('DELETE FROM temp.doomed_paths')
+        self._resolve_links(names)
+        return deleted
+
+    def _new_note_titles(self, notes: List[Dict]) -> set:
+        """Link names of the notes in a batch that aren't indexed yet."""
+        paths = [note['path'] for note in notes]
+        existing = set()
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(paths), 500):
+            chunk = paths[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            existing.update(row[0] for row in self.conn.execute(
+                f'SELECT path FROM notes WHERE path IN ({placeholders})', chunk
+            ))
+        return {
+            self._title_name(note.get('title') or self._path_fields(note['path'])[0])
+            for note in notes if note['path'] not in existing
+        }
+
+    def _titles_in_range(self, low: str, high: str) -> set:
+        """Link names of the notes whose paths fall in a folder range."""
+        cursor = self.conn.execute(
+            'SELECT DISTINCT title FROM notes WHERE path >= ? AND path < ?', (low, high)
+        )
+        return {self._title_name(row[0]) for row in cursor}
+
+    def _resolve_links(self, names: Iterable[str]) -> None:
+        """Point every link to the given note names at the note Obsidian would open.
+        
+        Like Obsidian, a link matches notes whose path ends with the link's
+        path, ignoring case and the .md extension, and the shortest such path
+        wins. Links with no match keep a NULL target_path until a note with
+        their name appears.
+        """
+        for name in names:
+            if not name:
+                continue
+            candidates = sorted(
+                (len(path), path, self._link_key(path)[0])
+                for (path,) in self.conn.execute(
+                    'SELECT path FROM notes WHERE title = ? COLLATE NOCASE', (name,)
+                )
+            )
+            keys = [row[0] for row in self.conn.execute(
+                'SELECT DISTINCT target_key FROM links WHERE target_name = ?', (name,)
+            )]
+            for key in keys:
+                target_path = next((
+                    path for _, path, path_key in candidates
+                    if path_key == key or path_key.endswith('/' + key)
+                ), None)
+                self.conn.execute(
+                    '''
+                    UPDATE links SET target_path = ?
+                    WHERE target_name = ? AND target_key = ? AND target_path IS NOT ?
+                    ''',
+                    (target_path, name, key, target_path),
+                )
+
+    @classmethod
+    def _link_rows(cls, note_data: Dict) -> List[tuple]:
+        """Build the parameters of INSERT_LINK_QUERY for a note's extracted links."""
+        rows = []
+        for link in note_data.get('links') or []:
+            key, name = cls._link_key(link['target'])
+            rows.append((
+                note_data['path'], link['target'], link['kind'], link.get('subpath'),
+                link.get('alias'), link.get('line'), key, name,
+            ))
+        return rows
+
+    @staticmethod
+    def _link_key(target: str) -> Tuple[str, str]:
+        """Normalize a link target or note path into a (lookup key, note name) pair.
+        
+        The key is the lowercased path without a note extension, using '/'
+        separators; the name is its last component.
+        """
+        key = target.replace(os.sep, '/').strip('/').lower()
+        for extension in NOTE_EXTENSIONS:
+            if key.endswith(extension):
+                key = key[:-len(extension)]
+                break
+        return key, key.rsplit('/', 1)[-1]
+
+    @staticmethod
+    def _title_name(title: Optional[str]) -> str:
+        """Lowercase a note title into the name links to it are stored under."""
+        return (title or '').lower()
+
+    @staticmethod
+    def _folder_range(folder: str) -> Tuple[str, str]:
+        """Bounds of the paths below a folder, as an index-friendly range.
+        
+        Equivalent to ``path LIKE 'folder/%'`` without LIKE's escaping and
+        case-insensitivity, which keep SQLite from using the primary key index.
+        """
+        folder = folder.rstrip(os.sep)
+        return folder + os.sep, folder + chr(ord(os.sep) + 1)
+
+    @staticmethod
+    def _path_fields(path: str) -> Tuple[str, str]:
+        """Derive a note's title and parent folder from its vault-relative path."""
+        rel_path = Path(path)
+        parent_folder = str(rel_path.parent)
+        return rel_path.stem, "" if parent_folder == "." else parent_folder
+
+    def _vectors_enabled(self) -> bool:
+        """Check that similarity search is available, logging when it isn't."""
+        if self.vectors is not None:
+            return True
+        logger.error("Similarity search needs NumPy and a non-zero vector dimension")
+        return False
+
+    def _similar(self, vector, k: int, exclude: Optional[int] = None) -> List[Dict]:
+        """Score every note vector against a query vector and map the best rows to paths."""
+        try:
+            documents, rows = self.conn.execute(
+                'SELECT COUNT(path), MAX(row) FROM note_vectors'
+            ).fetchone()
+            if not documents:
+                return []
+            scored = self.vectors.top_k(vector, documents, rows, k, exclude)
+            if not scored:
+                return []
+            placeholders = ', '.join('?' * len(scored))
+            paths = dict(self.conn.execute(
+                f'SELECT row, path FROM note_vectors WHERE row IN ({placeholders}) AND path IS NOT NULL',
+                [row for row, _ in scored],
+            ).fetchall())
+        except sqlite3.Error as e:
+            logger.error(f"Similarity search failed: {e}")
+            return []
+        return [{'path': paths[row], 'score': score} for row, score in scored if row in paths]
+
+    def _ensure_vector_index(self) -> None:
+        """Rebuild the note vectors if their file is missing or out of step with the notes.
+
+        Writers that can't maintain the vectors clear note_vectors, so a
+        count that differs from the number of indexed notes means the
+        matrix can't be trusted.
+        """
+        try:
+            notes, mapped = self.conn.execute(
+                "SELECT (SELECT COUNT(*) FROM notes WHERE status = 'success'), "
+                "(SELECT COUNT(path) FROM note_vectors)"
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to check the vector index: {e}")
+            return
+        if notes == mapped and self.vectors.matches_file():
+            return
+        if not notes and not mapped and not os.path.exists(self.vectors.path):
+            # The file is created with the first write
+            return
+        logger.info(f"Building note vectors for {notes} notes in {self.vectors.path}")
+        self.rebuild_vector_index()
+
+    def _rebuild_vector_index(self) -> None:
+        """Refill note_vectors and the vector matrix inside the current transaction."""
+        started = perf_counter()
+        self.conn.execute('DELETE FROM note_vectors')
+        count = self.conn.execute(
+            "SELECT COUNT(*) FROM notes WHERE status = 'success'"
+        ).fetchone()[0]
+        cursor = self.conn.execute(f'''
+            SELECT notes.path, {CONTENT_EXPRESSION} FROM notes
+            LEFT JOIN note_content ON note_content.path = notes.path
+            WHERE notes.status = 'success' ORDER BY notes.path
+        ''')
+
+        def vectors():
+            for row, (path, content) in enumerate(cursor, start=1):
+                self.conn.execute('INSERT INTO note_vectors (row, path) VALUES (?, ?)', (row, path))
+                yield self.vectors.vectorize(content)
+
+        self.vectors.rebuild(vectors(), count)
+        logger.info(f"Built {count} note vectors in {perf_counter() - started:.2f}s")
+
+    def _flush_vectors(self) -> None:
+        """Write the staged vectors before the current transaction commits.
+
+        If the matrix can't be written, note_vectors is cleared so the
+        vectors are rebuilt the next time the database is opened, and the
+        notes themselves are still committed.
+        """
+        try:
+            self.vectors.flush()
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to write note vectors, they will be rebuilt on next open: {e}")
+            self.conn.execute('DELETE FROM note_vectors')
+
+    def _rebuild_search_index(self) -> None:
+        """Refill the full-text index inside the current transaction."""
+        self.conn.execute(REBUILD_SEARCH_INDEX_QUERY)
+
+    @staticmethod
+    def _tag_list(note_data: Dict) -> List[str]:
+        """Decode a note's JSON tag list into tag strings."""
+        try:
+            tags = json.loads(note_data.get('tags') or '[]')
+        except (TypeError, ValueError):
+            return []
+        if not isinstance(tags, list):
+            return []
+        return [str(tag) for tag in tags if tag is not None and not isinstance(tag, (list, dict))]
+
+    def _prune_changes(self, max_age_days: Optional[float] = None) -> int:
+        """Delete change feed entries older than the retention period inside the current transaction.
+
+        Entries are appended in time order, so everything before the first
+        entry young enough to keep is deleted without scanning the rest.
+        """
+        if max_age_days is None:
+            max_age_days = self.change_retention_days
+        self._next_prune = monotonic() + CHANGE_PRUNE_INTERVAL
+        if not max_age_days:
+            return 0
+        deleted = self.conn.execute(
+            '''
+            DELETE FROM changes WHERE seq < COALESCE(
+                (SELECT seq FROM changes WHERE ts >= datetime('now', ?) ORDER BY seq LIMIT 1),
+                (SELECT MAX(seq) + 1 FROM changes))
+            ''',
+            (f'-{float(max_age_days)} days',),
+        ).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} change feed entries older than {max_age_days} days")
+        return deleted
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements in one write transaction.
+
+        The time spent waiting for the lock and running the statements is
+        recorded as the db_write stage, the COMMIT itself as db_commit. Staged
+        note vectors are written to the matrix just before the COMMIT. Once
+        an hour, a transaction that wrote notes also prunes the change feed.
+        """
+        self._written_in_transaction = 0
+        self._chunks_in_transaction = 0
+        if self.vectors is not None:
+            self.vectors.discard()
+        started = perf_counter()
+        with self.conn:
+            self.conn.execute('BEGIN IMMEDIATE')
+            yield self.conn
+            if self.vectors is not None:
+                self._flush_vectors()
+            if self._written_in_transaction and monotonic() >= self._next_prune:
+                self._prune_changes()
+            committing = perf_counter()
+        finished = perf_counter()
+        metrics.observe_stage("db_write", committing - started)
+        metrics.observe_stage("db_commit", finished - committing)
+        metrics.inc("transactions_total")
+        if self._written_in_transaction:
+            metrics.inc("notes_written_total", self._written_in_transaction)
+        if self._chunks_in_transaction:
+            metrics.inc("chunks_written_total", self._chunks_in_transaction)
+
+    def _execute_transaction(self, operation: str, write, *args) -> bool:
+        """Run a write function in its own transaction, logging failures."""
+        try:
+            with self._transaction():
+                write(*args)
                 return True
         except sqlite3.Error as e:
             logger.error(f"Error during {operation}: {e}")
@@ -0,0 +1,157 @@
+"""Streaming read access to the index over a read-only connection."""
+
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence
+
+from .connection import decompress_content
+from .errors import DatabaseError
+from .operations import CONTENT_EXPRESSION, NOTE_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Notes fetched per query while iterating
+DEFAULT_PAGE_SIZE = 500
+
+# Columns returned when a caller asks for metadata only
+METADATA_COLUMNS = tuple(column for column in NOTE_COLUMNS if column != 'content')
+
+
+class NoteReader:
+    """Iterates over indexed notes page by page on its own read-only connection.
+
+    Pages are fetched with keyset pagination on ``path``, so each page is a
+    short, index-ordered query no matter how far into the vault it is, and
+    the writer never waits on a long-running read.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open a read-only connection to an existing index.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+
+        Raises:
+            DatabaseError: If the database can't be opened
+        """
+        self.db_path = db_path
+        try:
+            uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+            self.conn = sqlite3.connect(uri, uri=True, timeout=30.0, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.create_function('decompress', 1, decompress_content, deterministic=True)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open read-only connection to {db_path}: {e}")
+            raise DatabaseError(f"Read-only connection failed: {e}")
+
+    def iter_notes(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        parent_folder: Optional[str] = None,
+        include_subfolders: bool = False,
+        status: Optional[str] = None,
+        modified_after: Optional[str] = None,
+        modified_before: Optional[str] = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Yield notes ordered by path, fetching one page at a time.
+
+        Args:
+            columns (sequence, optional): Columns to return; 'path' is always
+                included. Defaults to every column, content included. Use
+                METADATA_COLUMNS to skip content.
+            parent_folder (str, optional): Only notes directly in this folder;
+                '' selects notes at the vault root
+            include_subfolders (bool): Also include notes in folders below parent_folder
+            status (str, optional): Only notes with this status, e.g. 'error'
+            modified_after (str, optional): Only notes modified at or after this ISO timestamp
+            modified_before (str, optional): Only notes modified before this ISO timestamp
+            page_size (int): Notes fetched per query
+
+        Yields:
+            dict: One note per row
+
+        Raises:
+            ValueError: If an unknown column is requested
+        """
+        select = self._select_list(columns)
+        joins = ''
+        if columns is None or 'content' in columns:
+            joins = ' LEFT JOIN note_content ON note_content.path = notes.path'
+
+        filters = []
+        params = []
+        if parent_folder is not None:
+            folder = parent_folder.rstrip(os.sep)
+            if include_subfolders and folder:
+                filters.append('(notes.parent_folder = ? OR '
+                               '(notes.parent_folder >= ? AND notes.parent_folder < ?))')
+                params += [folder, folder + os.sep, folder + chr(ord(os.sep) + 1)]
+            elif not include_subfolders:
+                filters.append('notes.parent_folder = ?')
+                params.append(folder)
+        if status is not None:
+            filters.append('notes.status = ?')
+            params.append(status)
+        if modified_after is not None:
+            filters.append('notes.modified_date >= ?')
+            params.append(modified_after)
+        if modified_before is not None:
+            filters.append('notes.modified_date < ?')
+            params.append(modified_before)
+
+        where = ''.join(f' AND {condition}' for condition in filters)
+        query = (
+            f'SELECT {select} FROM notes{joins} WHERE notes.path > ?{where} '
+            'ORDER BY notes.path LIMIT ?'
+        )
+
+        last_path = ''
+        while True:
+            try:
+                rows = self.conn.execute(query, [last_path, *params, page_size]).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to read notes after {last_path!r}: {e}")
+                raise DatabaseError(f"Note iteration failed: {e}")
+            for row in rows:
+                yield dict(row)
+            if len(rows) < page_size:
+                return
+            last_path = rows[-1]['path']
+
+    def close(self) -> None:
+        """Close the read-only connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    @staticmethod
+    def _select_list(columns: Optional[Sequence[str]]) -> str:
+        """Build the select list for the requested columns."""
+        if columns is None:
+            columns = NOTE_COLUMNS
+        unknown = [column for column in columns if column not in NOTE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown note columns: {', '.join(unknown)}")
+
+        selected = ['notes.path']
+        for column in columns:
+            if column == 'path':
+                continue
+            if column == 'content':
+                selected.append(f'{CONTENT_EXPRESSION} AS content')
+            else:
+                selected.append(f'notes.{column}')
+        return ', '.join(selected)
+
+    def __enter__(self):
+        """Support for context manager protocol."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Ensure connection is closed when using context manager."""
+        self.close()
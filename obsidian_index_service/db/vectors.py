@@ -0,0 +1,241 @@
+"""Hashed TF-IDF note vectors in a memory-mapped NumPy matrix."""
+
+import logging
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # similarity search is an optional feature
+    np = None
+
+from obsidian_index_service.note_processor.terms import hash_terms, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Hash buckets per vector; 0 disables the vector index
+DEFAULT_VECTOR_DIM = 1024
+
+# Rows scored per matrix product, which bounds the memory a query needs
+SCORE_BLOCK_ROWS = 8192
+
+# Rows the matrix file is created with; it doubles whenever it fills up
+INITIAL_CAPACITY = 1024
+
+
+def vectors_available() -> bool:
+    """Return True if NumPy is installed, which the vector index needs."""
+    return np is not None
+
+
+def vector_file_path(db_path: str) -> str:
+    """Path of the vector matrix stored next to a database, like its -wal file."""
+    return f"{db_path}-vectors.npy"
+
+
+class VectorIndex:
+    """Term vectors of notes, one row each, in a matrix file next to the database.
+
+    Rows hold sublinear term frequencies (1 + log tf) hashed into dim
+    buckets, with the top bit of the hash as a sign so colliding terms tend
+    to cancel rather than add up. Row 0 holds how many rows have a non-zero
+    value in each bucket: the document frequencies the IDF weights are
+    computed from at query time, so the weights stay exact as notes come
+    and go. Which note owns
+    which row is kept in the note_vectors table by NoteOperations; rows of
+    deleted notes are zeroed and reused.
+
+    Writes are staged while a transaction runs and written to the matrix
+    by flush() just before it commits. The file only grows by replacing it
+    with a larger copy, so other processes notice the new inode and remap.
+    """
+
+    def __init__(self, path: str, dim: int = DEFAULT_VECTOR_DIM):
+        """
+        Initialize the index without opening the file.
+
+        Args:
+            path (str): Path of the .npy matrix file
+            dim (int): Hash buckets per vector
+        """
+        self.path = path
+        self.dim = dim
+        self._matrix = None
+        self._inode = None
+        self._pending: Dict[int, Optional["np.ndarray"]] = {}
+
+    def close(self) -> None:
+        """Unmap the matrix file."""
+        self._matrix = None
+        self._inode = None
+
+    def vectorize(self, text: str, terms: Optional[Tuple] = None) -> "np.ndarray":
+        """
+        Turn text into a hashed term-frequency vector.
+
+        Args:
+            text (str): Note content or query text
+            terms (tuple, optional): hash_terms() of the text's words, if the
+                parser already computed them
+
+        Returns:
+            np.ndarray: float32 vector of length dim
+        """
+        hashes, weights = terms if terms is not None else hash_terms(tokenize(text))
+        hashes = np.frombuffer(hashes, dtype=np.uint32)
+        weights = np.frombuffer(weights, dtype=np.float32)
+        signed = np.where(hashes & 0x80000000, -weights, weights)
+        return np.bincount(hashes % self.dim, signed, minlength=self.dim).astype(np.float32)
+
+    def matches_file(self) -> bool:
+        """Return True if the matrix file exists and has this index's dimension."""
+        matrix = self._map()
+        return matrix is not None and matrix.shape[1] == self.dim
+
+    def stage(self, row: int, vector: Optional["np.ndarray"]) -> None:
+        """Queue a row to be written by the next flush; None clears it."""
+        self._pending[row] = vector
+
+    def discard(self) -> None:
+        """Forget the staged rows of a transaction that is rolled back."""
+        self._pending = {}
+
+    def flush(self) -> None:
+        """Write the staged rows to the matrix and update the document frequencies."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        matrix = self._writable(max(pending) + 1)
+        rows = np.fromiter(pending, dtype=np.intp, count=len(pending))
+        new = np.zeros((len(rows), self.dim), dtype=np.float32)
+        for i, vector in enumerate(pending.values()):
+            if vector is not None:
+                new[i] = vector
+        df = matrix[0] - np.count_nonzero(matrix[rows], axis=0) + np.count_nonzero(new, axis=0)
+        matrix[rows] = new
+        matrix[0] = df
+        matrix.flush()
+
+    def rebuild(self, vectors: Iterable["np.ndarray"], count: int) -> None:
+        """
+        Replace the matrix file with one holding the given vectors in rows 1..count.
+
+        Args:
+            vectors (iterable): Vectors in row order
+            count (int): Number of vectors
+        """
+        self.discard()
+        temp_path = f"{self.path}.tmp"
+        matrix = np.lib.format.open_memmap(
+            temp_path, mode="w+", dtype=np.float32,
+            shape=(max(INITIAL_CAPACITY, count + 1), self.dim),
+        )
+        df = np.zeros(self.dim, dtype=np.int64)
+        for row, vector in enumerate(vectors, start=1):
+            matrix[row] = vector
+            df += vector != 0
+        matrix[0] = df
+        matrix.flush()
+        del matrix
+        os.replace(temp_path, self.path)
+        self.close()
+
+    def vector(self, row: int) -> Optional["np.ndarray"]:
+        """Return a copy of a stored row, or None if it's beyond the matrix."""
+        matrix = self._map()
+        if matrix is None or row >= len(matrix):
+            return None
+        return np.array(matrix[row])
+
+    def top_k(
+        self,
+        query: "np.ndarray",
+        documents: int,
+        rows: int,
+        k: int,
+        exclude: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Score rows against a query by TF-IDF cosine similarity.
+
+        The rows are scored a block at a time with one matrix product per
+        block, keeping only each block's k best candidates.
+
+        Args:
+            query (np.ndarray): Term-frequency vector from vectorize()
+            documents (int): Number of notes with a vector, for the IDF weights
+            rows (int): Highest row number in use
+            k (int): Number of results
+            exclude (int, optional): Row left out, e.g. the query note's own
+
+        Returns:
+            list: (row, score) pairs with a positive score, best first
+        """
+        matrix = self._map()
+        if matrix is None or k <= 0:
+            return []
+        idf = (np.log((1.0 + documents) / (1.0 + matrix[0])) + 1.0).astype(np.float32)
+        weighted = query * idf
+        norm = np.linalg.norm(weighted)
+        if not norm:
+            return []
+        # Weighting the query twice instead of every row leaves the rows as they
+        # are on disk: row . (idf * idf * query) is the weighted dot product
+        weighted *= idf / norm
+        idf_squared = idf * idf
+
+        candidates = []
+        end = min(rows + 1, len(matrix))
+        for start in range(1, end, SCORE_BLOCK_ROWS):
+            block = matrix[start:min(start + SCORE_BLOCK_ROWS, end)]
+            norms = np.sqrt(np.einsum("ij,ij,j->i", block, block, idf_squared))
+            scores = np.divide(
+                block @ weighted, norms, out=np.zeros(len(block), dtype=np.float32), where=norms > 0
+            )
+            if exclude is not None and start <= exclude < start + len(block):
+                scores[exclude - start] = 0.0
+            best = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+            candidates.extend(
+                (start + int(i), float(scores[i])) for i in best if scores[i] > 0
+            )
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        return candidates[:k]
+
+    def _map(self) -> Optional["np.ndarray"]:
+        """Map the matrix file, remapping if another process replaced it."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            self.close()
+            return None
+        if self._matrix is None or inode != self._inode:
+            try:
+                self._matrix = np.load(self.path, mmap_mode="r+")
+            except PermissionError:
+                # Read-only mounts can still search
+                self._matrix = np.load(self.path, mmap_mode="r")
+            self._inode = inode
+        return self._matrix
+
+    def _writable(self, rows: int) -> "np.ndarray":
+        """Map the matrix for writing, creating or growing it to hold at least rows rows."""
+        matrix = self._map()
+        if matrix is not None and matrix.shape[1] != self.dim:
+            raise ValueError(
+                f"Vector file {self.path} has dimension {matrix.shape[1]}, expected {self.dim}"
+            )
+        if matrix is None or len(matrix) < rows:
+            capacity = max(INITIAL_CAPACITY, rows, 2 * len(matrix) if matrix is not None else 0)
+            temp_path = f"{self.path}.tmp"
+            grown = np.lib.format.open_memmap(
+                temp_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim)
+            )
+            if matrix is not None:
+                grown[:len(matrix)] = matrix
+            grown.flush()
+            del grown
+            os.replace(temp_path, self.path)
+            if matrix is not None:
+                logger.info(f"Grew vector file {self.path} to {capacity} rows")
+            matrix = self._map()
+        return matrix
@@ -0,0 +1,357 @@
+"""Dedicated writer thread that group-commits queued note changes."""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+from .operations import (
+    CHANGE_DELETE,
+    CHANGE_DELETE_FOLDER,
+    CHANGE_DELETE_MANY,
+    CHANGE_MOVE,
+    CHANGE_MOVE_FOLDER,
+    CHANGE_UPSERT,
+    DEFAULT_BATCH_SIZE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of changes waiting for the writer before producers block
+DEFAULT_QUEUE_SIZE = 1000
+
+
+def _change_paths(change):
+    """Return the (note paths, folder paths) a change touches."""
+    kind = change[0]
+    if kind == CHANGE_UPSERT:
+        return (change[1]["path"],), ()
+    if kind == CHANGE_DELETE:
+        return (change[1],), ()
+    if kind == CHANGE_MOVE:
+        return (change[1], change[2]), ()
+    if kind == CHANGE_MOVE_FOLDER:
+        return (), (change[1], change[2])
+    if kind == CHANGE_DELETE_FOLDER:
+        return (), (change[1],)
+    if kind == CHANGE_DELETE_MANY:
+        return tuple(change[1]), ()
+    return (), ()
+
+
+class DatabaseWriter:
+    """Serializes all index writes through one thread and one connection.
+
+    Producers call ``insert_or_update_note``, ``delete_note`` or ``move_note``,
+    which queue the change and return. The writer thread takes everything queued, up to
+    ``max_batch_size`` changes, and commits it as one transaction. When the
+    queue is full, producers block until the writer catches up; how often and
+    how long that happens is reported by ``stats``.
+
+    Background work such as the initial scan goes through
+    ``submit_background`` into a second queue that is only drained while no
+    live change is waiting. Each background change carries the ``mark()``
+    taken before its file was read; if a live change touched the same path,
+    or a folder above it, after that mark, the background change is stale
+    and is dropped instead of overwriting newer data.
+    """
+
+    def __init__(
+        self, database, max_queue_size=DEFAULT_QUEUE_SIZE, max_batch_size=DEFAULT_BATCH_SIZE
+    ):
+        """Initialize the writer.
+
+        Args:
+            database: Database whose file the writer opens its own connection to
+            max_queue_size (int): Changes that may be queued before producers block
+            max_batch_size (int): Maximum changes committed in one transaction
+        """
+        self.database = database
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self._queue = deque()
+        self._background = deque()
+        self._background_producers = 0
+        # Sequence number of the last live change, and the last one touching each path
+        self._live_sequence = 0
+        self._live_paths = {}
+        self._live_folders = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._writer_db = None
+        self._stats = {
+            "queued_changes": 0,
+            "committed_changes": 0,
+            "failed_changes": 0,
+            "batches": 0,
+            "max_queue_depth": 0,
+            "blocked_submits": 0,
+            "blocked_seconds": 0.0,
+            "background_queued": 0,
+            "background_committed": 0,
+            "background_stale": 0,
+        }
+
+    def start(self):
+        """Open the writer's connection and start the writer thread."""
+        if self._thread is not None:
+            return
+        self._writer_db = self.database.clone()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="database-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Database writer started (queue size {self.max_queue_size})")
+
+    def stop(self):
+        """Commit everything still queued, then stop the thread and close its connection."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join()
+        self._thread = None
+        self._writer_db.close()
+        self._writer_db = None
+        logger.info(f"Database writer stopped: {self.stats()}")
+
+    def insert_or_update_note(self, note_data: Dict) -> bool:
+        """
+        Queue a note to be inserted or updated.
+
+        Args:
+            note_data (dict): Note metadata with required 'path' key
+
+        Returns:
+            bool: True once the change is queued
+        """
+        if not note_data.get("path"):
+            logger.error("Cannot process note with empty path")
+            return False
+        return self.submit((CHANGE_UPSERT, note_data))
+
+    def delete_note(self, path: str) -> bool:
+        """
+        Queue a note to be deleted.
+
+        Args:
+            path (str): Path of the note to delete
+
+        Returns:
+            bool: True once the change is queued
+        """
+        if not path:
+            logger.error("Cannot delete note with empty path")
+            return False
+        return self.submit((CHANGE_DELETE, path))
+
+    def move_note(self, old_path: str, new_path: str) -> bool:
+        """
+        Queue a note to be moved in place.
+
+        Args:
+            old_path (str): Current path of the note
+            new_path (str): Path the note was moved to
+
+        Returns:
+            bool: True once the change is queued
+        """
+        if not old_path or not new_path:
+            logger.error("Cannot move note with empty path")
+            return False
+        return self.submit((CHANGE_MOVE, old_path, new_path))
+
+    def move_folder(self, old_folder: str, new_folder: str) -> bool:
+        """
+        Queue every note below a folder to be moved.
+
+        Args:
+            old_folder (str): Vault-relative folder that was moved
+            new_folder (str): Vault-relative folder it was moved to
+
+        Returns:
+            bool: True once the change is queued
+        """
+        if not old_folder or not new_folder:
+            logger.error("Cannot move folder with empty path")
+            return False
+        return self.submit((CHANGE_MOVE_FOLDER, old_folder, new_folder))
+
+    def delete_folder(self, folder: str) -> bool:
+        """
+        Queue every note below a folder to be deleted.
+
+        Args:
+            folder (str): Vault-relative folder that was deleted
+
+        Returns:
+            bool: True once the change is queued
+        """
+        if not folder:
+            logger.error("Cannot delete folder with empty path")
+            return False
+        return self.submit((CHANGE_DELETE_FOLDER, folder))
+
+    def submit(self, change: Tuple) -> bool:
+        """Queue a live change, blocking while the queue is full.
+
+        Args:
+            change (tuple): Change tuple accepted by NoteOperations.apply_changes
+
+        Returns:
+            bool: True once the change is queued, False if the writer is not running
+        """
+        with self._condition:
+            if len(self._queue) >= self.max_queue_size:
+                started = time.monotonic()
+                self._stats["blocked_submits"] += 1
+                while self._running and len(self._queue) >= self.max_queue_size:
+                    self._condition.wait()
+                self._stats["blocked_seconds"] += time.monotonic() - started
+            if not self._running:
+                logger.error(f"Database writer is not running, dropping {change[0]} change")
+                return False
+            self._queue.append(change)
+            if self._background_producers or self._background:
+                self._record_live(change)
+            self._stats["queued_changes"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._queue))
+            self._condition.notify_all()
+        return True
+
+    def begin_background(self):
+        """Register a background producer; live changes are tracked until it finishes."""
+        with self._condition:
+            self._background_producers += 1
+
+    def end_background(self):
+        """Unregister a background producer."""
+        with self._condition:
+            self._background_producers -= 1
+            self._forget_live()
+
+    def mark(self):
+        """Return a token for data read from now on, to pass to submit_background.
+
+        Returns:
+            int: Sequence number of the last live change
+        """
+        with self._condition:
+            return self._live_sequence
+
+    def submit_background(self, change: Tuple, since: int) -> bool:
+        """Queue a low-priority change, blocking while the background queue is full.
+
+        Args:
+            change (tuple): Change tuple accepted by NoteOperations.apply_changes
+            since (int): mark() taken before the data in the change was read
+
+        Returns:
+            bool: True once the change is queued, False if the writer is not running
+        """
+        with self._condition:
+            while self._running and len(self._background) >= self.max_queue_size:
+                self._condition.wait()
+            if not self._running:
+                logger.error(
+                    f"Database writer is not running, dropping background {change[0]} change"
+                )
+                return False
+            self._background.append((since, change))
+            self._stats["background_queued"] += 1
+            self._condition.notify_all()
+        return True
+
+    def stats(self):
+        """Return queue and commit counters.
+
+        Returns:
+            dict: Counters including the current queue_depth
+        """
+        with self._condition:
+            return dict(
+                self._stats,
+                queue_depth=len(self._queue),
+                background_queue_depth=len(self._background),
+            )
+
+    def _run(self):
+        """Commit queued changes in groups until stopped and drained."""
+        while True:
+            with self._condition:
+                while self._running and not self._queue and not self._background:
+                    self._condition.wait()
+                if self._queue:
+                    batch = [
+                        self._queue.popleft()
+                        for _ in range(min(len(self._queue), self.max_batch_size))
+                    ]
+                    background = False
+                elif self._background:
+                    batch = self._take_background()
+                    background = True
+                else:
+                    return
+                self._condition.notify_all()
+
+            committed = 0
+            if batch:
+                try:
+                    committed = self._writer_db.apply_changes(batch)
+                except Exception as e:
+                    logger.error(f"Database writer failed to apply {len(batch)} changes: {e}")
+
+            with self._condition:
+                if batch:
+                    self._stats["batches"] += 1
+                self._stats["failed_changes"] += len(batch) - committed
+                if background:
+                    self._stats["background_committed"] += committed
+                    self._forget_live()
+                else:
+                    self._stats["committed_changes"] += committed
+
+    def _take_background(self):
+        """Pop a batch of background changes, dropping those a live change made stale."""
+        batch = []
+        while self._background and len(batch) < self.max_batch_size:
+            since, change = self._background.popleft()
+            if change[0] == CHANGE_DELETE_MANY:
+                paths = [path for path in change[1] if not self._touched_since(path, since)]
+                self._stats["background_stale"] += len(change[1]) - len(paths)
+                if paths:
+                    batch.append((CHANGE_DELETE_MANY, paths))
+                continue
+            paths, folders = _change_paths(change)
+            if any(self._touched_since(path, since) for path in paths + folders):
+                self._stats["background_stale"] += 1
+                continue
+            batch.append(change)
+        return batch
+
+    def _record_live(self, change):
+        """Remember which paths a live change touched, for the staleness check."""
+        self._live_sequence += 1
+        paths, folders = _change_paths(change)
+        for path in paths:
+            self._live_paths[path] = self._live_sequence
+        for folder in folders:
+            self._live_folders[folder.rstrip(os.sep) + os.sep] = self._live_sequence
+
+    def _touched_since(self, path, since):
+        """Check whether a live change touched a path, or a folder above it, after a mark."""
+        if self._live_paths.get(path, -1) > since:
+            return True
+        return any(
+            sequence > since and path.startswith(folder)
+            for folder, sequence in self._live_folders.items()
+        )
+
+    def _forget_live(self):
+        """Drop the live change history once no background work can be stale."""
+        if not self._background_producers and not self._background:
+            self._live_paths.clear()
+            self._live_folders.clear()
@@ -0,0 +1,278 @@
+"""Debouncing queue that coalesces bursts of file system events per path."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Final actions dispatched for a path once its events have settled
+UPSERT = "upsert"
+DELETE = "delete"
+MOVE = "move"
+MOVE_FOLDER = "move_folder"
+DELETE_FOLDER = "delete_folder"
+
+
+def _rebase(path, old_folder, new_folder):
+    """Return path re-rooted from old_folder to new_folder, or None if it isn't below it."""
+    if path is None or old_folder not in path.parents:
+        return None
+    return new_folder / path.relative_to(old_folder)
+
+
+class _PendingAction:
+    """The action a path will get once its quiet window expires."""
+
+    __slots__ = ("kind", "src_path", "first_seen", "last_seen")
+
+    def __init__(self, kind, src_path, now):
+        self.kind = kind
+        self.src_path = src_path
+        self.first_seen = now
+        self.last_seen = now
+
+
+class CoalescingEventQueue:
+    """Collapses file system events for the same path into one final action.
+
+    Watchdog callbacks call ``put`` and return immediately. A dispatcher thread
+    hands each path's action to ``dispatch`` once no new event arrived for it
+    within the quiet window, or once it has waited ``max_delay_seconds``.
+    ``dispatch`` is called as ``dispatch(kind, path, src_path)`` where
+    ``src_path`` is only set for moves.
+
+    Folder moves and deletes absorb the pending actions of the paths below
+    them. A folder move is always dispatched before the actions it re-keys,
+    so the index already holds the moved notes when those actions run.
+    """
+
+    def __init__(self, dispatch, quiet_seconds=0.5, max_delay_seconds=None):
+        """Initialize the event queue.
+
+        Args:
+            dispatch (callable): Called with (kind, path, src_path) for each settled action
+            quiet_seconds (float): Time without new events before a path is dispatched
+            max_delay_seconds (float, optional): Upper bound on how long a busy path
+                is held back. Defaults to ten quiet windows.
+        """
+        self.dispatch = dispatch
+        self.quiet_seconds = quiet_seconds
+        self.max_delay_seconds = (
+            max_delay_seconds if max_delay_seconds is not None else quiet_seconds * 10
+        )
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.raw_events = 0
+        self.absorbed_events = 0
+        self.dispatched_actions = 0
+
+    def put(self, kind, path, src_path=None):
+        """Record a raw event, merging it with any pending action for the path.
+
+        Args:
+            kind (str): UPSERT, DELETE, MOVE, MOVE_FOLDER or DELETE_FOLDER
+            path (Path): Path the event applies to (the destination for moves)
+            src_path (Path, optional): Source path of a move
+        """
+        now = time.monotonic()
+        with self._condition:
+            self.raw_events += 1
+            if kind == MOVE:
+                self._put_move(src_path, path, now)
+            elif kind == MOVE_FOLDER:
+                self._put_folder_move(src_path, path, now)
+            elif kind == DELETE_FOLDER:
+                self._put_folder_delete(path, now)
+            else:
+                self._put_simple(kind, path, now)
+            self._condition.notify()
+
+    def _put_simple(self, kind, path, now):
+        """Merge an upsert or delete into the pending action for a path."""
+        pending = self._pending.get(path)
+        if pending is None:
+            self._pending[path] = _PendingAction(kind, None, now)
+            return
+
+        self.absorbed_events += 1
+        pending.last_seen = now
+        if kind == DELETE:
+            if pending.kind == MOVE:
+                # The moved note is gone, so its old path must be removed too
+                self._replace(pending.src_path, _PendingAction(DELETE, None, now))
+            pending.kind = DELETE
+            pending.src_path = None
+        elif pending.kind == DELETE:
+            pending.kind = UPSERT
+        # An upsert after an upsert or a move is covered by the pending action
+
+    def _put_move(self, src_path, dest_path, now):
+        """Merge a move into the pending actions of its source and destination."""
+        origin = src_path
+        kind = MOVE
+        first_seen = now
+
+        previous = self._pending.pop(src_path, None)
+        if previous is not None:
+            self.absorbed_events += 1
+            first_seen = previous.first_seen
+            if previous.kind == MOVE:
+                origin = previous.src_path
+            elif previous.kind == DELETE:
+                kind = UPSERT
+                origin = None
+
+        replaced = self._pending.pop(dest_path, None)
+        if replaced is not None:
+            self.absorbed_events += 1
+            if (
+                replaced.kind == MOVE
+                and replaced.src_path != origin
+                and replaced.src_path not in self._pending
+            ):
+                # The note moved there first is overwritten, so its old path must be removed
+                self._pending[replaced.src_path] = _PendingAction(DELETE, None, now)
+
+        if origin == dest_path:
+            # Renamed back to where it started
+            kind, origin = UPSERT, None
+
+        action = _PendingAction(kind, origin, now)
+        action.first_seen = first_seen
+        self._pending[dest_path] = action
+
+    def _put_folder_move(self, src_folder, dest_folder, now):
+        """Record a folder move and re-key the pending actions below it."""
+        origin = src_folder
+        previous = self._pending.get(src_folder)
+        if previous is not None and previous.kind == MOVE_FOLDER:
+            del self._pending[src_folder]
+            self.absorbed_events += 1
+            origin = previous.src_path
+
+        if origin != dest_folder:
+            self._pending[dest_folder] = _PendingAction(MOVE_FOLDER, origin, now)
+
+        # Re-queued behind the folder move, and not due before it
+        for path, pending in list(self._pending.items()):
+            new_path = _rebase(path, src_folder, dest_folder)
+            if new_path is None:
+                continue
+            del self._pending[path]
+            self.absorbed_events += 1
+            pending.src_path = _rebase(pending.src_path, src_folder, dest_folder) or pending.src_path
+            pending.first_seen = pending.last_seen = now
+            self._pending[new_path] = pending
+
+    def _put_folder_delete(self, folder, now):
+        """Record a folder delete, dropping the pending actions below it."""
+        for path, pending in list(self._pending.items()):
+            if path != folder and folder not in path.parents:
+                continue
+            del self._pending[path]
+            self.absorbed_events += 1
+            moved_in = pending.kind in (MOVE, MOVE_FOLDER) and not (
+                pending.src_path == folder or folder in pending.src_path.parents
+            )
+            if moved_in:
+                # The index still has the notes at the path they were moved from
+                kind = DELETE if pending.kind == MOVE else DELETE_FOLDER
+                self._replace(pending.src_path, _PendingAction(kind, None, now))
+        self._pending[folder] = _PendingAction(DELETE_FOLDER, None, now)
+
+    def _replace(self, path, action):
+        """Set the pending action for a path, counting any action it overrides."""
+        if path in self._pending:
+            self.absorbed_events += 1
+            del self._pending[path]
+        self._pending[path] = action
+
+    def start(self):
+        """Start the dispatcher thread."""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="event-queue-dispatcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Event queue started with a {self.quiet_seconds}s quiet window")
+
+    def stop(self):
+        """Stop the dispatcher thread after dispatching everything still pending."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+        logger.info(f"Event queue stopped: {self.stats()}")
+
+    def flush(self):
+        """Dispatch every pending action immediately."""
+        with self._condition:
+            ready = list(self._pending.items())
+            self._pending.clear()
+        self._dispatch_all(ready)
+
+    def stats(self):
+        """Return event counters.
+
+        Returns:
+            dict: raw_events, absorbed_events, dispatched_actions and pending counts
+        """
+        with self._condition:
+            return {
+                "raw_events": self.raw_events,
+                "absorbed_events": self.absorbed_events,
+                "dispatched_actions": self.dispatched_actions,
+                "pending": len(self._pending),
+            }
+
+    def _run(self):
+        """Dispatch settled actions until stopped."""
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                ready, timeout = self._collect_ready(time.monotonic())
+                if not ready:
+                    self._condition.wait(timeout)
+                    continue
+            self._dispatch_all(ready)
+
+    def _collect_ready(self, now):
+        """Pop actions whose quiet window or maximum delay has expired.
+
+        Returns:
+            tuple: (ready actions, seconds until the next action is due)
+        """
+        ready = []
+        next_due = None
+        for path, pending in list(self._pending.items()):
+            due = min(
+                pending.last_seen + self.quiet_seconds,
+                pending.first_seen + self.max_delay_seconds,
+            )
+            if due <= now:
+                ready.append((path, self._pending.pop(path)))
+            elif next_due is None or due < next_due:
+                next_due = due
+        timeout = None if next_due is None else next_due - now
+        return ready, timeout
+
+    def _dispatch_all(self, ready):
+        """Hand settled actions to the dispatch callback."""
+        for path, pending in ready:
+            try:
+                self.dispatch(pending.kind, path, pending.src_path)
+            except Exception as e:
+                logger.error(f"Error handling {pending.kind} event for {path}: {e}")
+            with self._condition:
+                self.dispatched_actions += 1
@@ -1,114 +1,369 @@
 """Event handlers for file system events in the Obsidian vault."""
 
 import logging
+import time
+from collections import OrderedDict
 from pathlib import Path
 from watchdog.events import FileSystemEventHandler
 
+from obsidian_index_service.metrics import RateMeter, metrics
+from obsidian_index_service.note_processor.file_utils import compute_content_hash
+from obsidian_index_service.note_processor.logging_config import log_note
+
+from .event_queue import (
+    DELETE,
+    DELETE_FOLDER,
+    MOVE,
+    MOVE_FOLDER,
+    UPSERT,
+    CoalescingEventQueue,
+)
 from .logging_config import configure_logging
 
 logger = logging.getLogger(__name__)
 
+# Number of recently written content hashes remembered by the handler
+HASH_CACHE_SIZE = 10000
+
+# How long per-file events that a folder move or delete already covers are ignored
+FOLDER_EVENT_WINDOW_SECONDS = 5.0
+
 class VaultEventHandler(FileSystemEventHandler):
     """Event handler for Obsidian vault file system events."""
-    
-    def __init__(self, note_processor, database):
+
+    def __init__(self, note_processor, database, debounce_seconds=None, writer=None):
         """Initialize the vault event handler.
-        
+
         Args:
             note_processor: The note processor to use for processing files
             database: The database to store note metadata
+            debounce_seconds (float, optional): Quiet window used to coalesce bursts of
+                events for the same path. When set, watchdog callbacks only enqueue and
+                the queue's dispatcher thread does the parsing. None handles every
+                event in the calling thread.
+            writer (DatabaseWriter, optional): Writer that index changes are queued to
+                instead of being written to the database directly
         """
         self.note_processor = note_processor
         self.database = database
+        self.writer = writer or database
+        self.event_queue = None
+        # Hashes of the notes this handler queued last, which may not be committed yet
+        self._recent_hashes = OrderedDict()
+        self.hash_hits = 0
+        self.hash_misses = 0
+        self.renames = 0
+        self.suppressed_events = 0
+        # Recent folder moves (src -> (dest, expiry)) and deletes (folder -> expiry)
+        self._folder_moves = {}
+        self._folder_deletes = {}
+        # Raw events per second, exposed as a gauge by the file watcher
+        self.event_rate = RateMeter()
+        if debounce_seconds is not None:
+            self.event_queue = CoalescingEventQueue(self.handle_action, debounce_seconds)
         super().__init__()
-        
+
     def on_created(self, event):
         """Handle file creation events.
-        
+
         Args:
             event: The file system event
         """
+        self._count_event(event)
         if event.is_directory:
             return
-            
+
         file_path = Path(event.src_path)
+        if self.note_processor.is_ignored(file_path):
+            return
         if self.note_processor.is_markdown_file(file_path):
-            logger.info(f"New file created: {file_path}")
-            metadata = self.note_processor.process_file(file_path)
-            if metadata:
-                success = self.database.insert_or_update_note(metadata)
-                if not success:
-                    logger.error(f"Failed to index new file: {file_path}")
-    
+            log_note(logger, "New file created: %s", file_path)
+            self._submit(UPSERT, file_path)
+
     def on_modified(self, event):
         """Handle file modification events.
-        
+
         Args:
             event: The file system event
         """
+        self._count_event(event)
         if event.is_directory:
             return
-            
+
         file_path = Path(event.src_path)
+        if self.note_processor.is_ignored(file_path):
+            return
         if self.note_processor.is_markdown_file(file_path):
-            logger.info(f"File modified: {file_path}")
-            metadata = self.note_processor.process_file(file_path)
-            if metadata:
-                success = self.database.insert_or_update_note(metadata)
-                if not success:
-                    logger.error(f"Failed to update index for modified file: {file_path}")
-    
+            log_note(logger, "File modified: %s", file_path)
+            self._submit(UPSERT, file_path)
+
     def on_deleted(self, event):
-        """Handle file deletion events.
-        
+        """Handle file and folder deletion events.
+
+        A folder delete removes every note below it in one statement; the
+        per-file delete events it covers are ignored.
+
         Args:
             event: The file system event
         """
-        if event.is_directory:
+        self._count_event(event)
+        self._handle_deleted(Path(event.src_path), event.is_directory)
+
+    def _handle_deleted(self, file_path, is_directory):
+        """Remove a deleted file or folder from the index."""
+        if self.note_processor.is_ignored(file_path, is_directory):
             return
-            
-        file_path = Path(event.src_path)
+        if self._covered_by_folder_delete(file_path):
+            self.suppressed_events += 1
+            return
+
+        if is_directory:
+            logger.info(f"Folder deleted: {file_path}")
+            self._folder_deletes[file_path] = time.monotonic() + FOLDER_EVENT_WINDOW_SECONDS
+            self._submit(DELETE_FOLDER, file_path)
+            return
+
         if self.note_processor.is_markdown_file(file_path):
-            try:
-                # Get relative path to delete from database
-                rel_path = file_path.relative_to(self.note_processor.vault_path)
-                logger.info(f"File deleted: {rel_path}")
-                success = self.database.delete_note(str(rel_path))
-                if not success:
-                    logger.error(f"Failed to remove deleted file from index: {rel_path}")
-            except ValueError:
-                logger.error(f"Error determining relative path for deleted file: {file_path}")
-    
+            log_note(logger, "File deleted: %s", file_path)
+            self._submit(DELETE, file_path)
+
     def on_moved(self, event):
-        """Handle file move/rename events.
-        
+        """Handle file and folder move/rename events.
+
+        A folder move rewrites the paths of every note below it in one
+        statement; the per-file move events it covers are ignored. Moving
+        into an ignored folder, such as Obsidian's trash, counts as a delete
+        and moving out of one as a create.
+
         Args:
             event: The file system event
         """
-        if event.is_directory:
-            return
-            
+        self._count_event(event)
         src_path = Path(event.src_path)
         dest_path = Path(event.dest_path)
-        
+        src_ignored = self.note_processor.is_ignored(src_path, event.is_directory)
+        dest_ignored = self.note_processor.is_ignored(dest_path, event.is_directory)
+        if src_ignored and dest_ignored:
+            return
+        if dest_ignored:
+            self._handle_deleted(src_path, event.is_directory)
+            return
+        if src_ignored:
+            # A folder's notes arrive as their own move events
+            if not event.is_directory and self.note_processor.is_markdown_file(dest_path):
+                log_note(logger, "File moved into the vault: %s", dest_path)
+                self._submit(UPSERT, dest_path)
+            return
+
+        if self._covered_by_folder_move(src_path, dest_path):
+            self.suppressed_events += 1
+            return
+
+        if event.is_directory:
+            logger.info(f"Folder moved/renamed: {src_path} -> {dest_path}")
+            expiry = time.monotonic() + FOLDER_EVENT_WINDOW_SECONDS
+            self._folder_moves[src_path] = (dest_path, expiry)
+            self._submit(MOVE_FOLDER, dest_path, src_path)
+            return
+
         # Only process markdown files
         if self.note_processor.is_markdown_file(src_path) or self.note_processor.is_markdown_file(dest_path):
-            try:
-                # Get relative path to delete old entry
-                rel_src_path = src_path.relative_to(self.note_processor.vault_path)
-                logger.info(f"File moved/renamed: {rel_src_path} -> {dest_path}")
-                
-                # Delete old entry
-                delete_success = self.database.delete_note(str(rel_src_path))
-                if not delete_success:
-                    logger.error(f"Failed to delete old path during move: {rel_src_path}")
-                
-                # Process and add new entry if destination is still a markdown file
-                if self.note_processor.is_markdown_file(dest_path):
-                    metadata = self.note_processor.process_file(dest_path)
-                    if metadata:
-                        insert_success = self.database.insert_or_update_note(metadata)
-                        if not insert_success:
-                            logger.error(f"Failed to add new path during move: {dest_path}")
-            except ValueError as e:
-                logger.error(f"Error handling moved file: {e}") 
\ No newline at end of file
+            log_note(logger, "File moved/renamed: %s -> %s", src_path, dest_path)
+            self._submit(MOVE, dest_path, src_path)
+
+    def _count_event(self, event):
+        """Record a raw event in the metrics."""
+        metrics.inc("file_events_total", type=event.event_type)
+        self.event_rate.mark()
+
+    def _covered_by_folder_move(self, src_path, dest_path):
+        """Check whether a move event repeats part of a recent folder move."""
+        now = time.monotonic()
+        for folder, (dest_folder, expiry) in list(self._folder_moves.items()):
+            if expiry < now:
+                del self._folder_moves[folder]
+            elif folder in src_path.parents and dest_path == dest_folder / src_path.relative_to(folder):
+                return True
+        return False
+
+    def _covered_by_folder_delete(self, path):
+        """Check whether a delete event falls below a recently deleted folder."""
+        now = time.monotonic()
+        for folder, expiry in list(self._folder_deletes.items()):
+            if expiry < now:
+                del self._folder_deletes[folder]
+            elif folder in path.parents:
+                return True
+        return False
+
+    def _submit(self, kind, path, src_path=None):
+        """Queue an action for coalescing, or handle it now when debouncing is off."""
+        if self.event_queue:
+            self.event_queue.put(kind, path, src_path)
+        else:
+            self.handle_action(kind, path, src_path)
+
+    def handle_action(self, kind, path, src_path=None):
+        """Apply a settled action to the index.
+
+        Args:
+            kind (str): UPSERT, DELETE, MOVE, MOVE_FOLDER or DELETE_FOLDER
+            path (Path): Path the action applies to (the destination for moves)
+            src_path (Path, optional): Source path of a move
+        """
+        if kind == UPSERT:
+            self._index_file(path)
+        elif kind == DELETE:
+            self._remove_file(path)
+        elif kind == MOVE:
+            self._move_file(src_path, path)
+        elif kind == MOVE_FOLDER:
+            self._move_folder(src_path, path)
+        elif kind == DELETE_FOLDER:
+            self._remove_folder(path)
+
+    def _index_file(self, file_path):
+        """Parse a file and insert or update its note, unless its bytes are unchanged."""
+        try:
+            rel_path = str(file_path.relative_to(self.note_processor.vault_path))
+            raw = file_path.read_bytes()
+        except (OSError, ValueError):
+            # Let the processor record the failure as an error note
+            raw = None
+
+        if raw is not None:
+            if self._indexed_hash(rel_path) == compute_content_hash(raw):
+                self.hash_hits += 1
+                logger.debug(f"Content unchanged, skipping: {file_path}")
+                return
+            self.hash_misses += 1
+
+        metadata = self.note_processor.process_file(file_path, raw=raw)
+        if metadata:
+            success = self.writer.insert_or_update_note(metadata)
+            if success:
+                self._remember_hash(metadata["path"], metadata.get("content_hash"))
+            else:
+                logger.error(f"Failed to update index for file: {file_path}")
+
+    def _indexed_hash(self, rel_path):
+        """Return the content hash of a note as last queued or committed."""
+        if rel_path in self._recent_hashes:
+            self._recent_hashes.move_to_end(rel_path)
+            return self._recent_hashes[rel_path]
+        return self.database.get_content_hash(rel_path)
+
+    def _remember_hash(self, rel_path, content_hash):
+        """Record the hash of a queued note so later events compare against it."""
+        self._recent_hashes[rel_path] = content_hash
+        self._recent_hashes.move_to_end(rel_path)
+        if len(self._recent_hashes) > HASH_CACHE_SIZE:
+            self._recent_hashes.popitem(last=False)
+
+    def _remove_file(self, file_path):
+        """Remove a deleted file's note from the index."""
+        try:
+            # Get relative path to delete from database
+            rel_path = file_path.relative_to(self.note_processor.vault_path)
+            success = self.writer.delete_note(str(rel_path))
+            self._remember_hash(str(rel_path), None)
+            if not success:
+                logger.error(f"Failed to remove deleted file from index: {rel_path}")
+        except ValueError:
+            logger.error(f"Error determining relative path for deleted file: {file_path}")
+
+    def _move_file(self, src_path, dest_path):
+        """Move a note to its new path, re-parsing only if its content changed."""
+        try:
+            vault_path = self.note_processor.vault_path
+            rel_src_path = str(src_path.relative_to(vault_path))
+            rel_dest_path = str(dest_path.relative_to(vault_path))
+        except ValueError as e:
+            logger.error(f"Error handling moved file: {e}")
+            return
+
+        src_is_note = self.note_processor.is_markdown_file(src_path)
+        dest_is_note = self.note_processor.is_markdown_file(dest_path)
+
+        # A pure rename keeps the bytes, so the stored row can be moved as-is
+        if src_is_note and dest_is_note:
+            indexed_hash = self._indexed_hash(rel_src_path)
+            raw = self._read_bytes(dest_path) if indexed_hash else None
+            if raw is not None and compute_content_hash(raw) == indexed_hash:
+                if self.writer.move_note(rel_src_path, rel_dest_path):
+                    self._remember_hash(rel_src_path, None)
+                    self._remember_hash(rel_dest_path, indexed_hash)
+                    self.renames += 1
+                    return
+                logger.error(f"Failed to move note: {rel_src_path} -> {rel_dest_path}")
+
+        # Otherwise delete the old entry and index the destination from scratch
+        if src_is_note:
+            delete_success = self.writer.delete_note(rel_src_path)
+            self._remember_hash(rel_src_path, None)
+            if not delete_success:
+                logger.error(f"Failed to delete old path during move: {rel_src_path}")
+
+        if dest_is_note:
+            metadata = self.note_processor.process_file(dest_path)
+            if metadata:
+                insert_success = self.writer.insert_or_update_note(metadata)
+                self._remember_hash(metadata["path"], metadata.get("content_hash"))
+                if not insert_success:
+                    logger.error(f"Failed to add new path during move: {dest_path}")
+
+    def _move_folder(self, src_folder, dest_folder):
+        """Move every note below a folder to its new location."""
+        try:
+            vault_path = self.note_processor.vault_path
+            rel_src = src_folder.relative_to(vault_path)
+            rel_dest = dest_folder.relative_to(vault_path)
+        except ValueError as e:
+            logger.error(f"Error handling moved folder: {e}")
+            return
+
+        if not self.writer.move_folder(str(rel_src), str(rel_dest)):
+            logger.error(f"Failed to move folder in index: {rel_src} -> {rel_dest}")
+            return
+        for path in [p for p in self._recent_hashes if rel_src in Path(p).parents]:
+            new_path = str(rel_dest / Path(path).relative_to(rel_src))
+            self._remember_hash(new_path, self._recent_hashes.pop(path))
+
+    def _remove_folder(self, folder):
+        """Remove every note below a deleted folder from the index."""
+        try:
+            rel_folder = folder.relative_to(self.note_processor.vault_path)
+        except ValueError:
+            logger.error(f"Error determining relative path for deleted folder: {folder}")
+            return
+
+        if not self.writer.delete_folder(str(rel_folder)):
+            logger.error(f"Failed to remove deleted folder from index: {rel_folder}")
+            return
+        for path in [p for p in self._recent_hashes if rel_folder in Path(p).parents]:
+            self._remember_hash(path, None)
+
+    @staticmethod
+    def _read_bytes(file_path):
+        """Read a file's bytes, returning None if it can't be read."""
+        try:
+            return file_path.read_bytes()
+        except OSError:
+            return None
+
+    def stats(self):
+        """Return event counters of the coalescing queue and the content hash check.
+
+        Returns:
+            dict: Queue counters (when debouncing is on) plus hash_hits, hash_misses,
+                renames handled without re-parsing and suppressed_events covered by
+                folder moves or deletes
+        """
+        stats = self.event_queue.stats() if self.event_queue else {}
+        stats.update(
+            hash_hits=self.hash_hits,
+            hash_misses=self.hash_misses,
+            renames=self.renames,
+            suppressed_events=self.suppressed_events,
+        )
+        return stats
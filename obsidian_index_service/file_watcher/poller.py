@@ -0,0 +1,390 @@
+"""Polling watcher for vaults on file systems that deliver no inotify events."""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from time import perf_counter
+
+from watchdog.events import (
+    DirDeletedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from obsidian_index_service.metrics import metrics
+from obsidian_index_service.note_processor.file_utils import is_markdown_file
+
+logger = logging.getLogger(__name__)
+
+# How the file watcher learns about changes; "auto" polls only where inotify can't work
+WATCH_MODES = ("auto", "events", "polling")
+
+# Seconds between polls
+DEFAULT_POLL_INTERVAL = 2.0
+
+# Files stat'ed per poll to catch in-place edits, which don't change their folder's mtime
+DEFAULT_STAT_BUDGET = 20000
+
+# File system types whose changes, made by the host or another client, raise
+# no inotify events inside the container or on this machine
+POLLING_FILESYSTEMS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "vboxsf", "prl_fs",
+    "fakeowner", "fuse.grpcfuse", "fuse.osxfs", "fuse.sshfs",
+})
+
+MOUNTS_PATH = "/proc/mounts"
+
+# A folder modified this recently may change again within the same mtime
+# tick, so it is listed again on the next poll
+RACY_SECONDS = 2.0
+
+
+def detect_watch_mode(vault_path, mounts_path=MOUNTS_PATH):
+    """Choose between inotify events and polling for a vault.
+
+    Args:
+        vault_path (str or Path): Vault directory
+        mounts_path (str): Mount table to read, /proc/mounts on Linux
+
+    Returns:
+        str: "polling" if the vault is on a network or host-shared file
+            system, otherwise "events"
+    """
+    vault = os.path.realpath(vault_path)
+    mount_point, fs_type = "", None
+    try:
+        with open(mounts_path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return "events"
+
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        # Spaces and other special characters are octal-escaped
+        point = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1])
+        inside = vault == point or vault.startswith(point.rstrip("/") + "/")
+        # The last of several mounts on the same point is the visible one
+        if inside and len(point) >= len(mount_point):
+            mount_point, fs_type = point, fields[2]
+
+    if fs_type in POLLING_FILESYSTEMS:
+        logger.info(f"Vault is on {fs_type} at {mount_point}, which raises no inotify events")
+        return "polling"
+    return "events"
+
+
+class _Folder:
+    """Snapshot of one folder: its own mtime and inode, its notes and its subfolders."""
+
+    __slots__ = ("mtime_ns", "inode", "files", "subdirs")
+
+    def __init__(self, inode):
+        # None forces the folder to be listed on the next poll
+        self.mtime_ns = None
+        self.inode = inode
+        # Note name -> (mtime_ns, size, inode)
+        self.files = {}
+        self.subdirs = set()
+
+
+class _Diff:
+    """Changes found by one poll, as vault-relative posix paths."""
+
+    def __init__(self):
+        self.added = {}
+        self.removed = {}
+        self.modified = []
+        self.new_folders = []
+        self.removed_folders = {}
+        self.moved_folders = []
+
+
+class VaultPoller:
+    """Finds vault changes by polling and feeds them to an event handler.
+
+    Keeps a snapshot of every folder (mtime, inode, subfolders) and note
+    (mtime, size, inode). Each poll stats every folder but lists only those
+    whose mtime changed, since creating, deleting or renaming an entry
+    updates its folder. In-place edits don't, so a rotating share of at
+    most ``stat_budget`` notes is stat'ed per poll as well. Notes and
+    folders that disappear and reappear with the same inode are reported
+    as moves.
+
+    The differences are dispatched as watchdog events, so they take the
+    same path through VaultEventHandler as inotify events. Has the
+    start/stop/join interface of a watchdog Observer.
+    """
+
+    def __init__(
+        self,
+        vault_path,
+        event_handler,
+        ignore_matcher=None,
+        interval=DEFAULT_POLL_INTERVAL,
+        stat_budget=DEFAULT_STAT_BUDGET,
+    ):
+        """Initialize the poller without taking a snapshot.
+
+        Args:
+            vault_path (str or Path): Vault directory
+            event_handler (FileSystemEventHandler): Receives the changes found
+            ignore_matcher (IgnoreMatcher, optional): Rules for paths to leave out
+            interval (float): Seconds between polls
+            stat_budget (int): Notes in unchanged folders stat'ed per poll
+        """
+        self.vault_path = str(vault_path)
+        self.event_handler = event_handler
+        self.ignore_matcher = ignore_matcher
+        self.interval = interval
+        self.stat_budget = stat_budget
+        self.racy_ns = int(RACY_SECONDS * 1e9)
+        self._folders = {}
+        # Notes in the order they are stat'ed for in-place edits
+        self._stat_queue = deque()
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.events = 0
+        self.last_poll_seconds = 0.0
+
+    def start(self):
+        """Take the initial snapshot and poll in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vault-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the polling thread to stop."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        """Wait for the polling thread to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poll(self, emit=True):
+        """Compare the vault with the snapshot and dispatch the differences.
+
+        Args:
+            emit (bool): Dispatch events; False only updates the snapshot
+
+        Returns:
+            int: Number of events dispatched
+        """
+        started = perf_counter()
+        diff = _Diff()
+        self._walk("", diff)
+
+        # A folder that appeared with the inode of one that disappeared was moved
+        while diff.new_folders:
+            rel, inode = diff.new_folders.pop()
+            old_rel = diff.removed_folders.pop(inode, None)
+            if old_rel is not None:
+                self._rebase(old_rel, rel)
+                diff.moved_folders.append((old_rel, rel))
+            else:
+                self._folders[rel] = _Folder(inode)
+            self._walk(rel, diff)
+        for rel in diff.removed_folders.values():
+            self._drop(rel)
+
+        self._stat_files(diff)
+        events = self._events(diff)
+        if emit:
+            for event in events:
+                self.event_handler.dispatch(event)
+
+        self.polls += 1
+        self.last_poll_seconds = perf_counter() - started
+        metrics.observe_stage("poll", self.last_poll_seconds)
+        if emit:
+            self.events += len(events)
+            return len(events)
+        return 0
+
+    def stats(self):
+        """Return snapshot and poll counters.
+
+        Returns:
+            dict: Folders and notes tracked, polls run, events dispatched and
+                the duration of the last poll
+        """
+        return {
+            "folders": len(self._folders),
+            "files": sum(len(folder.files) for folder in self._folders.values()),
+            "polls": self.polls,
+            "events": self.events,
+            "last_poll_seconds": self.last_poll_seconds,
+        }
+
+    def _run(self):
+        """Snapshot the vault, then poll every interval until stopped."""
+        try:
+            self.poll(emit=False)
+        except Exception as e:
+            logger.error(f"Initial vault snapshot failed: {e}")
+        stats = self.stats()
+        logger.info(
+            f"Polling {stats['files']} notes in {stats['folders']} folders every {self.interval}s "
+            f"(snapshot took {stats['last_poll_seconds']:.2f}s)"
+        )
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Vault poll failed: {e}")
+
+    def _walk(self, rel, diff):
+        """Check a folder and the known folders below it."""
+        pending = [rel]
+        while pending:
+            self._check_folder(pending.pop(), diff, pending)
+
+    def _check_folder(self, rel, diff, pending):
+        """List a folder again if its mtime changed, recording what changed in it."""
+        folder = self._folders.get(rel)
+        path = self._path(rel)
+        try:
+            stats = os.stat(path)
+        except OSError:
+            # Its parent's listing reports it as removed
+            return
+        if folder is None:
+            folder = self._folders[rel] = _Folder(stats.st_ino)
+        if folder.mtime_ns == stats.st_mtime_ns and folder.inode == stats.st_ino:
+            pending.extend(self._child(rel, name) for name in folder.subdirs)
+            return
+
+        files = {}
+        subdirs = set()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    child = self._child(rel, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.ignore_matcher is None or not self.ignore_matcher.matches(child, is_dir=True):
+                            subdirs.add(entry.name)
+                            if entry.name not in folder.subdirs:
+                                inode = entry.stat(follow_symlinks=False).st_ino
+                                diff.new_folders.append((child, inode))
+                            else:
+                                pending.append(child)
+                        continue
+                    if not is_markdown_file(entry.name):
+                        continue
+                    if self.ignore_matcher is not None and self.ignore_matcher.matches(child):
+                        continue
+                    try:
+                        entry_stats = entry.stat()
+                    except OSError:
+                        # Gone since the listing, or a broken symlink
+                        continue
+                    files[entry.name] = (entry_stats.st_mtime_ns, entry_stats.st_size, entry_stats.st_ino)
+        except OSError as e:
+            # Keep the old listing and try again on the next poll
+            logger.error(f"Error listing folder {path}: {e}")
+            return
+
+        for name, state in files.items():
+            known = folder.files.get(name)
+            if known is None:
+                diff.added[self._child(rel, name)] = state[2]
+                self._stat_queue.append(self._child(rel, name))
+            elif known != state:
+                diff.modified.append(self._child(rel, name))
+        for name in folder.files.keys() - files.keys():
+            diff.removed[self._child(rel, name)] = folder.files[name][2]
+        for name in folder.subdirs - subdirs:
+            child = self._child(rel, name)
+            known = self._folders.get(child)
+            diff.removed_folders[known.inode if known else child] = child
+
+        folder.files = files
+        folder.subdirs = subdirs
+        folder.inode = stats.st_ino
+        # An entry added later within the same mtime tick would go unnoticed
+        recent = time.time_ns() - stats.st_mtime_ns < self.racy_ns
+        folder.mtime_ns = None if recent else stats.st_mtime_ns
+
+    def _stat_files(self, diff):
+        """Stat the next notes in the rotation to catch in-place edits."""
+        for _ in range(min(self.stat_budget, len(self._stat_queue))):
+            rel = self._stat_queue.popleft()
+            folder_rel, _, name = rel.rpartition("/")
+            folder = self._folders.get(folder_rel)
+            known = folder.files.get(name) if folder is not None else None
+            if known is None:
+                # Deleted or moved since it was queued
+                continue
+            self._stat_queue.append(rel)
+            try:
+                stats = os.stat(self._path(rel))
+            except OSError:
+                # Its folder's listing reports it as removed
+                continue
+            state = (stats.st_mtime_ns, stats.st_size, stats.st_ino)
+            if state != known:
+                folder.files[name] = state
+                diff.modified.append(rel)
+
+        # Paths removed and added again are queued twice; start over once that adds up
+        tracked = sum(len(folder.files) for folder in self._folders.values())
+        if len(self._stat_queue) > 2 * tracked + 1000:
+            self._stat_queue = deque(
+                self._child(rel, name) for rel, folder in self._folders.items() for name in folder.files
+            )
+
+    def _events(self, diff):
+        """Turn a diff into watchdog events, matching removed and added notes by inode."""
+        events = [
+            DirMovedEvent(self._path(old_rel), self._path(rel)) for old_rel, rel in diff.moved_folders
+        ]
+        events += [DirDeletedEvent(self._path(rel)) for rel in diff.removed_folders.values()]
+
+        removed_by_inode = {inode: rel for rel, inode in diff.removed.items()}
+        created = []
+        for rel, inode in diff.added.items():
+            old_rel = removed_by_inode.pop(inode, None)
+            if old_rel is not None:
+                events.append(FileMovedEvent(self._path(old_rel), self._path(rel)))
+            else:
+                created.append(FileCreatedEvent(self._path(rel)))
+        events += [FileDeletedEvent(self._path(rel)) for rel in removed_by_inode.values()]
+        events += created
+        events += [FileModifiedEvent(self._path(rel)) for rel in diff.modified]
+        return events
+
+    def _rebase(self, old_rel, new_rel):
+        """Move the snapshot of a folder and everything below it to a new path."""
+        prefix = old_rel + "/"
+        for rel in [rel for rel in self._folders if rel == old_rel or rel.startswith(prefix)]:
+            folder = self._folders.pop(rel)
+            rebased = new_rel + rel[len(old_rel):]
+            self._folders[rebased] = folder
+            self._stat_queue.extend(self._child(rebased, name) for name in folder.files)
+
+    def _drop(self, rel):
+        """Forget a removed folder and everything below it."""
+        prefix = rel + "/"
+        for known in [known for known in self._folders if known == rel or known.startswith(prefix)]:
+            del self._folders[known]
+
+    def _path(self, rel):
+        """Absolute path of a vault-relative posix path."""
+        return os.path.join(self.vault_path, *rel.split("/")) if rel else self.vault_path
+
+    @staticmethod
+    def _child(rel, name):
+        """Vault-relative posix path of an entry in a folder."""
+        return f"{rel}/{name}" if rel else name
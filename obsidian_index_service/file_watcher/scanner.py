@@ -1,63 +1,369 @@
 """Scans Obsidian vault for existing files and indexes them."""
 
 import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from time import perf_counter
+from obsidian_index_service.metrics import metrics
 from obsidian_index_service.note_processor.processor import NoteProcessor
+from obsidian_index_service.note_processor.file_utils import file_fingerprint
+from obsidian_index_service.note_processor.logging_config import (
+    note_log_settings,
+    set_note_log_mode,
+)
 from obsidian_index_service.db.database import Database
+from obsidian_index_service.db.operations import (
+    CHANGE_DELETE_MANY,
+    CHANGE_UPSERT,
+    DEFAULT_BATCH_SIZE,
+)
 from .logging_config import configure_logging
 
 logger = logging.getLogger(__name__)
 
+# Number of files handed to a worker process at a time in parallel scans
+DEFAULT_CHUNK_SIZE = 64
+
+# Stale paths listed at INFO after reconciliation; the rest are logged at DEBUG
+RECONCILE_LOG_LIMIT = 20
+
+# Niceness added to worker processes of a background scan so live parsing wins the CPU
+BACKGROUND_NICENESS = 10
+
+# Start method of scan worker processes. A background scan starts them while the
+# watcher's threads run, and a child forked while one of them holds a lock, such
+# as the metrics lock _init_worker takes, deadlocks. The fork server is started
+# without those threads and imports this module once for all workers.
+WORKER_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Note processor owned by each worker process of a parallel scan
+_worker_processor = None
+
+
+def _init_worker(vault_path, note_log, niceness=0):
+    """Create the note processor used by a scan worker process.
+
+    Args:
+        vault_path (Path): Root path of the vault
+        note_log (tuple): (mode, sample_every) per-note logging settings
+        niceness (int): Amount to lower the process priority by
+    """
+    global _worker_processor
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+    set_note_log_mode(*note_log)
+    # Figures inherited from the parent would otherwise be merged back twice
+    metrics.reset()
+    _worker_processor = NoteProcessor(vault_path)
+
+
+def _process_chunk(chunk):
+    """Process a chunk of files inside a scan worker process.
+
+    Args:
+        chunk (list): (file_path, stats) tuples
+
+    Returns:
+        tuple: (metadata list in input order, metrics recorded while parsing)
+    """
+    results = [_worker_processor.process_file(file_path, stats) for file_path, stats in chunk]
+    return results, metrics.drain()
+
 
 class VaultScanner:
     """Scans an Obsidian vault for markdown files to index."""
 
-    def __init__(self, note_processor: NoteProcessor, database: Database):
+    def __init__(
+        self,
+        note_processor: NoteProcessor,
+        database: Database,
+        batch_size=DEFAULT_BATCH_SIZE,
+        workers=1,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        rebuild_search_index=False,
+    ):
         """Initialize the vault scanner.
 
         Args:
             note_processor: The note processor to use for processing files
             database: The database to store note metadata
+            batch_size (int): Number of notes written per database transaction
+            workers (int): Number of processes parsing notes; 1 parses in-process
+            chunk_size (int): Number of files sent to a worker process at a time
+            rebuild_search_index (bool): Skip per-note full-text index updates and
+                rebuild the whole index once after the scan instead
         """
         self.note_processor = note_processor
         self.database = database
+        self.batch_size = batch_size
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.rebuild_search_index = rebuild_search_index
+        # Paths removed by the last scan's reconciliation
+        self.removed_paths = []
+        # Writer of the running background scan, and the mark taken for each file
+        self._writer = None
+        self._marks = {}
+        self._cancelled = threading.Event()
 
-    def scan_existing_files(self):
-        """Scan existing files in the vault and add them to the database.
+    def scan_existing_files(self, writer=None):
+        """Scan existing files in the vault and add new or changed ones to the database.
+
+        The vault is walked once, lazily, skipping folders matched by the note
+        processor's ignore rules. Files whose size, mtime and inode match the fingerprint stored at the last
+        index are skipped without being read or parsed. Changed files are parsed,
+        across ``workers`` processes when more than one is configured, and the
+        results are written from this process in batches of ``batch_size``.
+        Finally, notes deleted or renamed while the service was down, which the
+        walk never saw, are removed in one transaction and listed in
+        ``removed_paths``.
+
+        Args:
+            writer (DatabaseWriter, optional): Queue results to this writer as
+                background work, behind live changes, instead of writing them
+                directly. Results a live change has since made stale are dropped.
 
         Returns:
-            tuple: (processed_files, total_files, error_files)
+            tuple: (processed_files, total_files, error_files, skipped_files, parsed_files)
+                where processed_files is the number of notes written to the database,
+                or queued to the writer
         """
         vault_path = self.note_processor.vault_path
         logger.info(f"Scanning existing files in {vault_path}")
 
-        # Get all markdown files
-        markdown_files = list(vault_path.glob("**/*.md")) + list(vault_path.glob("**/*.markdown"))
-        total_files = len(markdown_files)
+        self._cancelled.clear()
+        self._writer = writer
+        if writer is not None:
+            writer.begin_background()
+        try:
+            return self._scan(writer)
+        finally:
+            if writer is not None:
+                writer.end_background()
+            self._writer = None
+            self._marks = {}
+
+    def cancel(self):
+        """Stop a running scan after the file it is on; nothing is removed from the index."""
+        self._cancelled.set()
+
+    def _scan(self, writer):
+        """Run the scan for scan_existing_files."""
+        counts = {"total": 0, "changed": 0, "unseen": set(), "unreadable": []}
+        if writer is not None:
+            counts["since"] = writer.mark()
         processed_files = 0
         error_files = 0
+        parsed_files = 0
+        batch = []
+
+        for metadata in self._process_files(self._find_changed_files(counts)):
+            if self._cancelled.is_set():
+                break
+            parsed_files += 1
+            if metadata:
+                batch.append(metadata)
+
+            if len(batch) >= self.batch_size:
+                written = self._write_batch(batch)
+                processed_files += written
+                error_files += len(batch) - written
+                batch = []
+                logger.info(f"Indexed {processed_files} changed files")
+
+        if self._cancelled.is_set():
+            logger.info(f"Scan cancelled after indexing {processed_files} changed files")
+            self.removed_paths = []
+            return processed_files, counts["total"], error_files, 0, parsed_files
+
+        if batch:
+            written = self._write_batch(batch)
+            processed_files += written
+            error_files += len(batch) - written
+
+        total_files = counts["total"]
+        skipped_files = total_files - counts["changed"]
+        logger.info(f"Found {total_files} markdown files, {skipped_files} unchanged")
 
-        logger.info(f"Found {total_files} markdown files to index")
-
-        for file_path in markdown_files:
-            try:
-                metadata = self.note_processor.process_file(file_path)
-                if metadata:
-                    success = self.database.insert_or_update_note(metadata)
-                    if success:
-                        processed_files += 1
-                    else:
-                        error_files += 1
-                        logger.error(f"Failed to index file during initial scan: {file_path}")
-
-                    # Log progress periodically
-                    if processed_files % 100 == 0 or processed_files == total_files:
-                        logger.info(f"Indexed {processed_files}/{total_files} files")
-            except Exception as e:
-                logger.error(f"Error processing file during initial scan: {file_path}, Error: {e}")
-                error_files += 1
+        self.removed_paths = self._reconcile(counts)
+
+        # Changes queued to a writer keep the search index in sync as they commit
+        if self.rebuild_search_index and writer is None and (processed_files or self.removed_paths):
+            logger.info("Rebuilding full-text search index")
+            if not self.database.rebuild_search_index():
+                logger.error("Failed to rebuild full-text search index after scan")
 
         logger.info(
-            f"Initial scan complete. Successfully indexed {processed_files} files. Errors: {error_files}"
+            f"Initial scan complete. Successfully indexed {processed_files} files. "
+            f"Unchanged: {skipped_files}. Parsed: {parsed_files}. Errors: {error_files}. "
+            f"Removed: {len(self.removed_paths)}"
+        )
+        return processed_files, total_files, error_files, skipped_files, parsed_files
+
+    def _find_changed_files(self, counts):
+        """Walk the vault, yielding files whose fingerprint changed since the last index.
+
+        Args:
+            counts (dict): Updated in place with the "total" and "changed" file
+                counts, the "unseen" indexed paths the walk didn't find and the
+                "unreadable" paths it couldn't read
+
+        Yields:
+            tuple: (file_path, stats) for each new or changed file
+        """
+        vault_path = self.note_processor.vault_path
+        fingerprints = self.database.get_fingerprints()
+        unseen = counts["unseen"]
+        unseen.update(self.database.get_indexed_paths())
+
+        def on_error(path, is_dir):
+            counts["unreadable"].append((str(path.relative_to(vault_path)), is_dir))
+
+        for file_path, stats in self.note_processor.iter_markdown_files(on_error):
+            counts["total"] += 1
+            rel_path = str(file_path.relative_to(vault_path))
+            unseen.discard(rel_path)
+            if fingerprints.get(rel_path) != file_fingerprint(stats):
+                counts["changed"] += 1
+                if self._writer is not None:
+                    # Taken before the file is read, so any later live change wins
+                    self._marks[rel_path] = self._writer.mark()
+                yield file_path, stats
+
+    def _reconcile(self, counts):
+        """Delete indexed notes the walk didn't find.
+
+        Notes below folders the walk couldn't list, and files it couldn't
+        stat, are kept. So is everything when the vault looks empty but the
+        index doesn't, which usually means the vault isn't mounted.
+
+        Args:
+            counts (dict): Counts filled in by _find_changed_files
+
+        Returns:
+            list: Sorted paths of the deleted notes
+        """
+        stale = counts["unseen"]
+        for rel_path, is_dir in counts["unreadable"]:
+            if not is_dir:
+                stale.discard(rel_path)
+            elif rel_path == ".":
+                stale.clear()
+            else:
+                prefix = rel_path + os.sep
+                stale.difference_update([path for path in stale if path.startswith(prefix)])
+        if not stale:
+            return []
+        if counts["total"] == 0:
+            logger.warning(
+                f"Vault {self.note_processor.vault_path} has no notes but {len(stale)} are "
+                "indexed; leaving the index untouched in case the vault isn't mounted"
+            )
+            return []
+
+        stale = sorted(stale)
+        if self._writer is not None:
+            if not self._writer.submit_background((CHANGE_DELETE_MANY, stale), counts["since"]):
+                return []
+            logger.info(f"Queued removal of {len(stale)} notes missing from the vault")
+            return stale
+
+        started = perf_counter()
+        deleted = self.database.delete_notes(stale)
+        metrics.observe_stage("reconcile", perf_counter() - started)
+        if not deleted:
+            logger.error(f"Failed to remove {len(stale)} notes missing from the vault")
+            return []
+
+        metrics.inc("stale_notes_removed_total", deleted)
+        logger.info(f"Removed {deleted} notes deleted or renamed while the service was down")
+        for path in stale[:RECONCILE_LOG_LIMIT]:
+            logger.info(f"Removed missing note: {path}")
+        for path in stale[RECONCILE_LOG_LIMIT:]:
+            logger.debug(f"Removed missing note: {path}")
+        return stale
+
+    def _process_files(self, changed_files):
+        """Parse changed files, yielding their metadata in input order.
+
+        Args:
+            changed_files (iterable): (file_path, stats) tuples
+
+        Yields:
+            dict: Note metadata, or None for files the processor skipped
+        """
+        changed_files = iter(changed_files)
+        first_chunk = list(islice(changed_files, self.chunk_size))
+        if self.workers <= 1 or len(first_chunk) < self.chunk_size:
+            for file_path, stats in chain(first_chunk, changed_files):
+                yield self.note_processor.process_file(file_path, stats)
+            return
+
+        logger.info(f"Parsing changed files with {self.workers} worker processes")
+        chunks = chain([first_chunk], iter(lambda: list(islice(changed_files, self.chunk_size)), []))
+
+        context = multiprocessing.get_context(WORKER_START_METHOD)
+        if WORKER_START_METHOD == "forkserver":
+            context.set_forkserver_preload([__name__])
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                self.note_processor.vault_path,
+                note_log_settings(),
+                BACKGROUND_NICENESS if self._writer is not None else 0,
+            ),
+        ) as executor:
+            # Keep a bounded number of chunks in flight so results stream back
+            pending = deque()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < self.workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    pending.append((chunk, executor.submit(_process_chunk, chunk)))
+                if not pending:
+                    break
+
+                chunk, future = pending.popleft()
+                try:
+                    results, worker_metrics = future.result()
+                    metrics.merge(worker_metrics)
+                except Exception as e:
+                    logger.error(f"Worker failed to process chunk, parsing it in-process: {e}")
+                    results = [self.note_processor.process_file(path, stats) for path, stats in chunk]
+                yield from results
+
+    def _write_batch(self, batch):
+        """Write a batch of note metadata in a single transaction.
+
+        Args:
+            batch (list): Note metadata dicts
+
+        Returns:
+            int: Number of notes written, or queued to the writer of a background scan
+        """
+        if self._writer is not None:
+            return sum(
+                self._writer.submit_background(
+                    (CHANGE_UPSERT, metadata), self._marks.pop(metadata["path"], 0)
+                )
+                for metadata in batch
+            )
+
+        written = self.database.bulk_insert_or_update_notes(
+            batch, self.batch_size, update_search_index=not self.rebuild_search_index
         )
-        return processed_files, total_files, error_files
+        if written < len(batch):
+            logger.error(f"Failed to index {len(batch) - written} files during initial scan")
+        return written
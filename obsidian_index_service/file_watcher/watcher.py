@@ -2,9 +2,15 @@
 
 import time
 import logging
+import threading
 from watchdog.observers import Observer
 
+from obsidian_index_service.db.operations import DEFAULT_BATCH_SIZE
+from obsidian_index_service.db.writer import DEFAULT_QUEUE_SIZE, DatabaseWriter
+from obsidian_index_service.metrics import metrics
+
 from .handlers import VaultEventHandler
+from .poller import DEFAULT_POLL_INTERVAL, DEFAULT_STAT_BUDGET, VaultPoller, detect_watch_mode
 from .scanner import VaultScanner
 from .logging_config import configure_logging
 
@@ -14,38 +20,75 @@ logger = logging.getLogger(__name__)
 class FileWatcher:
     """Watches an Obsidian vault directory for file changes."""
 
-    def __init__(self, note_processor, database):
+    def __init__(
+        self,
+        note_processor,
+        database,
+        batch_size=DEFAULT_BATCH_SIZE,
+        workers=1,
+        debounce_seconds=0.5,
+        writer_queue_size=DEFAULT_QUEUE_SIZE,
+        rebuild_search_index=False,
+        watch_mode="auto",
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        poll_stat_budget=DEFAULT_STAT_BUDGET,
+    ):
         """Initialize the file watcher.
 
         Args:
             note_processor: The note processor to use for processing files
             database: The database to store note metadata
+            batch_size (int): Number of notes written per transaction during scans
+            workers (int): Number of processes parsing notes during scans
+            debounce_seconds (float, optional): Quiet window for coalescing events per path;
+                0 dispatches them as soon as they arrive, None handles them inline
+                without an event queue thread
+            writer_queue_size (int): Changes queued for the writer thread before parsing blocks
+            rebuild_search_index (bool): Rebuild the full-text index once after scans
+                instead of updating it per note
+            watch_mode (str): "events" for inotify, "polling" for VaultPoller, or
+                "auto" to poll only when the vault's file system raises no events
+            poll_interval (float): Seconds between polls in polling mode
+            poll_stat_budget (int): Notes stat'ed per poll to catch in-place edits
         """
         self.note_processor = note_processor
         self.database = database
         self.observer = None
         self.event_handler = None
-        self.scanner = VaultScanner(note_processor, database)
+        self.scan_thread = None
+        self.debounce_seconds = debounce_seconds
+        self.watch_mode = watch_mode
+        self.poll_interval = poll_interval
+        self.poll_stat_budget = poll_stat_budget
+        self.writer = DatabaseWriter(database, writer_queue_size, batch_size)
+        self.scanner = VaultScanner(
+            note_processor,
+            database,
+            batch_size,
+            workers,
+            rebuild_search_index=rebuild_search_index,
+        )
 
     def scan_existing_files(self):
         """Scan existing files in the vault and add them to the database.
 
         Returns:
-            tuple: (processed_files, total_files, error_files)
+            tuple: (processed_files, total_files, error_files, skipped_files, parsed_files)
         """
         return self.scanner.scan_existing_files()
 
-    def start_watching(self):
-        """Start watching the vault directory for changes."""
-        vault_path = self.note_processor.vault_path
-        logger.info(f"Starting to watch vault directory: {vault_path}")
-
-        self.event_handler = VaultEventHandler(self.note_processor, self.database)
-        self.observer = Observer()
-        self.observer.schedule(self.event_handler, str(vault_path), recursive=True)
-        self.observer.start()
+    def start_watching(self, initial_scan=False):
+        """Start watching the vault directory for changes.
 
-        logger.info("File watcher started successfully")
+        Args:
+            initial_scan (bool): Scan the vault in the background once the
+                observer is running. Scan results are queued to the writer
+                behind live changes, and results a live change has made stale
+                are dropped, so edits made during the scan are never lost.
+        """
+        self.start()
+        if initial_scan:
+            self.start_background_scan()
 
         try:
             # Keep the main thread running while the observer thread works
@@ -54,13 +97,98 @@ class FileWatcher:
         except KeyboardInterrupt:
             self.stop_watching()
 
+    def start(self):
+        """Start the writer, event queue and observer without blocking."""
+        vault_path = self.note_processor.vault_path
+        logger.info(f"Starting to watch vault directory: {vault_path}")
+
+        # The observer thread only enqueues events, the event queue's dispatcher
+        # parses settled notes, and the writer thread commits them
+        self.writer.start()
+        self.event_handler = VaultEventHandler(
+            self.note_processor, self.database, self.debounce_seconds, self.writer
+        )
+        if self.event_handler.event_queue is not None:
+            self.event_handler.event_queue.start()
+        self._register_gauges()
+        watch_mode = self.watch_mode
+        if watch_mode == "auto":
+            watch_mode = detect_watch_mode(vault_path)
+        if watch_mode == "polling":
+            logger.info(f"Polling the vault every {self.poll_interval}s")
+            self.observer = VaultPoller(
+                vault_path,
+                self.event_handler,
+                self.note_processor.ignore_matcher,
+                self.poll_interval,
+                self.poll_stat_budget,
+            )
+        else:
+            self.observer = Observer()
+            self.observer.schedule(self.event_handler, str(vault_path), recursive=True)
+        self.observer.start()
+
+        logger.info("File watcher started successfully")
+
+    def start_background_scan(self):
+        """Scan the vault in a background thread, queuing results to the writer."""
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            return
+
+        def run():
+            try:
+                self.scanner.scan_existing_files(writer=self.writer)
+            except Exception as e:
+                logger.error(f"Background scan failed: {e}")
+
+        self.scan_thread = threading.Thread(target=run, name="initial-scan", daemon=True)
+        self.scan_thread.start()
+        logger.info("Initial scan started in the background")
+
     def stop_watching(self):
         """Stop watching the vault directory."""
         if self.observer:
             self.observer.stop()
             self.observer.join()
+            self.observer = None
+            if self.scan_thread is not None:
+                self.scanner.cancel()
+                self.scan_thread.join()
+                self.scan_thread = None
+            if self.event_handler.event_queue is not None:
+                self.event_handler.event_queue.stop()
+            self.writer.stop()
+            for name in (
+                "event_queue_depth",
+                "writer_queue_depth",
+                "background_queue_depth",
+                "file_events_per_second",
+            ):
+                metrics.unregister_gauge(name)
             logger.info("File watcher stopped")
 
+    def _register_gauges(self):
+        """Expose the queue depths and event rate through the metrics registry."""
+        event_queue = self.event_handler.event_queue
+        if event_queue is not None:
+            metrics.register_gauge("event_queue_depth", lambda: event_queue.stats()["pending"])
+        metrics.register_gauge("writer_queue_depth", lambda: self.writer.stats()["queue_depth"])
+        metrics.register_gauge(
+            "background_queue_depth", lambda: self.writer.stats()["background_queue_depth"]
+        )
+        metrics.register_gauge("file_events_per_second", self.event_handler.event_rate.rate)
+
+    def stats(self):
+        """Return counters of the event queue and the writer.
+
+        Returns:
+            dict: Counters keyed by pipeline stage
+        """
+        return {
+            "events": self.event_handler.stats() if self.event_handler else {},
+            "writer": self.writer.stats(),
+        }
+
     def __del__(self):
         """Ensure observer is stopped when object is destroyed."""
         self.stop_watching()
@@ -0,0 +1,405 @@
+"""In-process metrics with Prometheus text exposition."""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "obsidian_index_"
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Seconds between writes of the stats file
+DEFAULT_STATS_INTERVAL = 15.0
+
+# Window over which RateMeter averages events
+DEFAULT_RATE_WINDOW = 60
+
+# Help text of the metrics the service records
+METRIC_HELP = {
+    "stage_seconds": "Time spent in each indexing stage",
+    "notes_processed_total": "Notes parsed, by outcome",
+    "notes_written_total": "Notes written to the index",
+    "chunks_written_total": "Note chunks inserted because their text or heading is new to the note",
+    "transactions_total": "Write transactions committed",
+    "stale_notes_removed_total": "Notes removed at startup because their files were gone",
+    "file_events_total": "File system events received, by type",
+    "file_events_per_second": "File system events per second over the last minute",
+    "event_queue_depth": "Settling actions waiting in the event queue",
+    "writer_queue_depth": "Live changes waiting for the database writer",
+    "background_queue_depth": "Background scan changes waiting for the database writer",
+}
+
+
+def _label_key(labels):
+    """Turn keyword labels into a hashable, ordered key."""
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    """Render a label key in Prometheus syntax."""
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + rendered + "}"
+
+
+def _escape(value):
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize an empty histogram.
+
+        Args:
+            buckets (tuple): Sorted bucket upper bounds in seconds
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Record one observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        """Add the observations of another histogram with the same buckets."""
+        for i, value in enumerate(counts):
+            self.counts[i] += value
+        self.sum += total
+        self.count += count
+
+
+class RateMeter:
+    """Counts events per second over a sliding window."""
+
+    def __init__(self, window_seconds=DEFAULT_RATE_WINDOW):
+        """Initialize the meter.
+
+        Args:
+            window_seconds (int): Seconds the rate is averaged over
+        """
+        self.window_seconds = window_seconds
+        self._seconds = deque()
+        self._lock = threading.Lock()
+
+    def mark(self, count=1):
+        """Record events happening now."""
+        now = int(time.monotonic())
+        with self._lock:
+            if self._seconds and self._seconds[-1][0] == now:
+                self._seconds[-1][1] += count
+            else:
+                self._seconds.append([now, count])
+            self._expire(now)
+
+    def rate(self):
+        """Return the average number of events per second over the window."""
+        with self._lock:
+            self._expire(int(time.monotonic()))
+            return sum(count for _, count in self._seconds) / self.window_seconds
+
+    def _expire(self, now):
+        """Drop seconds that fell out of the window."""
+        while self._seconds and self._seconds[0][0] <= now - self.window_seconds:
+            self._seconds.popleft()
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters, latency histograms and gauges.
+
+    Counters and histograms are keyed by name and labels. Gauges are
+    callbacks read when the metrics are rendered, so queue depths cost
+    nothing until someone looks at them.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize an empty registry.
+
+        Args:
+            buckets (tuple): Bucket upper bounds used by every histogram
+        """
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter.
+
+        Args:
+            name (str): Counter name, ending in _total
+            value (int): Amount to add
+            **labels: Label values, e.g. type="modified"
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record a duration in a histogram.
+
+        Args:
+            name (str): Histogram name, ending in _seconds
+            seconds (float): Observed duration
+            **labels: Label values, e.g. stage="read"
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def observe_stage(self, stage, seconds):
+        """Record the duration of an indexing stage such as 'read' or 'db_commit'."""
+        self.observe("stage_seconds", seconds, stage=stage)
+
+    def register_gauge(self, name, callback):
+        """Expose a value read from a callback whenever metrics are rendered.
+
+        Args:
+            name (str): Gauge name
+            callback (callable): Returns the current value
+        """
+        with self._lock:
+            self._gauges[name] = callback
+
+    def unregister_gauge(self, name):
+        """Stop exposing a gauge."""
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def snapshot(self):
+        """Return a picklable copy of the counters and histograms.
+
+        Returns:
+            dict: 'counters' mapping (name, labels) to value and 'histograms'
+                mapping (name, labels) to (bucket counts, sum, count)
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {
+                    key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()
+                },
+            }
+
+    def drain(self):
+        """Return a snapshot and reset the counters and histograms.
+
+        Scan worker processes drain their registry after every chunk so the
+        parent can merge the figures into its own.
+        """
+        with self._lock:
+            snapshot = {
+                "counters": self._counters,
+                "histograms": {
+                    key: (h.counts, h.sum, h.count) for key, h in self._histograms.items()
+                },
+            }
+            self._counters = {}
+            self._histograms = {}
+        return snapshot
+
+    def merge(self, snapshot):
+        """Add the figures of a snapshot taken from another registry."""
+        with self._lock:
+            for key, value in snapshot["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (counts, total, count) in snapshot["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(self.buckets)
+                histogram.merge(counts, total, count)
+
+    def reset(self):
+        """Forget every counter, histogram and gauge."""
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+            self._gauges = {}
+
+    def render_prometheus(self):
+        """Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text ending in a newline
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (list(h.counts), h.sum, h.count)) for key, h in self._histograms.items()
+            )
+            gauges = sorted(self._gauges.items())
+
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {METRIC_PREFIX}{name} {METRIC_HELP.get(name, name)}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        for (name, labels), value in counters:
+            describe(name, "counter")
+            lines.append(f"{METRIC_PREFIX}{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), (counts, total, count) in histograms:
+            describe(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = _format_labels(labels, [("le", repr(bound))])
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{le} {cumulative}")
+            le = _format_labels(labels, [("le", "+Inf")])
+            lines.append(f"{METRIC_PREFIX}{name}_bucket{le} {count}")
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_format_labels(labels)} {count}")
+
+        for name, callback in gauges:
+            try:
+                value = callback()
+            except Exception as e:
+                logger.error(f"Failed to read gauge {name}: {e}")
+                continue
+            describe(name, "gauge")
+            lines.append(f"{METRIC_PREFIX}{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Registry the service records into
+metrics = MetricsRegistry()
+
+
+class MetricsServer:
+    """Serves a registry at /metrics over HTTP from a daemon thread."""
+
+    def __init__(self, registry, port, host="127.0.0.1"):
+        """Initialize the server without binding it.
+
+        Args:
+            registry (MetricsRegistry): Metrics to serve
+            port (int): TCP port; 0 picks a free one
+            host (str): Interface to bind, local-only by default
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Bind the port and start serving."""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Serving metrics at http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        """Stop serving and release the port."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+
+class StatsFileWriter:
+    """Periodically writes a registry to a file in the Prometheus text format.
+
+    The file is replaced atomically, so it can be read at any time, for
+    example by node_exporter's textfile collector.
+    """
+
+    def __init__(self, registry, path, interval=DEFAULT_STATS_INTERVAL):
+        """Initialize the writer.
+
+        Args:
+            registry (MetricsRegistry): Metrics to write
+            path (str): File to write
+            interval (float): Seconds between writes
+        """
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start writing the file in a daemon thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-file-writer", daemon=True)
+        self._thread.start()
+        logger.info(f"Writing metrics to {self.path} every {self.interval}s")
+
+    def stop(self):
+        """Stop the thread after writing the file one last time."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def write(self):
+        """Write the current metrics to the file."""
+        temp_path = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(self.registry.render_prometheus())
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to write metrics to {self.path}: {e}")
+
+    def _run(self):
+        """Write the file every interval until stopped."""
+        while not self._stop.wait(self.interval):
+            self.write()
+        self.write()
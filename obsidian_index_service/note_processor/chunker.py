@@ -0,0 +1,97 @@
+"""Splits note content into heading-delimited chunks for retrieval."""
+
+import json
+import logging
+import re
+
+from .file_utils import compute_content_hash
+
+logger = logging.getLogger(__name__)
+
+# Longest chunk, in characters; longer sections are split at paragraph or line breaks
+DEFAULT_CHUNK_SIZE = 2000
+
+# ATX headings such as "## Setup", without the optional closing hashes
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$", re.MULTILINE)
+
+# Fenced code blocks, where a line starting with # is not a heading
+FENCE_PATTERN = re.compile(r"^(```|~~~).*?(?:^\1|\Z)", re.MULTILINE | re.DOTALL)
+
+
+def split_chunks(content, max_chars=DEFAULT_CHUNK_SIZE):
+    """Split note content into sections at markdown headings.
+
+    Each heading starts a section that runs to the next heading; text
+    before the first heading forms a section of its own. Sections longer
+    than max_chars are split at the last blank line, or failing that the
+    last line break, before the limit. Whitespace-only pieces are dropped.
+
+    Args:
+        content (str): Note content without frontmatter
+        max_chars (int): Longest chunk in characters
+
+    Returns:
+        list: (heading_path, start, end, hash) tuples in document order, where
+            heading_path is a JSON list of the enclosing headings, start and
+            end are offsets into content, and hash covers the heading path
+            and the chunk text
+    """
+    if not content:
+        return []
+
+    fences = []
+    if "```" in content or "~~~" in content:
+        fences = [match.span() for match in FENCE_PATTERN.finditer(content)]
+    headings = [
+        match for match in HEADING_PATTERN.finditer(content)
+        if not any(start <= match.start() < end for start, end in fences)
+    ]
+
+    chunks = []
+    stack = []
+    boundaries = [match.start() for match in headings] + [len(content)]
+    if boundaries[0] > 0:
+        _add_section(chunks, content, 0, boundaries[0], "[]", max_chars)
+    for match, end in zip(headings, boundaries[1:]):
+        level = len(match.group(1))
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, match.group(2).strip()))
+        heading_path = json.dumps([title for _, title in stack], ensure_ascii=False)
+        _add_section(chunks, content, match.start(), end, heading_path, max_chars)
+    return chunks
+
+
+def _add_section(chunks, content, start, end, heading_path, max_chars):
+    """Append a section, split into pieces of at most max_chars, to chunks."""
+    while True:
+        start, end = _trim(content, start, end)
+        if start >= end:
+            return
+        if end - start <= max_chars:
+            _add_chunk(chunks, content, start, end, heading_path)
+            return
+        limit = start + max_chars
+        cut = content.rfind("\n\n", start + 1, limit)
+        if cut <= start:
+            cut = content.rfind("\n", start + 1, limit)
+        if cut <= start:
+            cut = limit
+        _add_chunk(chunks, content, *_trim(content, start, cut), heading_path)
+        start = cut
+
+
+def _add_chunk(chunks, content, start, end, heading_path):
+    """Append one chunk with its hash."""
+    text = content[start:end]
+    chunk_hash = compute_content_hash(f"{heading_path}\n{text}".encode("utf-8"))
+    chunks.append((heading_path, start, end, chunk_hash))
+
+
+def _trim(content, start, end):
+    """Shrink a range of content to exclude leading and trailing whitespace."""
+    while start < end and content[start].isspace():
+        start += 1
+    while end > start and content[end - 1].isspace():
+        end -= 1
+    return start, end
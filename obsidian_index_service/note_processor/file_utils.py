@@ -1,7 +1,12 @@
 """Utilities for handling files in the note processor."""
 
+import hashlib
 import logging
+import os
 from pathlib import Path
+from time import perf_counter
+
+from obsidian_index_service.metrics import metrics
 
 from .logging_config import configure_logging
 
@@ -33,4 +38,78 @@ def validate_vault_path(vault_path):
     path = Path(vault_path)
     if not path.exists():
         raise ValueError(f"Vault path does not exist: {vault_path}")
-    return path 
\ No newline at end of file
+    return path
+
+
+def compute_content_hash(data):
+    """Compute a fast fingerprint of a file's raw bytes.
+
+    Args:
+        data (bytes): Raw file content
+
+    Returns:
+        str: Hex digest of the content
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_fingerprint(stats):
+    """Build the stat-based fingerprint used to detect changed files.
+
+    Args:
+        stats (os.stat_result): Result of stat() on the file
+
+    Returns:
+        tuple: (file_size, mtime_ns, inode)
+    """
+    return (stats.st_size, stats.st_mtime_ns, stats.st_ino)
+
+
+def iter_markdown_files(vault_path, ignore_matcher=None, on_error=None):
+    """Walk the vault once, yielding markdown files with their stat results.
+
+    Folders matched by the ignore rules are pruned without being listed.
+    Symlinked folders are not followed.
+
+    Args:
+        vault_path (Path): Root path of the vault
+        ignore_matcher (IgnoreMatcher, optional): Rules for paths to leave out
+        on_error (callable, optional): Called with (path, is_dir) for every folder
+            that couldn't be listed and file that couldn't be stat'ed
+
+    Yields:
+        tuple: (file_path, stats) for each markdown file
+    """
+    # Folders still to list, as (absolute path, vault-relative posix prefix)
+    pending = [(str(vault_path), "")]
+    while pending:
+        folder, prefix = pending.pop()
+        try:
+            entries = os.scandir(folder)
+        except OSError as e:
+            logger.error(f"Error listing folder {folder}: {e}")
+            if on_error is not None:
+                on_error(Path(folder), True)
+            continue
+
+        with entries:
+            for entry in entries:
+                rel_path = prefix + entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if ignore_matcher is None or not ignore_matcher.matches(rel_path, is_dir=True):
+                            pending.append((entry.path, rel_path + "/"))
+                        continue
+                    if not is_markdown_file(entry.name):
+                        continue
+                    if ignore_matcher is not None and ignore_matcher.matches(rel_path):
+                        continue
+                    started = perf_counter()
+                    stats = entry.stat()
+                    metrics.observe_stage("stat", perf_counter() - started)
+                except OSError as e:
+                    logger.error(f"Error reading {entry.path}: {e}")
+                    if on_error is not None:
+                        on_error(Path(entry.path), False)
+                    continue
+                yield Path(entry.path), stats
@@ -0,0 +1,180 @@
+"""Fast frontmatter parsing that matches python-frontmatter's output."""
+
+import logging
+import re
+
+import frontmatter
+import yaml
+from yaml.constructor import SafeConstructor
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader
+
+logger = logging.getLogger(__name__)
+
+# Delimiter line python-frontmatter's YAML handler splits on
+FM_BOUNDARY = re.compile(r"^-{3,}\s*$", re.MULTILINE)
+
+# First characters that can start frontmatter in any python-frontmatter format
+FRONTMATTER_STARTS = ("-", "+", "{", "}")
+
+# Keys python-frontmatter's Post constructor can't take as metadata
+RESERVED_KEYS = ("content", "handler")
+
+# Lines the fast path understands: "key: value", "key:" and "- item"
+KEY_LINE = re.compile(r"([A-Za-z_][A-Za-z0-9_-]*):(?: +(.*?))?[ \t]*")
+ITEM_LINE = re.compile(r"( *)- +(.*?)[ \t]*")
+
+# Plain scalars safe to resolve without the YAML parser: no indicator as the
+# first character, no ':' or '#' anywhere and no YAML line breaks
+PLAIN_SCALAR = re.compile(r"""[^\s\-?:,\[\]{}#&*!|>'"%@`][^:#\x85\u2028\u2029]*""")
+FLOW_ITEM = re.compile(r"""[^\s\-?:,\[\]{}#&*!|>'"%@`][^:#,\[\]{}'"\x85\u2028\u2029]*""")
+
+# Characters the YAML reader rejects
+NON_PRINTABLE = re.compile("[^\x09\x0A\x0D\x20-\x7E\x85\xA0-\uD7FF\uE000-\uFFFD\U00010000-\U0010FFFF]")
+
+# Scalar types the fast path constructs itself
+SIMPLE_TAGS = {
+    "tag:yaml.org,2002:str",
+    "tag:yaml.org,2002:int",
+    "tag:yaml.org,2002:float",
+    "tag:yaml.org,2002:bool",
+    "tag:yaml.org,2002:null",
+    "tag:yaml.org,2002:timestamp",
+}
+
+_resolver = Resolver()
+_constructor = SafeConstructor()
+
+
+class _ComplexHeader(Exception):
+    """Raised when a header needs the full YAML parser."""
+
+
+def parse_frontmatter(text):
+    """Split a note into frontmatter metadata and content.
+
+    Produces the same metadata and content as ``frontmatter.loads(text)``,
+    including the exceptions it raises. Notes without frontmatter skip YAML
+    entirely, headers made of ``key: value`` lines and ``tags`` lists are
+    resolved without the YAML parser, and any other header is loaded with
+    libyaml's CSafeLoader when it's installed.
+
+    Args:
+        text (str): Decoded note text
+
+    Returns:
+        tuple: (metadata dict, content str)
+    """
+    stripped = text.strip()
+    if not stripped.startswith(FRONTMATTER_STARTS):
+        return {}, stripped
+    if not stripped.startswith("---"):
+        # JSON or TOML frontmatter is rare enough to leave to the library
+        post = frontmatter.loads(text)
+        return post.metadata, post.content
+    if not FM_BOUNDARY.match(stripped):
+        # Like the library, only a delimiter on a line of its own opens frontmatter
+        return {}, stripped
+
+    parts = FM_BOUNDARY.split(stripped, 2)
+    if len(parts) != 3:
+        return {}, stripped
+    _, header, content = parts
+
+    try:
+        metadata = _parse_simple_header(header)
+    except _ComplexHeader:
+        metadata = yaml.load(header, Loader=SafeLoader)
+        if not isinstance(metadata, dict):
+            metadata = {}
+
+    if any(not isinstance(key, str) or key in RESERVED_KEYS for key in metadata):
+        # Let the library raise the same error it always has for these keys
+        post = frontmatter.loads(text)
+        return post.metadata, post.content
+    return metadata, content.strip()
+
+
+def _parse_simple_header(header):
+    """Parse a header of flat "key: value" lines and block or flow lists.
+
+    Args:
+        header (str): Text between the frontmatter delimiters
+
+    Returns:
+        dict: Parsed metadata
+
+    Raises:
+        _ComplexHeader: If the header uses anything beyond the simple forms
+    """
+    if NON_PRINTABLE.search(header):
+        raise _ComplexHeader()
+
+    metadata = {}
+    list_key = None
+    list_indent = None
+
+    for line in header.split("\n"):
+        if not line.strip(" \t"):
+            continue
+
+        item = ITEM_LINE.fullmatch(line)
+        if item is not None:
+            indent = len(item.group(1))
+            if list_key is None or (list_indent is not None and indent != list_indent):
+                raise _ComplexHeader()
+            list_indent = indent
+            if not isinstance(metadata[list_key], list):
+                metadata[list_key] = []
+            metadata[list_key].append(_scalar(item.group(2), PLAIN_SCALAR))
+            continue
+
+        match = KEY_LINE.fullmatch(line)
+        if match is None:
+            raise _ComplexHeader()
+        key = _scalar(match.group(1), PLAIN_SCALAR)
+        if not isinstance(key, str):
+            raise _ComplexHeader()
+
+        value = match.group(2)
+        if not value:
+            # Either an empty value or the start of a block list
+            metadata[key] = None
+            list_key, list_indent = key, None
+            continue
+
+        list_key = None
+        if value.startswith("[") and value.endswith("]"):
+            metadata[key] = _flow_list(value[1:-1])
+        else:
+            metadata[key] = _scalar(value, PLAIN_SCALAR)
+
+    return metadata
+
+
+def _flow_list(body):
+    """Parse the inside of a one-line ``[a, b]`` list of plain scalars."""
+    body = body.strip()
+    if not body:
+        return []
+    items = [item.strip() for item in body.split(",")]
+    if items[-1] == "":
+        # YAML allows one trailing comma
+        items.pop()
+    return [_scalar(item, FLOW_ITEM) for item in items]
+
+
+def _scalar(value, pattern):
+    """Resolve and construct a plain scalar the way the YAML loader would."""
+    if not pattern.fullmatch(value):
+        raise _ComplexHeader()
+    tag = _resolver.resolve(ScalarNode, value, (True, False))
+    if tag not in SIMPLE_TAGS:
+        raise _ComplexHeader()
+    node = ScalarNode(tag, value)
+    return _constructor.yaml_constructors[tag](_constructor, node)
@@ -0,0 +1,142 @@
+"""Gitignore-style ignore rules for paths inside the vault."""
+
+import logging
+import re
+from pathlib import Path, PurePosixPath
+
+logger = logging.getLogger(__name__)
+
+# Obsidian's config folder, its trash and version control metadata
+DEFAULT_IGNORE_PATTERNS = [".obsidian/", ".trash/", ".git/"]
+
+
+def _translate(pattern):
+    """Translate a gitignore glob into a regular expression over posix paths.
+
+    Args:
+        pattern (str): Glob without its leading '!' or trailing '/'
+
+    Returns:
+        str: Regular expression matching the whole relative path
+    """
+    # A slash anywhere but the end anchors the pattern to the vault root
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1 : end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+
+    prefix = "" if anchored else "(?:.*/)?"
+    return prefix + "".join(parts)
+
+
+class IgnoreMatcher:
+    """Matches vault-relative paths against gitignore-style patterns.
+
+    Supported syntax: ``*``, ``?``, ``[...]``, ``**``, a trailing ``/`` for
+    folders only, a leading or inner ``/`` to anchor to the vault root, ``#``
+    comments and ``!`` to re-include paths an earlier pattern excluded. As in
+    gitignore, the last pattern matching a path decides, so a ``!`` pattern
+    has no effect on patterns after it. Each run of consecutive patterns of
+    the same kind is compiled into combined regular expressions.
+    """
+
+    def __init__(self, patterns=None):
+        """Compile the ignore patterns.
+
+        Args:
+            patterns (list, optional): Gitignore-style patterns. Defaults to
+                DEFAULT_IGNORE_PATTERNS.
+        """
+        self.patterns = list(DEFAULT_IGNORE_PATTERNS if patterns is None else patterns)
+        # Runs of consecutive ignore or '!' patterns as (negated, {dir_only: expressions})
+        runs = []
+        for raw in self.patterns:
+            pattern = raw.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            negated = pattern.startswith("!")
+            pattern = pattern.lstrip("!")
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+            if not runs or runs[-1][0] != negated:
+                runs.append((negated, {False: [], True: []}))
+            runs[-1][1][dir_only].append(_translate(pattern))
+
+        def combine(expressions):
+            if not expressions:
+                return None
+            return re.compile("(?:" + "|".join(expressions) + ")")
+
+        # Checked last run first; the first run that matches decides
+        self._runs = [
+            (negated, combine(rules[False]), combine(rules[True]))
+            for negated, rules in reversed(runs)
+        ]
+
+    def matches(self, rel_path, is_dir=False):
+        """Check a single path, without looking at its parent folders.
+
+        Args:
+            rel_path (str): Vault-relative posix path
+            is_dir (bool): Whether the path is a folder
+
+        Returns:
+            bool: True if the path is ignored
+        """
+        for negated, any_regex, dir_regex in self._runs:
+            if self._hit(rel_path, is_dir, any_regex, dir_regex):
+                return not negated
+        return False
+
+    def is_ignored(self, rel_path, is_dir=False):
+        """Check a path and every folder above it.
+
+        Args:
+            rel_path (str or PurePath): Vault-relative path
+            is_dir (bool): Whether the path is a folder
+
+        Returns:
+            bool: True if the path or one of its parent folders is ignored
+        """
+        path = PurePosixPath(Path(rel_path).as_posix())
+        for parent in reversed(path.parents[:-1]):
+            if self.matches(str(parent), is_dir=True):
+                return True
+        return self.matches(str(path), is_dir)
+
+    @staticmethod
+    def _hit(rel_path, is_dir, any_regex, dir_regex):
+        """Check a path against the combined regexes of one run of patterns."""
+        if any_regex is not None and any_regex.fullmatch(rel_path):
+            return True
+        return is_dir and dir_regex is not None and dir_regex.fullmatch(rel_path) is not None
@@ -0,0 +1,97 @@
+"""Extracts wikilinks, embeds and markdown links from note content."""
+
+import logging
+import posixpath
+import re
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+# Link kinds stored in the links table
+WIKILINK = "wikilink"
+EMBED = "embed"
+MARKDOWN = "markdown"
+
+# [[target#subpath|alias]] and ![[embed]], or [text](target "title") and ![alt](image)
+LINK_PATTERN = re.compile(
+    r"(?P<wiki_embed>!?)\[\[(?P<wiki>[^\[\]\n]+?)\]\]"
+    r"|(?P<md_embed>!?)\[(?P<text>[^\[\]\n]*)\]"
+    r"\(\s*(?P<url><[^<>\n]+>|[^()\s]+)(?:\s+(?:\"[^\"\n]*\"|'[^'\n]*'))?\s*\)"
+)
+
+# Fenced code blocks and inline code, where Obsidian doesn't treat links as links
+CODE_PATTERN = re.compile(r"^(```|~~~).*?(?:^\1|\Z)|`[^`\n]+`", re.MULTILINE | re.DOTALL)
+
+# URLs with a scheme (https:, mailto:, obsidian:) point outside the vault
+URL_SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+def extract_links(content, parent_folder=""):
+    """Extract the outgoing links of a note.
+
+    Args:
+        content (str): Note content without frontmatter
+        parent_folder (str): Vault-relative folder of the note, used to
+            resolve relative markdown links such as ``../other.md``
+
+    Returns:
+        list: Dicts with target, kind, subpath, alias and line, in document order
+    """
+    if "[" not in content:
+        return []
+
+    # Blank out code while keeping offsets and line breaks intact
+    text = CODE_PATTERN.sub(lambda m: re.sub(r"[^\n]", " ", m.group()), content)
+
+    links = []
+    line = 1
+    position = 0
+    for match in LINK_PATTERN.finditer(text):
+        line += text.count("\n", position, match.start())
+        position = match.start()
+
+        if match.group("wiki") is not None:
+            link = _wikilink(match.group("wiki"), bool(match.group("wiki_embed")))
+        else:
+            link = _markdown_link(
+                match.group("url"), match.group("text"), bool(match.group("md_embed")), parent_folder
+            )
+        if link is not None:
+            link["line"] = line
+            links.append(link)
+    return links
+
+
+def _wikilink(body, is_embed):
+    """Split a wikilink body into target, subpath and alias."""
+    target, _, alias = body.partition("|")
+    target, _, subpath = target.partition("#")
+    target = target.strip()
+    if not target:
+        # [[#Heading]] links within the same note
+        return None
+    return {
+        "target": target,
+        "kind": EMBED if is_embed else WIKILINK,
+        "subpath": subpath.strip() or None,
+        "alias": alias.strip() or None,
+    }
+
+
+def _markdown_link(url, text, is_embed, parent_folder):
+    """Turn a markdown link into a vault-relative target, skipping external URLs."""
+    url = url.strip("<>").strip()
+    if URL_SCHEME.match(url):
+        return None
+    target, _, subpath = unquote(url).partition("#")
+    target = target.strip()
+    if not target:
+        return None
+    if target.startswith(("./", "../")):
+        target = posixpath.normpath(posixpath.join(parent_folder.replace("\\", "/"), target))
+    return {
+        "target": target.lstrip("/"),
+        "kind": EMBED if is_embed else MARKDOWN,
+        "subpath": subpath.strip() or None,
+        "alias": text.strip() or None,
+    }
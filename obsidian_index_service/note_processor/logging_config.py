@@ -1,11 +1,65 @@
 """Logging configuration for file watcher."""
 
+import itertools
 import logging
 
+# How per-note log lines are emitted: at INFO, at DEBUG, or one in N at INFO
+NOTE_LOG_MODES = ("info", "debug", "sampled")
+
+# One in this many notes is logged at INFO in sampled mode
+DEFAULT_NOTE_LOG_SAMPLE = 100
+
+_note_log_mode = "info"
+_note_log_sample = DEFAULT_NOTE_LOG_SAMPLE
+_note_log_counter = itertools.count()
+
+
 def configure_logging():
     """Configure logging for the file watcher module."""
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    return logging.getLogger(__name__) 
\ No newline at end of file
+    return logging.getLogger(__name__)
+
+
+def set_note_log_mode(mode="info", sample_every=DEFAULT_NOTE_LOG_SAMPLE):
+    """Choose how per-note log lines are emitted.
+
+    Args:
+        mode (str): 'info' logs every note at INFO, 'debug' logs them at DEBUG,
+            'sampled' logs one in sample_every at INFO and the rest at DEBUG
+        sample_every (int): Sampling interval for 'sampled'
+
+    Raises:
+        ValueError: If the mode or interval is invalid
+    """
+    global _note_log_mode, _note_log_sample, _note_log_counter
+    if mode not in NOTE_LOG_MODES:
+        raise ValueError(f"Unknown note log mode: {mode}")
+    if sample_every < 1:
+        raise ValueError(f"Note log sample interval must be at least 1: {sample_every}")
+    _note_log_mode = mode
+    _note_log_sample = sample_every
+    _note_log_counter = itertools.count()
+
+
+def note_log_settings():
+    """Return the current (mode, sample_every), e.g. to hand to worker processes."""
+    return _note_log_mode, _note_log_sample
+
+
+def log_note(logger, message, *args):
+    """Log a per-note line at the level chosen by set_note_log_mode.
+
+    Args:
+        logger (logging.Logger): Logger of the calling module
+        message (str): %-style message, formatted only if the line is emitted
+        *args: Message arguments
+    """
+    level = logging.INFO
+    if _note_log_mode == "debug":
+        level = logging.DEBUG
+    elif _note_log_mode == "sampled" and next(_note_log_counter) % _note_log_sample:
+        level = logging.DEBUG
+    logger.log(level, message, *args)
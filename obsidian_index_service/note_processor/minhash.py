@@ -0,0 +1,118 @@
+"""MinHash signatures of notes for near-duplicate detection."""
+
+import logging
+import zlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # duplicate detection is an optional feature
+    np = None
+
+from .terms import term_hash
+
+logger = logging.getLogger(__name__)
+
+# Words per shingle; notes are compared as sets of overlapping word triples
+SHINGLE_WORDS = 3
+
+# LSH bands and signature values per band. Notes share a bucket in some band
+# with probability 1 - (1 - J^8)^16, about 0.05 at Jaccard 0.5, 0.5 at 0.71
+# and 0.98 at 0.85.
+BANDS = 16
+ROWS_PER_BAND = 8
+
+# Signature values per note, one per hash function
+NUM_PERM = BANDS * ROWS_PER_BAND
+
+# Shingles hashed per block, which bounds the memory used by long notes
+SHINGLE_BLOCK = 4096
+
+# Fixed seed, so signatures computed by different processes and releases agree
+PERMUTATION_SEED = 0x5EED
+
+# Odd multiplier that combines the word hashes of a shingle
+SHINGLE_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _permutations():
+    """Multipliers and increments of the multiply-shift hash functions."""
+    if np is None:
+        return None, None
+    rng = np.random.default_rng(PERMUTATION_SEED)
+    multipliers = rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    increments = rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+    return multipliers, increments
+
+
+_MULTIPLIERS, _INCREMENTS = _permutations()
+
+
+def minhash_available():
+    """Return True if NumPy is installed, which computing signatures needs."""
+    return np is not None
+
+
+def minhash_signature(words):
+    """Compute the MinHash signature of a note's word shingles.
+
+    Shingle hashes are combined from the CRC-32 of their words, so each
+    distinct word is hashed once, and then go through NUM_PERM
+    multiply-shift hash functions, keeping the minimum of each.
+
+    Args:
+        words (list): Words of the note content from tokenize()
+
+    Returns:
+        bytes: NUM_PERM unsigned 32-bit values, or None for notes without
+            words or when NumPy isn't installed
+    """
+    if np is None or not words:
+        return None
+    word_hashes = np.fromiter(map(term_hash, words), dtype=np.uint64, count=len(words))
+    width = min(SHINGLE_WORDS, len(words))
+    count = len(words) - width + 1
+    multiplier = np.uint64(SHINGLE_MULTIPLIER)
+    shingles = np.zeros(count, dtype=np.uint64)
+    for offset in range(width):
+        # Products wrap modulo 2**64
+        shingles = (shingles + word_hashes[offset:offset + count]) * multiplier
+    hashes = np.unique(shingles >> np.uint64(32))
+    signature = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(hashes), SHINGLE_BLOCK):
+        # Products wrap modulo 2**64
+        values = hashes[start:start + SHINGLE_BLOCK, None] * _MULTIPLIERS
+        values += _INCREMENTS
+        np.minimum(signature, values.min(axis=0), out=signature)
+    # The high 32 bits of the smallest value are the smallest hash value
+    return (signature >> np.uint64(32)).astype(np.uint32).tobytes()
+
+
+def band_buckets(signature):
+    """Hash each band of a signature into the bucket it's stored under.
+
+    Args:
+        signature (bytes): Signature from minhash_signature
+
+    Returns:
+        list: (band, bucket) pairs, one per band
+    """
+    size = len(signature) // BANDS
+    return [
+        (band, zlib.crc32(signature[band * size:(band + 1) * size]))
+        for band in range(BANDS)
+    ]
+
+
+def estimate_jaccard(first, second):
+    """Estimate the Jaccard similarity of two notes from their signatures.
+
+    Args:
+        first (bytes): Signature of one note
+        second (bytes): Signature of the other
+
+    Returns:
+        float: Fraction of signature values the two have in common
+    """
+    first, second = array("I", first), array("I", second)
+    return sum(a == b for a, b in zip(first, second)) / len(first)
@@ -4,19 +4,29 @@ import json
 import logging
 from pathlib import Path
 from datetime import datetime
-import frontmatter
+from time import perf_counter
 
-from .logging_config import configure_logging
+from obsidian_index_service.metrics import metrics
+
+from .chunker import split_chunks
+from .file_utils import compute_content_hash
+from .frontmatter_parser import parse_frontmatter
+from .link_extractor import extract_links
+from .minhash import minhash_signature
+from .terms import hash_terms, tokenize
+from .logging_config import configure_logging, log_note
 
 logger = logging.getLogger(__name__)
 
 
-def extract_note_data(file_path, vault_path):
+def extract_note_data(file_path, vault_path, stats=None, raw=None):
     """Extract metadata and content from a markdown file.
 
     Args:
         file_path (Path): Path to the markdown file
         vault_path (Path): Root path of the vault
+        stats (os.stat_result, optional): Stat result the caller already has
+        raw (bytes, optional): File content the caller already read
 
     Returns:
         dict: Extracted note data
@@ -28,7 +38,10 @@ def extract_note_data(file_path, vault_path):
     rel_path = file_path.relative_to(vault_path)
 
     # Extract file stats
-    stats = file_path.stat()
+    if stats is None:
+        started = perf_counter()
+        stats = file_path.stat()
+        metrics.observe_stage("stat", perf_counter() - started)
     created_date = datetime.fromtimestamp(stats.st_ctime).isoformat()
     modified_date = datetime.fromtimestamp(stats.st_mtime).isoformat()
 
@@ -40,13 +53,39 @@ def extract_note_data(file_path, vault_path):
     if parent_folder == ".":
         parent_folder = ""
 
+    # Read raw bytes once so the content hash and the parsed text agree
+    if raw is None:
+        started = perf_counter()
+        raw = file_path.read_bytes()
+        metrics.observe_stage("read", perf_counter() - started)
+    content_hash = compute_content_hash(raw)
+
     # Parse frontmatter and content
-    with open(file_path, "r", encoding="utf-8") as f:
-        post = frontmatter.load(f)
-        content = post.content
+    started = perf_counter()
+    metadata, content = parse_frontmatter(decode_note_text(raw))
+    parsed = perf_counter()
+    metrics.observe_stage("frontmatter_parse", parsed - started)
 
     # Extract tags from frontmatter
-    tags = extract_tags_from_frontmatter(post.metadata)
+    tags = extract_tags_from_frontmatter(metadata)
+    tagged = perf_counter()
+    metrics.observe_stage("tag_extraction", tagged - parsed)
+
+    links = extract_links(content, parent_folder)
+    linked = perf_counter()
+    metrics.observe_stage("link_extraction", linked - tagged)
+
+    chunks = split_chunks(content)
+    chunked = perf_counter()
+    metrics.observe_stage("chunking", chunked - linked)
+
+    words = tokenize(content)
+    terms = hash_terms(words)
+    hashed = perf_counter()
+    metrics.observe_stage("term_hashing", hashed - chunked)
+
+    minhash = minhash_signature(words)
+    metrics.observe_stage("minhash", perf_counter() - hashed)
 
     # Assemble note data
     note_data = {
@@ -57,14 +96,35 @@ def extract_note_data(file_path, vault_path):
         "created_date": created_date,
         "modified_date": modified_date,
         "content": content,
+        "links": links,
+        "chunks": chunks,
+        "terms": terms,
+        "minhash": minhash,
         "status": "success",
         "error_message": "",
+        "file_size": stats.st_size,
+        "mtime_ns": stats.st_mtime_ns,
+        "inode": stats.st_ino,
+        "content_hash": content_hash,
     }
 
-    logger.info(f"Processed note: {rel_path}")
+    log_note(logger, "Processed note: %s", rel_path)
     return note_data
 
 
+def decode_note_text(raw):
+    """Decode raw note bytes the way a text-mode open() would.
+
+    Args:
+        raw (bytes): Raw file content
+
+    Returns:
+        str: Decoded text with universal newlines applied
+    """
+    text = raw.decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
 def extract_tags_from_frontmatter(metadata):
     """Extract tags from frontmatter with support for multiple formats.
 
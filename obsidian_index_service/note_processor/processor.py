@@ -3,7 +3,10 @@
 import logging
 from pathlib import Path
 
-from .file_utils import is_markdown_file, validate_vault_path
+from obsidian_index_service.metrics import metrics
+
+from .file_utils import is_markdown_file, iter_markdown_files, validate_vault_path
+from .ignore import IgnoreMatcher
 from .note_extractor import extract_note_data, create_error_metadata
 from .logging_config import configure_logging
 
@@ -13,23 +16,28 @@ logger = logging.getLogger(__name__)
 class NoteProcessor:
     """Processes Obsidian markdown files and extracts metadata."""
 
-    def __init__(self, vault_path):
+    def __init__(self, vault_path, ignore_patterns=None):
         """Initialize the note processor.
 
         Args:
             vault_path (str): Path to the Obsidian vault directory
+            ignore_patterns (list, optional): Gitignore-style patterns for paths
+                that are never indexed. Defaults to DEFAULT_IGNORE_PATTERNS.
 
         Raises:
             ValueError: If the vault path doesn't exist
         """
         self.vault_path = validate_vault_path(vault_path)
+        self.ignore_matcher = IgnoreMatcher(ignore_patterns)
         logger.info(f"Note processor initialized with vault path: {vault_path}")
 
-    def process_file(self, file_path):
+    def process_file(self, file_path, stats=None, raw=None):
         """Process a markdown file and extract its metadata.
 
         Args:
             file_path (str or Path): Path to the markdown file
+            stats (os.stat_result, optional): Stat result the caller already has
+            raw (bytes, optional): File content the caller already read
 
         Returns:
             dict: Extracted metadata or None if processing fails
@@ -43,10 +51,13 @@ class NoteProcessor:
                 return None
 
             # Extract note data
-            return extract_note_data(file_path, self.vault_path)
+            note_data = extract_note_data(file_path, self.vault_path, stats, raw)
+            metrics.inc("notes_processed_total", status="success")
+            return note_data
 
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
+            metrics.inc("notes_processed_total", status="error")
             # Return metadata with error status
             return create_error_metadata(file_path, self.vault_path, e)
 
@@ -61,3 +72,31 @@ class NoteProcessor:
         """
         return is_markdown_file(file_path)
 
+
+    def is_ignored(self, file_path, is_dir=False):
+        """Check if a path is excluded from the index by the ignore rules.
+
+        Args:
+            file_path (str or Path): Path to the file or folder
+            is_dir (bool): Whether the path is a folder
+
+        Returns:
+            bool: True if the path or one of its parent folders is ignored
+        """
+        try:
+            rel_path = Path(file_path).relative_to(self.vault_path)
+        except ValueError:
+            return False
+        return self.ignore_matcher.is_ignored(rel_path, is_dir)
+
+    def iter_markdown_files(self, on_error=None):
+        """Walk the vault for markdown files that aren't ignored.
+
+        Args:
+            on_error (callable, optional): Called with (path, is_dir) for every
+                folder or file the walk couldn't read
+
+        Yields:
+            tuple: (file_path, stats) for each markdown file
+        """
+        return iter_markdown_files(self.vault_path, self.ignore_matcher, on_error)
@@ -0,0 +1,44 @@
+"""Counts and hashes the words of a note for similarity search."""
+
+import logging
+import math
+import re
+import zlib
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Words of at least two letters or digits
+TOKEN_PATTERN = re.compile(r"[^\W_]{2,}")
+
+
+@lru_cache(maxsize=1 << 18)
+def term_hash(term):
+    """CRC-32 of a term, which unlike hash() is the same in every process."""
+    return zlib.crc32(term.encode("utf-8"))
+
+
+def tokenize(content):
+    """Split text into lowercased words of at least two letters or digits."""
+    return TOKEN_PATTERN.findall((content or "").lower())
+
+
+def hash_terms(words):
+    """Count the distinct words of a text and hash them.
+
+    Parsing does this so scan workers tokenize in parallel and the writer
+    only has to fold the hashes into vector buckets.
+
+    Args:
+        words (list): Words from tokenize()
+
+    Returns:
+        tuple: (hashes, weights) arrays holding the CRC-32 of each distinct
+            word and its sublinear term frequency, 1 + log(count)
+    """
+    counts = Counter(words)
+    hashes = array("I", map(term_hash, counts))
+    weights = array("f", [1.0 + math.log(count) for count in counts.values()])
+    return hashes, weights
@@ -7,8 +7,10 @@ from pathlib import Path
 from pytest_bdd import given, when, then, parsers
 
 from obsidian_index_service.db.connection import DatabaseConnection
+from obsidian_index_service.db.database import Database
 from obsidian_index_service.db.operations import NoteOperations
 from obsidian_index_service.note_processor.processor import NoteProcessor
+from obsidian_index_service.file_watcher.scanner import VaultScanner
 
 
 @pytest.fixture
@@ -49,4 +51,17 @@ def note_operations(db_connection):
 @pytest.fixture
 def note_processor(vault_path):
     """Create a note processor for testing."""
-    return NoteProcessor(str(vault_path)) 
\ No newline at end of file
+    return NoteProcessor(str(vault_path)) 
+
+@pytest.fixture
+def database(db_path):
+    """Create a test database with connection and operations."""
+    db = Database(db_path)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def vault_scanner(note_processor, database):
+    """Create a vault scanner for testing."""
+    return VaultScanner(note_processor, database)
@@ -0,0 +1,17 @@
+Feature: Benchmark Suite
+
+  As a maintainer of the index service
+  I want reproducible benchmarks on generated vaults
+  So that performance regressions between releases show up as numbers.
+
+  Scenario: The synthetic vault generator is deterministic
+    Given two vaults generated with seed 7 and 40 notes
+    Then both vaults should contain identical files
+
+  Scenario: A benchmark run produces a machine-readable report
+    When the benchmarks run on a vault of 30 notes
+    Then the report should survive a JSON round trip
+    And the full scan should have indexed 30 notes
+    And the incremental rescan should have parsed fewer notes than the full scan
+    And every timed event should have been committed
+    And every consumer query should use an index after the migration
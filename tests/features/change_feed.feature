@@ -0,0 +1,26 @@
+Feature: Change Feed
+
+  As a service reading the index
+  I want a sequenced log of note changes
+  So that I can stay in sync by reading only what changed since my last visit.
+
+  Scenario: Note writes are recorded in commit order
+    Given notes "a.md, b.md" are indexed
+    When "a.md" is moved to "c.md"
+    And "b.md" is removed
+    Then the change feed should read "upsert a.md, upsert b.md, move a.md>c.md, delete b.md"
+    And the change feed after entry 2 should read "move a.md>c.md, delete b.md"
+
+  Scenario: Folder moves and deletes are recorded per note
+    Given notes "inbox/x.md, inbox/y.md, other.md" are indexed
+    When folder "inbox" is moved to "archive"
+    And folder "archive" is removed
+    Then the change feed after entry 3 should read "move inbox/x.md>archive/x.md, move inbox/y.md>archive/y.md, delete archive/x.md, delete archive/y.md"
+
+  Scenario: Retention prunes old entries without reusing sequence numbers
+    Given notes "a.md, b.md, c.md" are indexed
+    And the first 2 change feed entries are 40 days old
+    When the change feed is pruned
+    Then the change feed should hold entries 3 to 3
+    When notes "d.md" are indexed
+    Then the change feed after entry 3 should read "upsert d.md"
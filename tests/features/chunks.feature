@@ -0,0 +1,36 @@
+Feature: Note Chunks
+
+  As a consumer of the index
+  I want notes stored as heading-delimited chunks
+  So that retrieval can return the relevant section instead of the whole note.
+
+  Scenario: Notes are split at headings
+    Given a note "guide.md" with the sections "Intro text | # Setup | Install it | ## Linux | apt install | # Usage | Run it"
+    Then the chunk headings of "guide.md" should be "- ; Setup ; Setup > Linux ; Usage"
+    And the chunks of "guide.md" should start with "Intro text, # Setup, ## Linux, # Usage"
+
+  Scenario: Long sections are split at paragraph breaks
+    Given a note "log.md" with a heading "# Log" and 30 paragraphs of 99 characters
+    Then "log.md" should have 2 chunks
+    And every chunk of "log.md" should be at most 2000 characters under "Log"
+
+  Scenario: Editing a section rewrites only its chunk
+    Given a note "guide.md" with the sections "Intro text | # Setup | Install it | ## Linux | apt install | # Usage | Run it"
+    When "Install it" is replaced with "Install it from the release page" in "guide.md"
+    Then only chunk 1 of "guide.md" should have been rewritten
+    And the chunk offsets of "guide.md" should match its content
+
+  Scenario: Adding a section keeps the chunks around it
+    Given a note "guide.md" with the sections "Intro text | # Setup | Install it | # Usage | Run it | # Notes | Read me"
+    When a section "# Added | New text" is inserted before "# Setup" in "guide.md"
+    Then only 1 chunk row of "guide.md" should have been written and none removed
+    And the chunk offsets of "guide.md" should match its content
+    And the chunk_texts view should match the chunks of "guide.md"
+
+  Scenario: Chunks follow notes as they move and disappear
+    Given a note "guide.md" with the sections "Intro text | # Setup | Install it"
+    When "guide.md" is moved to "docs/guide.md"
+    Then "docs/guide.md" should have 2 chunks
+    And "guide.md" should have 0 chunks
+    When "docs" is deleted as a folder
+    Then "docs/guide.md" should have 0 chunks
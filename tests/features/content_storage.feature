@@ -0,0 +1,30 @@
+Feature: Compressed Content Storage
+
+  As an operator of the index service
+  I want note content stored compressed outside the notes table
+  So that the database stays small and metadata-only reads touch fewer pages.
+
+  Scenario: Compressed content is decompressed only when requested
+    Given a database that compresses content
+    When a note "alpha.md" with content "Compressed alpha content" is stored
+    Then the notes table should hold no inline content
+    And the content of "alpha.md" should be "Compressed alpha content"
+    And a metadata-only read should not include content
+    And searching for "alpha" should find "alpha.md"
+
+  Scenario: Existing content is migrated between storage modes
+    Given a database that stores content inline
+    When a note "alpha.md" with content "Inline alpha content" is stored
+    And the database is reopened with compression
+    Then the notes table should hold no inline content
+    And the content of "alpha.md" should be "Inline alpha content"
+    When the database is reopened without compression
+    Then the content of "alpha.md" should be "Inline alpha content"
+    And the content table should be empty
+
+  Scenario: Compressed content is stored only once
+    Given a database that compresses content
+    When 100 notes of 60 lines each are stored
+    Then the full-text index should keep no copy of the content
+    And the chunks table should keep no copy of the content
+    And the stored content and its index should take less than half the raw size
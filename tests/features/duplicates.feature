@@ -0,0 +1,19 @@
+Feature: Near-Duplicate Detection
+
+  As a vault owner
+  I want copies of the same note grouped together
+  So that templates pasted many times and sync conflicts are easy to clean up.
+
+  Scenario: Copies and sync conflicts are clustered
+    Given the meeting notes "meetings/monday.md", "meetings/tuesday.md" and "meetings/wednesday.md" from one template
+    And a note "plan.md" and its sync conflict "plan (conflict).md"
+    And an unrelated note "recipes/bread.md"
+    Then the duplicate clusters should be "meetings/monday.md, meetings/tuesday.md, meetings/wednesday.md ; plan (conflict).md, plan.md"
+
+  Scenario: Signatures follow notes as they change, move and disappear
+    Given the meeting notes "meetings/monday.md", "meetings/tuesday.md" and "meetings/wednesday.md" from one template
+    And a note "plan.md" and its sync conflict "plan (conflict).md"
+    When "meetings/wednesday.md" is rewritten as an unrelated note
+    And "meetings" is moved to "archive" as a folder
+    And "plan (conflict).md" is deleted
+    Then the duplicate clusters should be "archive/monday.md, archive/tuesday.md"
@@ -0,0 +1,110 @@
+Feature: Event Handling
+
+  As a user of the index service
+  I want bursts of file system events to be handled as one change
+  So that autosave and sync tools don't re-index a note many times per save.
+
+  Scenario: A burst of modify events is coalesced into one update
+    Given an event handler with a debounce window
+    And a note in the vault
+    When the note receives 10 modify events
+    And the event queue is flushed
+    Then the note should be stored in the database
+    And 9 raw events should have been absorbed
+    And 1 action should have been dispatched
+
+  Scenario: A note created and moved within the window is indexed at its new path
+    Given an event handler with a debounce window
+    And a note in the vault
+    When the note is created and then renamed
+    And the event queue is flushed
+    Then only the renamed note should be stored in the database
+
+  Scenario: A note moved onto the destination of another pending move is removed
+    Given an event handler with a debounce window
+    And indexed notes "first.md" and "second.md"
+    When "first.md" is renamed to "target.md" and then "second.md" is renamed over it
+    And the event queue is flushed
+    Then only "target.md" should be stored with the content of "second.md"
+
+  Scenario: Changes queued to the writer thread are group-committed
+    Given a running database writer
+    When 25 notes are queued to the writer
+    And the writer is stopped
+    Then 25 notes should be stored in the database
+    And the writer should have committed them in fewer transactions than notes
+
+  Scenario: A modify event that leaves the bytes unchanged is skipped
+    Given an event handler without a debounce window
+    And a note in the vault
+    When the note receives 1 modify events
+    And the note is touched without changing its content
+    Then the note should be stored in the database
+    And the handler should report 1 hash hit and 1 hash miss
+
+  Scenario: A pure rename moves the stored note without re-parsing it
+    Given an event handler without a debounce window
+    And a note in the vault
+    When the note receives 1 modify events
+    And the note is renamed into a subfolder
+    Then the moved note should be stored with its new title and folder
+    And the handler should report 1 rename
+
+  Scenario: A folder rename moves all notes below it in one operation
+    Given an event handler without a debounce window
+    And an indexed folder "projects" with 3 notes
+    When the folder "projects" is renamed to "archive" with per-file events
+    Then the notes should be stored below "archive"
+    And the handler should report 3 suppressed events
+
+  Scenario: A folder delete removes all notes below it
+    Given an event handler without a debounce window
+    And an indexed folder "projects" with 3 notes
+    When the folder "projects" is deleted
+    Then no notes should be stored in the database
+
+  Scenario: Moving a note to the trash removes it and restoring it re-indexes it
+    Given an event handler without a debounce window
+    And an indexed folder "projects" with 3 notes
+    When note 0 of "projects" is moved to the trash
+    And a note is created inside ".obsidian"
+    Then 2 notes should be stored in the database
+    When note 0 of "projects" is restored from the trash
+    Then 3 notes should be stored in the database
+
+  Scenario: Live changes are committed before queued background work
+    Given a running database writer with a background producer
+    When 3 background notes and then 1 live note are queued at once
+    And the writer is stopped
+    Then the live note should have been committed first
+
+  Scenario: Background results never overwrite newer live changes
+    Given a running database writer with a background producer
+    When a background scan reads "race.md" before a live edit of it is queued
+    And the writer is stopped
+    Then the stored content of "race.md" should be "Live content"
+    And 1 stale background change should have been dropped
+
+  Scenario: Watching starts before the background initial scan
+    Given a vault with 20 notes to watch
+    And an index entry for a note deleted while the service was down
+    When the watcher starts with a background scan
+    And a note is edited while the scan runs
+    And the watcher is stopped once the scan finishes
+    Then 21 notes should be stored in the database
+    And the edited note should hold its latest content
+
+  Scenario: A watcher without a debounce window handles events inline
+    Given a vault with 5 notes to watch
+    When the watcher starts without a debounce window
+    And a note is edited while the scan runs
+    And the watcher is stopped once the scan finishes
+    Then 6 notes should be stored in the database
+    And the edited note should hold its latest content
+
+  Scenario: A parallel background scan starts its workers safely beside the watcher threads
+    Given a vault with 150 notes to watch
+    When the watcher starts with a background scan on 2 worker processes
+    And the watcher is stopped once the scan finishes
+    Then 150 notes should be stored in the database
+    And no worker process should have been forked from the threaded service
@@ -0,0 +1,24 @@
+Feature: Link Index
+
+  As a consumer of the index
+  I want wikilinks, embeds and markdown links stored in an indexed table
+  So that backlink and outlink queries don't regex-scan every note.
+
+  Scenario: Links resolve to the shortest matching note path
+    Given a note "projects/alpha.md" with content "Alpha"
+    And a note "archive/old/alpha.md" with content "Old alpha"
+    And a note "index.md" with content "See [[alpha]], [[archive/old/alpha#Intro|old one]], ![[diagram.png]] and [Beta](beta.md). `[[not a link]]`"
+    Then the outlinks of "index.md" should be "alpha=projects/alpha.md, archive/old/alpha=archive/old/alpha.md, diagram.png=-, beta.md=-"
+    And the backlinks of "projects/alpha.md" should be "index.md"
+
+  Scenario: Links follow notes as they appear, move and disappear
+    Given a note "index.md" with content "See [[beta]] and [[alpha]]"
+    And a note "alpha.md" with content "Links back to [[index]]"
+    When a note "beta.md" with content "Beta" is added
+    Then the outlinks of "index.md" should be "beta=beta.md, alpha=alpha.md"
+    When "beta.md" is moved to "archive/beta.md"
+    And "alpha.md" is moved to "gamma.md"
+    Then the outlinks of "index.md" should be "beta=archive/beta.md, alpha=-"
+    And the backlinks of "index.md" should be "gamma.md"
+    When "archive" is deleted as a folder
+    Then the outlinks of "index.md" should be "beta=-, alpha=-"
@@ -0,0 +1,29 @@
+Feature: Metrics
+
+  As an operator of the index service
+  I want counters and per-stage latency histograms
+  So that I can see where indexing time goes without reading per-note logs.
+
+  Scenario: A scan records per-stage timings and counters
+    Given an empty metrics registry
+    And a vault with 4 metric notes
+    When the vault is scanned with 1 worker
+    Then the metrics should count 4 processed notes and 4 written notes
+    And the stages "stat, read, frontmatter_parse, tag_extraction, db_write, db_commit" should have timings
+
+  Scenario: Worker processes report their metrics to the parent
+    Given an empty metrics registry
+    And a vault with 130 metric notes
+    When the vault is scanned with 2 workers
+    Then the metrics should count 130 processed notes and 130 written notes
+
+  Scenario: Metrics are exposed over HTTP and in a stats file
+    Given an empty metrics registry
+    And a counter and a gauge have been recorded
+    Then the metrics endpoint should serve them in the Prometheus text format
+    And the stats file should contain them in the Prometheus text format
+
+  Scenario: Sampled per-note logging
+    Given per-note logging sampled one in 5
+    When 20 notes are logged
+    Then 4 note lines should be logged at info
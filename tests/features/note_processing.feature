@@ -19,4 +19,8 @@ Feature: Note Processing
   Scenario: Handle invalid markdown files
     Given an invalid markdown file
     When the note processor attempts to process the file
-    Then an error should be recorded in the database 
\ No newline at end of file
+    Then an error should be recorded in the database 
+  Scenario: Fast frontmatter parsing matches python-frontmatter
+    Given notes with simple, complex, malformed and missing frontmatter
+    When each note is parsed by both frontmatter parsers
+    Then the metadata, content and errors should be identical
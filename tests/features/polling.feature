@@ -0,0 +1,39 @@
+Feature: Polling Watcher
+
+  As a user whose vault is mounted from a host or network share
+  I want changes found by polling when no file system events arrive
+  So that the index never silently goes stale.
+
+  Scenario: Polling reports note changes as events
+    Given a polled vault with notes "inbox/a.md, inbox/b.md, c.md"
+    When "inbox/a.md" is edited in place
+    And "c.md" is renamed to "d.md"
+    And "e.md" is created
+    And "inbox/b.md" is deleted
+    Then the next poll should report "moved c.md>d.md, deleted inbox/b.md, created e.md, modified inbox/a.md"
+    And the next poll should report nothing
+
+  Scenario: Folder moves and deletes are reported once per folder
+    Given a polled vault with notes "inbox/a.md, inbox/deep/b.md, archive/c.md"
+    When folder "inbox" is renamed to "projects"
+    And folder "archive" is deleted
+    Then the next poll should report "moved projects, deleted archive"
+    When "projects/deep/b.md" is edited in place
+    Then the next poll should report "modified projects/deep/b.md"
+
+  Scenario: In-place edits are found within the stat budget
+    Given a polled vault with notes "a.md, b.md, c.md, d.md" and a stat budget of 2
+    When every note is edited in place
+    Then the next poll should report 2 modified notes
+    And the next poll should report 2 modified notes
+    And the next poll should report nothing
+
+  Scenario: Network and host-shared mounts are polled automatically
+    Given a mount table with "/mnt/vault" on "nfs4" and "/" on "ext4"
+    Then the watch mode for "/mnt/vault/notes" should be "polling"
+    And the watch mode for "/home/user/vault" should be "events"
+
+  Scenario: The file watcher indexes changes found by polling
+    Given a file watcher in polling mode
+    When a note "polled.md" is written to the vault
+    Then "polled.md" should be indexed within 5 seconds
@@ -0,0 +1,14 @@
+Feature: Streaming Reads
+
+  As a consumer of the index
+  I want to page through notes with projection and filters
+  So that reading a large vault doesn't load every note into memory at once.
+
+  Scenario: Iterate notes in pages with projection and filters
+    Given 7 indexed notes in "projects", 3 in "projects/archive" and 2 in ""
+    Then iterating with a page size of 3 should yield 12 notes in path order
+    And a metadata-only iteration should not include content
+    And notes directly in "projects" should number 7
+    And notes in or below "projects" should number 10
+    And notes modified from "2024-01-05" until "2024-01-10" should number 5
+    And notes with status "error" should number 1
@@ -0,0 +1,20 @@
+Feature: Schema Migrations
+
+  As an operator upgrading the index service
+  I want existing databases upgraded in place
+  So that new indexes and tables arrive without rebuilding the index.
+
+  Scenario: A database written by an older release is upgraded in place
+    Given a database written before schema versioning with 3 notes
+    When the database is opened
+    Then the schema should be at the latest version
+    And 3 notes should still be stored
+    And listing a folder should use an index
+
+  Scenario: Migrations run once and resume after a failure
+    Given a fresh connection
+    When migrations are applied where version 2 fails
+    Then the schema version should be 1
+    When the migrations are applied again without the failure
+    Then the schema version should be 3
+    And each migration should have run once
@@ -0,0 +1,24 @@
+Feature: Full-Text Search
+
+  As a consumer of the index
+  I want to search note content through an FTS index
+  So that I don't have to scan every row with LIKE.
+
+  Scenario: Search returns ranked results with snippets
+    Given indexed notes about "sqlite" and "gardening"
+    When I search for "sqlite"
+    Then the first result should be "sqlite.md"
+    And its snippet should highlight "sqlite"
+
+  Scenario: The search index follows updates and deletes
+    Given indexed notes about "sqlite" and "gardening"
+    When the note "sqlite.md" is rewritten to be about "postgres"
+    And the note "gardening.md" is deleted
+    Then searching for "sqlite" should return nothing
+    And searching for "gardening" should return nothing
+    And searching for "postgres" should return "sqlite.md"
+
+  Scenario: The search index can be rebuilt after a bulk write
+    Given notes about "sqlite" and "gardening" written without updating the search index
+    When the search index is rebuilt
+    Then searching for "gardening" should return "gardening.md"
@@ -0,0 +1,26 @@
+Feature: Similar Notes
+
+  As a consumer of the index
+  I want related notes found from a vector index kept next to the database
+  So that "related notes" doesn't have to load every note into the client.
+
+  Scenario: Notes about the same topic rank first
+    Given the notes about databases and gardening
+    Then the notes similar to "databases/sqlite.md" should start with "databases/postgres.md"
+    And the notes similar to the text "watering tomatoes with compost" should start with "garden/tomatoes.md"
+    And the notes similar to "databases/sqlite.md" should not include "databases/sqlite.md"
+
+  Scenario: Vectors follow notes as they change, move and disappear
+    Given the notes about databases and gardening
+    When "garden/basil.md" is rewritten as "Postgres and SQLite both replay a write ahead log"
+    And "garden" is moved to "archive" as a folder
+    And "databases/postgres.md" is deleted
+    Then the notes similar to "databases/sqlite.md" should start with "archive/basil.md"
+    And no note should be similar to the text "standby servers"
+    When a note "databases/mysql.md" is added with content "MySQL writes a redo log"
+    Then the vector matrix should have 4 rows in use
+
+  Scenario: A missing vector file is rebuilt when the database is opened
+    Given the notes about databases and gardening
+    When the vector file is deleted and the database is reopened
+    Then the notes similar to "databases/sqlite.md" should start with "databases/postgres.md"
@@ -0,0 +1,21 @@
+Feature: Tag Index
+
+  As a consumer of the index
+  I want tags stored in an indexed table
+  So that "notes with tag X" queries don't scan and parse every row.
+
+  Scenario: Look up notes by tag, nested tag prefix and count
+    Given a note "alpha.md" tagged "project/alpha, work"
+    And a note "beta.md" tagged "project/beta"
+    And a note "projects.md" tagged "projects"
+    Then notes tagged "work" should be "alpha.md"
+    And notes under tag "project" should be "alpha.md, beta.md"
+    And the tag counts should be "project/alpha=1, project/beta=1, projects=1, work=1"
+
+  Scenario: Tags follow updates and deletes
+    Given a note "alpha.md" tagged "project/alpha, work"
+    And a note "beta.md" tagged "work"
+    When "alpha.md" is retagged "personal"
+    And "beta.md" is deleted
+    Then no notes should be tagged "work"
+    And the tag counts should be "personal=1"
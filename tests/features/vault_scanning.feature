@@ -0,0 +1,65 @@
+Feature: Vault Scanning
+
+  As a user of the index service
+  I want restarts of the service to only re-index notes that changed
+  So that the startup scan stays fast on large vaults.
+
+  Scenario: Rescan skips unchanged notes
+    Given a vault with 3 notes
+    And the vault has been scanned once
+    When the vault is scanned again
+    Then 3 files should be skipped
+    And 0 files should be parsed
+
+  Scenario: Rescan re-indexes a modified note
+    Given a vault with 3 notes
+    And the vault has been scanned once
+    When note 1 is modified
+    And the vault is scanned again
+    Then 2 files should be skipped
+    And 1 files should be parsed
+    And the stored content of note 1 should be updated
+
+  Scenario: Scan writes notes in batched transactions
+    Given a vault with 5 notes
+    And a scanner with a batch size of 2
+    When the vault is scanned again
+    Then 5 notes should be stored in the database
+
+  Scenario: Parallel scan stores the same data as a serial scan
+    Given a vault with 150 notes
+    And an invalid markdown file in the vault
+    And a scanner with 2 workers
+    When the vault is scanned again
+    Then the stored notes should match a serial scan
+
+  Scenario: Scan skips notes in ignored folders
+    Given a vault with 2 notes
+    And notes inside ".obsidian", ".trash" and "drafts"
+    And a scanner ignoring "drafts/" and "*.tmp.md"
+    When the vault is scanned again
+    Then 2 notes should be stored in the database
+
+  Scenario: The last matching ignore pattern decides
+    Given the ignore patterns "!first.md ; *.md ; !b*.md ; bad.md"
+    Then "first.md" should be ignored
+    And "bad.md" should be ignored
+    And "b.md" should not be ignored
+    And "notes.txt" should not be ignored
+
+  Scenario: Rescan removes notes deleted or renamed while the service was down
+    Given a vault with 4 notes
+    And the vault has been scanned once
+    When note 1 is deleted from disk
+    And note 2 is renamed to "renamed.md" on disk
+    And the vault is scanned again
+    Then the removed paths should be "note_1.md, note_2.md"
+    And the stored paths should be "note_3.md, note_4.md, renamed.md"
+
+  Scenario: Rescan keeps the index when the vault is empty
+    Given a vault with 2 notes
+    And the vault has been scanned once
+    When every note is deleted from disk
+    And the vault is scanned again
+    Then no paths should have been removed
+    And the stored paths should be "note_1.md, note_2.md"
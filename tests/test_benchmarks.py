@@ -0,0 +1,82 @@
+"""Test the synthetic vault generator and the benchmark runner."""
+
+import json
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from benchmarks.run_benchmarks import run_benchmarks
+from benchmarks.vault_generator import generate_vault
+
+# Import test scenarios from the feature file
+scenarios('./features/benchmarks.feature')
+
+
+@pytest.fixture
+def context():
+    """Shared state between steps."""
+    return {}
+
+
+@given(parsers.parse("two vaults generated with seed {seed:d} and {notes:d} notes"))
+def two_vaults(temp_dir, context, seed, notes):
+    """Generate the same vault twice."""
+    context["vaults"] = [temp_dir / "first", temp_dir / "second"]
+    for vault in context["vaults"]:
+        generate_vault(vault, notes=notes, seed=seed, folder_depth=2)
+
+
+@then("both vaults should contain identical files")
+def verify_identical(context):
+    """Verify the two vaults match file for file."""
+    first, second = context["vaults"]
+    files = sorted(path.relative_to(first) for path in first.rglob("*.md"))
+    assert files == sorted(path.relative_to(second) for path in second.rglob("*.md"))
+    assert all((first / f).read_bytes() == (second / f).read_bytes() for f in files)
+
+
+@when(parsers.parse("the benchmarks run on a vault of {notes:d} notes"))
+def run(temp_dir, context, notes):
+    """Run every benchmark on a small vault."""
+    context["report"] = run_benchmarks(temp_dir, notes=notes, events=5, query_repeats=2)
+
+
+@then("the report should survive a JSON round trip")
+def verify_json(context):
+    """Verify the report serializes without loss."""
+    report = context["report"]
+    assert json.loads(json.dumps(report)) == report
+
+
+@then(parsers.parse("the full scan should have indexed {notes:d} notes"))
+def verify_full_scan(context, notes):
+    """Verify the full scan indexed the generated vault."""
+    full_scan = context["report"]["results"]["full_scan"]
+    assert full_scan["files"] == notes
+    assert full_scan["written"] == notes
+
+
+@then("the incremental rescan should have parsed fewer notes than the full scan")
+def verify_rescan(context):
+    """Verify only touched notes were parsed again."""
+    results = context["report"]["results"]
+    assert results["noop_rescan"]["parsed"] == 0
+    assert 0 < results["incremental_rescan"]["parsed"] < results["full_scan"]["parsed"]
+
+
+@then("every timed event should have been committed")
+def verify_events(context):
+    """Verify the event benchmark saw every commit."""
+    events = context["report"]["results"]["event_latency"]
+    assert events["count"] == 5
+    assert events["lost"] == 0
+
+
+@then("every consumer query should use an index after the migration")
+def verify_query_plans(context):
+    """Verify the migrated indexes replace full scans and sorts."""
+    plans = context["report"]["results"]["query_plans"]
+    assert plans["schema_version"] >= 1
+    for name, timings in plans["queries"].items():
+        assert any("INDEX" in step for step in timings["after"]["plan"]), name
+        assert timings["after"]["plan"] != timings["before"]["plan"], name
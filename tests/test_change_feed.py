@@ -0,0 +1,87 @@
+"""Test the sequenced change feed."""
+
+import os
+
+from pytest_bdd import scenarios, given, when, then, parsers
+
+# Import test scenarios from the feature file
+scenarios('./features/change_feed.feature')
+
+
+def split_list(text):
+    """Split a comma-separated step argument, converting '/' to the platform separator."""
+    return [item.strip().replace("/", os.sep) for item in text.split(",") if item.strip()]
+
+
+def describe(entries):
+    """Render change feed entries the way the steps write them."""
+    return [
+        f"{entry['op']} {entry['old_path']}>{entry['path']}" if entry["old_path"]
+        else f"{entry['op']} {entry['path']}"
+        for entry in entries
+    ]
+
+
+@given(parsers.parse('notes "{paths}" are indexed'))
+@when(parsers.parse('notes "{paths}" are indexed'))
+def index_notes(database, paths):
+    """Index notes with minimal metadata."""
+    for path in split_list(paths):
+        assert database.insert_or_update_note({"path": path, "title": path, "tags": "[]"})
+
+
+@when(parsers.parse('"{old_path}" is moved to "{new_path}"'))
+def move_note(database, old_path, new_path):
+    """Move a note."""
+    assert database.move_note(old_path, new_path)
+
+
+@when(parsers.parse('"{path}" is removed'))
+def remove_note(database, path):
+    """Delete a note."""
+    assert database.delete_note(path)
+
+
+@when(parsers.parse('folder "{old_folder}" is moved to "{new_folder}"'))
+def move_folder(database, old_folder, new_folder):
+    """Move a folder."""
+    assert database.move_folder(old_folder, new_folder)
+
+
+@when(parsers.parse('folder "{folder}" is removed'))
+def remove_folder(database, folder):
+    """Delete a folder."""
+    assert database.delete_folder(folder)
+
+
+@given(parsers.parse("the first {count:d} change feed entries are {days:d} days old"))
+def age_entries(database, count, days):
+    """Backdate the oldest entries."""
+    with database.connection.conn:
+        database.connection.conn.execute(
+            "UPDATE changes SET ts = datetime('now', ?) WHERE seq <= ?", (f"-{days} days", count)
+        )
+
+
+@when("the change feed is pruned")
+def prune(database):
+    """Apply the default retention."""
+    assert database.prune_changes() > 0
+
+
+@then(parsers.parse('the change feed should read "{expected}"'))
+def verify_feed(database, expected):
+    """Verify the whole feed."""
+    assert describe(database.changes_since(0)) == split_list(expected)
+
+
+@then(parsers.parse('the change feed after entry {seq:d} should read "{expected}"'))
+def verify_feed_after(database, seq, expected):
+    """Verify the entries after a sequence number."""
+    assert describe(database.changes_since(seq)) == split_list(expected)
+
+
+@then(parsers.parse("the change feed should hold entries {first:d} to {last:d}"))
+def verify_bounds(database, first, last):
+    """Verify the retained range of sequence numbers."""
+    assert database.get_change_feed_bounds() == (first, last)
@@ -0,0 +1,143 @@
+"""Test heading-aware note chunking."""
+
+import json
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+# Import test scenarios from the feature file
+scenarios('./features/chunks.feature')
+
+
+@pytest.fixture
+def context():
+    """Share chunk rowids between steps."""
+    return {}
+
+
+def split_list(text, separator=","):
+    """Split a separated step argument."""
+    return [item.strip() for item in text.split(separator) if item.strip()]
+
+
+def index_note(vault_path, note_processor, database, path, content):
+    """Write a note to the vault and index it."""
+    note_path = vault_path / path
+    note_path.parent.mkdir(parents=True, exist_ok=True)
+    note_path.write_text(content)
+    assert database.insert_or_update_note(note_processor.process_file(note_path))
+
+
+def chunk_rowids(database, path):
+    """Map each chunk ordinal of a note to its rowid, which changes when the row is replaced."""
+    rows = database.connection.conn.execute(
+        'SELECT ordinal, rowid FROM chunks WHERE path = ?', (path,)
+    )
+    return dict(rows.fetchall())
+
+
+@given(parsers.parse('a note "{path}" with the sections "{sections}"'))
+def note_with_sections(vault_path, note_processor, database, context, path, sections):
+    """Index a note made of blank-line separated blocks."""
+    index_note(vault_path, note_processor, database, path, "\n\n".join(split_list(sections, "|")))
+    context["rowids"] = chunk_rowids(database, path)
+
+
+@given(parsers.parse('a note "{path}" with a heading "{heading}" and {count:d} paragraphs of {size:d} characters'))
+def note_with_paragraphs(vault_path, note_processor, database, path, heading, count, size):
+    """Index a note with one long section."""
+    paragraphs = [str(i % 10) * size for i in range(count)]
+    index_note(vault_path, note_processor, database, path, "\n\n".join([heading] + paragraphs))
+
+
+@when(parsers.parse('"{old}" is replaced with "{new}" in "{path}"'))
+def edit_note(vault_path, note_processor, database, old, new, path):
+    """Edit a note in place and reindex it."""
+    note_path = vault_path / path
+    note_path.write_text(note_path.read_text().replace(old, new))
+    assert database.insert_or_update_note(note_processor.process_file(note_path))
+
+
+@when(parsers.parse('a section "{section}" is inserted before "{marker}" in "{path}"'))
+def insert_section(vault_path, note_processor, database, section, marker, path):
+    """Add a section in the middle of a note and reindex it."""
+    note_path = vault_path / path
+    block = "\n\n".join(split_list(section, "|"))
+    note_path.write_text(note_path.read_text().replace(marker, f"{block}\n\n{marker}"))
+    assert database.insert_or_update_note(note_processor.process_file(note_path))
+
+
+@when(parsers.parse('"{old_path}" is moved to "{new_path}"'))
+def move_note(database, old_path, new_path):
+    """Move a note in the index."""
+    assert database.move_note(old_path, new_path)
+
+
+@when(parsers.parse('"{folder}" is deleted as a folder'))
+def delete_folder(database, folder):
+    """Delete every note below a folder."""
+    assert database.delete_folder(folder)
+
+
+@then(parsers.parse('the chunk headings of "{path}" should be "{headings}"'))
+def verify_headings(database, path, headings):
+    """Verify each chunk's heading path, '-' for text before the first heading."""
+    paths = [" > ".join(json.loads(chunk['heading_path'])) or "-" for chunk in database.get_chunks(path)]
+    assert paths == split_list(headings, ";")
+
+
+@then(parsers.parse('the chunks of "{path}" should start with "{lines}"'))
+def verify_first_lines(database, path, lines):
+    """Verify the first line of each chunk."""
+    assert [chunk['text'].splitlines()[0] for chunk in database.get_chunks(path)] == split_list(lines)
+
+
+@then(parsers.parse('"{path}" should have {count:d} chunks'))
+def verify_chunk_count(database, path, count):
+    """Verify the number of chunks stored for a note."""
+    assert len(database.get_chunks(path)) == count
+
+
+@then(parsers.parse('every chunk of "{path}" should be at most {size:d} characters under "{heading}"'))
+def verify_chunk_sizes(database, path, size, heading):
+    """Verify split chunks keep their section's heading and stay within the size limit."""
+    for chunk in database.get_chunks(path):
+        assert len(chunk['text']) <= size
+        assert json.loads(chunk['heading_path']) == [heading]
+
+
+@then(parsers.parse('only chunk {ordinal:d} of "{path}" should have been rewritten'))
+def verify_rewrites(database, context, ordinal, path):
+    """Verify that only the edited chunk's row was replaced."""
+    before = context["rowids"]
+    after = chunk_rowids(database, path)
+    assert after.keys() == before.keys()
+    assert [o for o in after if after[o] != before[o]] == [ordinal]
+
+
+@then(parsers.parse('only {count:d} chunk row of "{path}" should have been written and none removed'))
+def verify_inserted_rows(database, context, count, path):
+    """Verify the stored chunks were kept, renumbered where needed, and one row was added."""
+    before = set(context["rowids"].values())
+    after = set(chunk_rowids(database, path).values())
+    assert before <= after
+    assert len(after - before) == count
+
+
+@then(parsers.parse('the chunk_texts view should match the chunks of "{path}"'))
+def verify_chunk_view(database, path):
+    """Verify SQL readers get the same chunk text as get_chunks."""
+    rows = database.connection.conn.execute(
+        'SELECT ordinal, text FROM chunk_texts WHERE path = ? ORDER BY ordinal', (path,)
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        (chunk['ordinal'], chunk['text']) for chunk in database.get_chunks(path)
+    ]
+
+
+@then(parsers.parse('the chunk offsets of "{path}" should match its content'))
+def verify_offsets(database, path):
+    """Verify that shifted chunks had their offsets updated."""
+    content = database.get_note_content(path)
+    for chunk in database.get_chunks(path):
+        assert content[chunk['start']:chunk['end']] == chunk['text']
@@ -0,0 +1,122 @@
+"""Test compressed note content storage."""
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from obsidian_index_service.db.database import Database
+
+# Import test scenarios from the feature file
+scenarios('./features/content_storage.feature')
+
+
+@pytest.fixture
+def storage():
+    """Holds the database under test so steps can reopen it."""
+    holder = {}
+    yield holder
+    if holder.get("db"):
+        holder["db"].close()
+
+
+def reopen(storage, db_path, compress_content):
+    """Close the current database and open it again in the given mode."""
+    if storage.get("db"):
+        storage["db"].close()
+    storage["db"] = Database(db_path, compress_content=compress_content)
+    return storage["db"]
+
+
+@given("a database that compresses content")
+@when("the database is reopened with compression")
+def compressed_database(storage, db_path):
+    """Open the database with compressed content storage."""
+    reopen(storage, db_path, True)
+
+
+@given("a database that stores content inline")
+@when("the database is reopened without compression")
+def inline_database(storage, db_path):
+    """Open the database with inline content storage."""
+    reopen(storage, db_path, False)
+
+
+@when(parsers.parse('a note "{path}" with content "{content}" is stored'))
+def store_note(storage, path, content):
+    """Insert a note with the given content."""
+    note = {"path": path, "title": path[:-3], "tags": "[]", "content": content}
+    assert storage["db"].insert_or_update_note(note)
+
+
+@when(parsers.parse("{count:d} notes of {lines:d} lines each are stored"), target_fixture="raw_size")
+def store_notes(storage, count, lines):
+    """Insert notes of distinct lines, returning their total content size."""
+    raw_size = 0
+    for i in range(count):
+        content = "\n".join(
+            f"Line {j} of note {i}: the quick brown fox jumps over the lazy dog." for j in range(lines)
+        )
+        raw_size += len(content)
+        note = {"path": f"note-{i}.md", "title": f"note-{i}", "tags": "[]", "content": content}
+        assert storage["db"].insert_or_update_note(note)
+    return raw_size
+
+
+@then("the notes table should hold no inline content")
+def verify_no_inline_content(storage):
+    """Verify content lives only in the compressed table."""
+    conn = storage["db"].connection.conn
+    assert conn.execute("SELECT COUNT(*) FROM notes WHERE content IS NOT NULL").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM note_content").fetchone()[0] == 1
+
+
+@then("the content table should be empty")
+def verify_content_table_empty(storage):
+    """Verify no compressed content is left behind."""
+    conn = storage["db"].connection.conn
+    assert conn.execute("SELECT COUNT(*) FROM note_content").fetchone()[0] == 0
+
+
+@then(parsers.parse('the content of "{path}" should be "{content}"'))
+def verify_content(storage, path, content):
+    """Verify both read APIs return the original content."""
+    assert storage["db"].get_note_content(path) == content
+    notes = {note["path"]: note for note in storage["db"].get_all_notes()}
+    assert notes[path]["content"] == content
+
+
+@then("a metadata-only read should not include content")
+def verify_metadata_only(storage):
+    """Verify metadata-only reads leave content out."""
+    notes = storage["db"].get_all_notes(include_content=False)
+    assert notes and all("content" not in note for note in notes)
+
+
+@then(parsers.parse('searching for "{query}" should find "{path}"'))
+def verify_search(storage, query, path):
+    """Verify the full-text index still covers compressed content."""
+    assert [result["path"] for result in storage["db"].search(query)] == [path]
+
+
+@then("the full-text index should keep no copy of the content")
+def verify_no_index_copy(storage):
+    """Verify notes_fts reads content from the notes instead of its own table."""
+    conn = storage["db"].connection.conn
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "notes_fts" in tables
+    assert "notes_fts_content" not in tables
+
+
+@then("the chunks table should keep no copy of the content")
+def verify_no_chunk_copy(storage):
+    """Verify chunks store offsets into the content rather than its text."""
+    conn = storage["db"].connection.conn
+    assert "text" not in {row[1] for row in conn.execute("PRAGMA table_info(chunks)")}
+
+
+@then("the stored content and its index should take less than half the raw size")
+def verify_stored_size(storage, raw_size):
+    """Verify the compressed content plus the index stay well below the raw text."""
+    conn = storage["db"].connection.conn
+    content_size = conn.execute("SELECT SUM(length(data)) FROM note_content").fetchone()[0]
+    index_size = conn.execute("SELECT SUM(length(block)) FROM notes_fts_data").fetchone()[0]
+    assert content_size + index_size < raw_size / 2
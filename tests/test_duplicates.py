@@ -0,0 +1,82 @@
+"""Test near-duplicate detection with MinHash signatures and LSH buckets."""
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+# Signatures are computed with NumPy, an optional dependency
+pytest.importorskip("numpy")
+
+# Import test scenarios from the feature file
+scenarios('./features/duplicates.feature')
+
+TEMPLATE = """# Weekly sync {day}
+
+Attendees: the platform team and the product owner.
+
+## Agenda
+Review last week's action items, go through the open incidents, agree on the
+release date for the next version and collect topics for the retrospective.
+
+## Action items
+Everyone updates their tickets before the end of the day and the release
+manager sends the summary to the wider engineering group.
+"""
+
+PLAN = """Move the photo library to the new storage server, check the backups
+of the old one, update the paths in the import scripts and tell everyone
+which shares go read only during the migration weekend."""
+
+UNRELATED = """Mix flour, water, salt and a little yeast, knead for ten minutes,
+let the dough rise overnight in a cool place and bake it in a hot oven."""
+
+
+def index_note(vault_path, note_processor, database, path, content):
+    """Write a note to the vault and index it."""
+    note_path = vault_path / path
+    note_path.parent.mkdir(parents=True, exist_ok=True)
+    note_path.write_text(content)
+    assert database.insert_or_update_note(note_processor.process_file(note_path))
+
+
+@given(parsers.parse('the meeting notes "{first}", "{second}" and "{third}" from one template'))
+def template_notes(vault_path, note_processor, database, first, second, third):
+    """Index notes that differ only in the day in their heading."""
+    for path, day in ((first, "Monday"), (second, "Tuesday"), (third, "Wednesday")):
+        index_note(vault_path, note_processor, database, path, TEMPLATE.format(day=day))
+
+
+@given(parsers.parse('a note "{path}" and its sync conflict "{conflict}"'))
+def conflicting_notes(vault_path, note_processor, database, path, conflict):
+    """Index a note and an identical conflicted copy."""
+    index_note(vault_path, note_processor, database, path, PLAN)
+    index_note(vault_path, note_processor, database, conflict, PLAN)
+
+
+@given(parsers.parse('an unrelated note "{path}"'))
+@when(parsers.parse('"{path}" is rewritten as an unrelated note'))
+def unrelated_note(vault_path, note_processor, database, path):
+    """Index a note that shares nothing with the others."""
+    index_note(vault_path, note_processor, database, path, UNRELATED)
+
+
+@when(parsers.parse('"{old_folder}" is moved to "{new_folder}" as a folder'))
+def move_folder(database, old_folder, new_folder):
+    """Move every note below a folder."""
+    assert database.move_folder(old_folder, new_folder)
+
+
+@when(parsers.parse('"{path}" is deleted'))
+def delete_note(database, path):
+    """Delete a note from the index."""
+    assert database.delete_note(path)
+
+
+@then(parsers.parse('the duplicate clusters should be "{clusters}"'))
+def verify_clusters(database, clusters):
+    """Verify the clusters found, separated by ';', each a comma-separated list of paths."""
+    expected = [
+        [path.strip() for path in cluster.split(",")] for cluster in clusters.split(";")
+    ]
+    found = database.find_duplicates()
+    assert [cluster["paths"] for cluster in found] == expected
+    assert all(0.8 <= cluster["similarity"] <= 1 for cluster in found)
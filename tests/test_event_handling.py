@@ -0,0 +1,395 @@
+"""Test file system event handling."""
+
+import shutil
+import time
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+from watchdog.events import (
+    DirDeletedEvent,
+    DirMovedEvent,
+    FileCreatedEvent,
+    FileModifiedEvent,
+    FileMovedEvent,
+)
+
+from obsidian_index_service.db.operations import CHANGE_UPSERT
+from obsidian_index_service.db.writer import DatabaseWriter
+from obsidian_index_service.file_watcher.handlers import VaultEventHandler
+from obsidian_index_service.file_watcher.watcher import FileWatcher
+
+# Import test scenarios from the feature file
+scenarios('./features/event_handling.feature')
+
+
+@given("an event handler with a debounce window", target_fixture="event_handler")
+def debounced_handler(note_processor, database):
+    """Create an event handler whose queue is flushed manually by the test."""
+    return VaultEventHandler(note_processor, database, debounce_seconds=60)
+
+
+@given("a note in the vault", target_fixture="note_path")
+def note_in_vault(vault_path):
+    """Create a note on disk."""
+    note_path = vault_path / "burst.md"
+    note_path.write_text("---\ntags: [burst]\n---\n\nBurst content.\n")
+    return note_path
+
+
+@when(parsers.parse("the note receives {count:d} modify events"))
+def modify_events(event_handler, note_path, count):
+    """Deliver a burst of modify events for the note."""
+    for _ in range(count):
+        event_handler.on_modified(FileModifiedEvent(str(note_path)))
+
+
+@when("the note is created and then renamed")
+def create_and_rename(event_handler, note_path):
+    """Deliver create, modify and move events as an editor would on save-as."""
+    renamed_path = note_path.with_name("renamed.md")
+    event_handler.on_created(FileCreatedEvent(str(note_path)))
+    event_handler.on_modified(FileModifiedEvent(str(note_path)))
+    note_path.rename(renamed_path)
+    event_handler.on_moved(FileMovedEvent(str(note_path), str(renamed_path)))
+
+
+@given(parsers.parse('indexed notes "{first}" and "{second}"'))
+def indexed_pair(vault_path, note_processor, database, first, second):
+    """Create and index two notes whose content is their own name."""
+    for name in (first, second):
+        note_path = vault_path / name
+        note_path.write_text(f"Content of {name}.\n")
+        assert database.insert_or_update_note(note_processor.process_file(note_path))
+
+
+@when(parsers.parse('"{first}" is renamed to "{target}" and then "{second}" is renamed over it'))
+def rename_twice_onto(event_handler, vault_path, first, target, second):
+    """Rename one note to a path and then another note over it, within one window."""
+    for name in (first, second):
+        (vault_path / name).replace(vault_path / target)
+        event_handler.on_moved(FileMovedEvent(str(vault_path / name), str(vault_path / target)))
+
+
+@then(parsers.parse('only "{target}" should be stored with the content of "{second}"'))
+def verify_overwritten_move(database, target, second):
+    """Verify the overwritten note's old path left the index."""
+    assert [note['path'] for note in database.get_all_notes()] == [target]
+    assert database.get_note_content(target) == f"Content of {second}."
+
+
+@when("the event queue is flushed")
+def flush_queue(event_handler):
+    """Dispatch every pending action."""
+    event_handler.event_queue.flush()
+
+
+@then("the note should be stored in the database")
+def verify_note_stored(database):
+    """Verify the note was indexed."""
+    assert [note['path'] for note in database.get_all_notes()] == ["burst.md"]
+
+
+@then("only the renamed note should be stored in the database")
+def verify_renamed_note_stored(database):
+    """Verify the note is indexed at its final path only."""
+    assert [note['path'] for note in database.get_all_notes()] == ["renamed.md"]
+
+
+@then(parsers.parse("{count:d} raw events should have been absorbed"))
+def verify_absorbed(event_handler, count):
+    """Verify how many events were merged into a pending action."""
+    assert event_handler.stats()['absorbed_events'] == count
+
+
+@then(parsers.parse("{count:d} action should have been dispatched"))
+def verify_dispatched(event_handler, count):
+    """Verify how many actions reached the index."""
+    assert event_handler.stats()['dispatched_actions'] == count
+
+
+@given("a running database writer", target_fixture="writer")
+def running_writer(database):
+    """Start a writer thread on the test database."""
+    writer = DatabaseWriter(database, max_queue_size=5, max_batch_size=10)
+    writer.start()
+    return writer
+
+
+@when(parsers.parse("{count:d} notes are queued to the writer"))
+def queue_notes(writer, count):
+    """Queue note upserts faster than the writer commits them."""
+    for i in range(count):
+        writer.insert_or_update_note({"path": f"queued_{i}.md", "content": f"Queued {i}"})
+
+
+@when("the writer is stopped")
+def stop_writer(writer):
+    """Stop the writer, draining its queue."""
+    writer.stop()
+
+
+@then(parsers.parse("{count:d} notes should be stored in the database"))
+def verify_note_count(database, count):
+    """Verify every queued note was committed."""
+    assert len(database.get_all_notes()) == count
+
+
+@then("the writer should have committed them in fewer transactions than notes")
+def verify_group_commit(writer):
+    """Verify changes were grouped into shared transactions."""
+    stats = writer.stats()
+    assert stats['committed_changes'] == 25
+    assert stats['failed_changes'] == 0
+    assert stats['max_queue_depth'] <= 5
+    assert stats['batches'] < 25
+
+
+@given("an event handler without a debounce window", target_fixture="event_handler")
+def direct_handler(note_processor, database):
+    """Create an event handler that processes events as they arrive."""
+    return VaultEventHandler(note_processor, database)
+
+
+@when("the note is touched without changing its content")
+def touch_note(event_handler, note_path):
+    """Rewrite the same bytes and deliver a modify event."""
+    note_path.write_bytes(note_path.read_bytes())
+    event_handler.on_modified(FileModifiedEvent(str(note_path)))
+
+
+@then(parsers.parse("the handler should report {hits:d} hash hit and {misses:d} hash miss"))
+def verify_hash_counters(event_handler, hits, misses):
+    """Verify how many events were short-circuited by the content hash."""
+    stats = event_handler.stats()
+    assert stats['hash_hits'] == hits
+    assert stats['hash_misses'] == misses
+
+
+@when("the note is renamed into a subfolder")
+def rename_into_subfolder(event_handler, note_path):
+    """Move the note on disk and deliver the move event."""
+    (note_path.parent / "archive").mkdir()
+    renamed_path = note_path.parent / "archive" / "renamed.md"
+    note_path.rename(renamed_path)
+    event_handler.on_moved(FileMovedEvent(str(note_path), str(renamed_path)))
+
+
+@then("the moved note should be stored with its new title and folder")
+def verify_moved_note(database):
+    """Verify path, title, folder and tags of the moved note."""
+    notes = database.get_all_notes()
+    assert [note['path'] for note in notes] == ["archive/renamed.md"]
+    assert notes[0]['title'] == "renamed"
+    assert notes[0]['parent_folder'] == "archive"
+    assert database.get_notes_by_tag("burst") == ["archive/renamed.md"]
+    assert [result['path'] for result in database.search("renamed")] == ["archive/renamed.md"]
+
+
+@then(parsers.parse("the handler should report {count:d} rename"))
+def verify_renames(event_handler, count):
+    """Verify how many moves were applied in place."""
+    assert event_handler.stats()['renames'] == count
+
+
+@given(parsers.parse('an indexed folder "{folder}" with {count:d} notes'))
+def indexed_folder(vault_path, event_handler, folder, count):
+    """Create notes in a folder and index them through create events."""
+    (vault_path / folder).mkdir()
+    for i in range(count):
+        note_path = vault_path / folder / f"note_{i}.md"
+        note_path.write_text(f"Note {i}\n")
+        event_handler.on_created(FileCreatedEvent(str(note_path)))
+
+
+@when(parsers.parse('the folder "{folder}" is renamed to "{new_folder}" with per-file events'))
+def rename_folder(vault_path, event_handler, folder, new_folder):
+    """Rename a folder and deliver the folder event followed by its per-file events."""
+    src, dest = vault_path / folder, vault_path / new_folder
+    children = sorted(path.name for path in src.iterdir())
+    src.rename(dest)
+    event_handler.on_moved(DirMovedEvent(str(src), str(dest)))
+    for name in children:
+        event_handler.on_moved(FileMovedEvent(str(src / name), str(dest / name)))
+
+
+@when(parsers.parse('the folder "{folder}" is deleted'))
+def delete_folder(vault_path, event_handler, folder):
+    """Delete a folder and deliver only the folder event."""
+    shutil.rmtree(vault_path / folder)
+    event_handler.on_deleted(DirDeletedEvent(str(vault_path / folder)))
+
+
+@then(parsers.parse('the notes should be stored below "{folder}"'))
+def verify_notes_moved(database, folder):
+    """Verify paths and parent folders were rewritten."""
+    notes = database.get_all_notes()
+    assert sorted(note['path'] for note in notes) == [f"{folder}/note_{i}.md" for i in range(3)]
+    assert {note['parent_folder'] for note in notes} == {folder}
+
+
+@then(parsers.parse("the handler should report {count:d} suppressed events"))
+def verify_suppressed(event_handler, count):
+    """Verify per-file events covered by the folder event were ignored."""
+    assert event_handler.stats()['suppressed_events'] == count
+
+
+@then("no notes should be stored in the database")
+def verify_no_notes(database):
+    """Verify the index is empty."""
+    assert database.get_all_notes() == []
+
+
+@when(parsers.parse('note {number:d} of "{folder}" is moved to the trash'))
+def move_to_trash(vault_path, event_handler, number, folder):
+    """Move a note into Obsidian's trash folder as the app does on delete."""
+    (vault_path / ".trash").mkdir(exist_ok=True)
+    src = vault_path / folder / f"note_{number}.md"
+    dest = vault_path / ".trash" / src.name
+    src.rename(dest)
+    event_handler.on_moved(FileMovedEvent(str(src), str(dest)))
+
+
+@when(parsers.parse('note {number:d} of "{folder}" is restored from the trash'))
+def restore_from_trash(vault_path, event_handler, number, folder):
+    """Move a trashed note back to its folder."""
+    src = vault_path / ".trash" / f"note_{number}.md"
+    dest = vault_path / folder / src.name
+    src.rename(dest)
+    event_handler.on_moved(FileMovedEvent(str(src), str(dest)))
+
+
+@when(parsers.parse('a note is created inside "{folder}"'))
+def create_in_ignored_folder(vault_path, event_handler, folder):
+    """Create a note in an ignored folder and deliver its create event."""
+    (vault_path / folder).mkdir(exist_ok=True)
+    note_path = vault_path / folder / "plugin.md"
+    note_path.write_text("Plugin notes\n")
+    event_handler.on_created(FileCreatedEvent(str(note_path)))
+
+
+@given("a running database writer with a background producer", target_fixture="writer")
+def running_background_writer(database):
+    """Start a writer thread and register a background producer with it."""
+    writer = DatabaseWriter(database)
+    writer.start()
+    writer.begin_background()
+    return writer
+
+
+@when(parsers.parse("{count:d} background notes and then 1 live note are queued at once"))
+def queue_background_then_live(writer, count):
+    """Queue background work ahead of a live change before the writer can take either."""
+    # Holding the writer's lock keeps its thread from taking a batch in between
+    with writer._condition:
+        for i in range(count):
+            writer.submit_background(
+                (CHANGE_UPSERT, {"path": f"scan_{i}.md", "content": "Scan"}), writer.mark()
+            )
+        writer.insert_or_update_note({"path": "live.md", "content": "Live"})
+
+
+@then("the live note should have been committed first")
+def verify_live_first(database):
+    """Verify the live note got the lowest rowid, i.e. was inserted first."""
+    rows = database.connection.conn.execute("SELECT path FROM notes ORDER BY rowid").fetchall()
+    assert [row[0] for row in rows] == ["live.md", "scan_0.md", "scan_1.md", "scan_2.md"]
+
+
+@when(parsers.parse('a background scan reads "{path}" before a live edit of it is queued'))
+def race_scan_and_live(writer, path):
+    """Queue a scan result that was read before a live edit of the same note."""
+    since = writer.mark()
+    with writer._condition:
+        writer.insert_or_update_note({"path": path, "content": "Live content"})
+        writer.submit_background((CHANGE_UPSERT, {"path": path, "content": "Scan content"}), since)
+    writer.end_background()
+
+
+@then(parsers.parse('the stored content of "{path}" should be "{content}"'))
+def verify_stored_content(database, path, content):
+    """Verify which version of the note won."""
+    assert database.get_note_content(path) == content
+
+
+@then(parsers.parse("{count:d} stale background change should have been dropped"))
+def verify_stale_dropped(writer, count):
+    """Verify the writer dropped the stale scan result."""
+    assert writer.stats()["background_stale"] == count
+
+
+@given(parsers.parse("a vault with {count:d} notes to watch"))
+def vault_to_watch(vault_path, count):
+    """Create notes that only the background scan will index."""
+    for i in range(count):
+        (vault_path / f"watched_{i}.md").write_text(f"# Watched {i}\n\nOriginal.\n")
+
+
+@given("an index entry for a note deleted while the service was down")
+def offline_deleted_entry(database):
+    """Index a note whose file no longer exists."""
+    assert database.insert_or_update_note({"path": "gone.md", "content": "Gone"})
+
+
+@when("the watcher starts with a background scan", target_fixture="file_watcher")
+def start_watcher(note_processor, database):
+    """Start the observer, then the scan behind it."""
+    file_watcher = FileWatcher(note_processor, database, debounce_seconds=0.05)
+    file_watcher.start()
+    file_watcher.start_background_scan()
+    return file_watcher
+
+
+@when(
+    parsers.parse("the watcher starts with a background scan on {workers:d} worker processes"),
+    target_fixture="file_watcher",
+)
+def start_parallel_watcher(note_processor, database, workers, recwarn):
+    """Start the watcher threads, then a scan that parses in worker processes."""
+    file_watcher = FileWatcher(note_processor, database, workers=workers, debounce_seconds=0.05)
+    file_watcher.start()
+    file_watcher.start_background_scan()
+    return file_watcher
+
+
+@when("the watcher starts without a debounce window", target_fixture="file_watcher")
+def start_inline_watcher(note_processor, database):
+    """Start a watcher whose handler has no event queue, then the scan."""
+    file_watcher = FileWatcher(note_processor, database, debounce_seconds=None)
+    file_watcher.start()
+    file_watcher.start_background_scan()
+    return file_watcher
+
+
+@when("a note is edited while the scan runs")
+def edit_during_scan(vault_path):
+    """Create and edit a note that the watcher has to pick up."""
+    note_path = vault_path / "live_edit.md"
+    note_path.write_text("First draft.\n")
+    time.sleep(0.2)
+    note_path.write_text("Latest draft.\n")
+
+
+@when("the watcher is stopped once the scan finishes")
+def stop_watcher(file_watcher):
+    """Wait for the scan and for the edit to settle, then stop everything."""
+    file_watcher.scan_thread.join(timeout=30)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        stats = file_watcher.stats()
+        if not stats["events"].get("pending") and not stats["writer"]["background_queue_depth"]:
+            break
+        time.sleep(0.05)
+    time.sleep(0.2)
+    file_watcher.stop_watching()
+
+
+@then("the edited note should hold its latest content")
+def verify_latest_content(database):
+    """Verify the live edit, not an earlier read, is stored."""
+    assert database.get_note_content("live_edit.md") == "Latest draft."
+    assert database.get_note_content("gone.md") is None
+
+
+@then("no worker process should have been forked from the threaded service")
+def verify_no_threaded_fork(recwarn):
+    """Verify Python didn't warn about forking while the watcher threads ran."""
+    assert not [w for w in recwarn if "fork()" in str(w.message)]
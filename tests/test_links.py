@@ -0,0 +1,47 @@
+"""Test the wikilink and backlink index."""
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+# Import test scenarios from the feature file
+scenarios('./features/links.feature')
+
+
+def split_list(text):
+    """Split a comma-separated step argument."""
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+@given(parsers.parse('a note "{path}" with content "{content}"'))
+@when(parsers.parse('a note "{path}" with content "{content}" is added'))
+def note_with_content(vault_path, note_processor, database, path, content):
+    """Write a note to the vault and index it."""
+    note_path = vault_path / path
+    note_path.parent.mkdir(parents=True, exist_ok=True)
+    note_path.write_text(content)
+    assert database.insert_or_update_note(note_processor.process_file(note_path))
+
+
+@when(parsers.parse('"{old_path}" is moved to "{new_path}"'))
+def move_note(database, old_path, new_path):
+    """Move a note in the index."""
+    assert database.move_note(old_path, new_path)
+
+
+@when(parsers.parse('"{folder}" is deleted as a folder'))
+def delete_folder(database, folder):
+    """Delete every note below a folder."""
+    assert database.delete_folder(folder)
+
+
+@then(parsers.parse('the outlinks of "{path}" should be "{links}"'))
+def verify_outlinks(database, path, links):
+    """Verify each outgoing link's target and resolved path, '-' for unresolved."""
+    outlinks = database.get_outlinks(path)
+    assert [f"{link['target']}={link['target_path'] or '-'}" for link in outlinks] == split_list(links)
+
+
+@then(parsers.parse('the backlinks of "{path}" should be "{paths}"'))
+def verify_backlinks(database, path, paths):
+    """Verify the notes linking to a note."""
+    assert [link['src_path'] for link in database.get_backlinks(path)] == split_list(paths)
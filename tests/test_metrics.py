@@ -0,0 +1,135 @@
+"""Test the metrics registry, its exporters and per-note logging modes."""
+
+import logging
+import urllib.request
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from obsidian_index_service.file_watcher.scanner import VaultScanner
+from obsidian_index_service.metrics import MetricsServer, StatsFileWriter, metrics
+from obsidian_index_service.note_processor.logging_config import log_note, set_note_log_mode
+
+# Import test scenarios from the feature file
+scenarios('./features/metrics.feature')
+
+
+@pytest.fixture
+def context():
+    """Shared state between steps."""
+    return {}
+
+
+@pytest.fixture(autouse=True)
+def restore_note_logging():
+    """Reset global metrics and logging state after each scenario."""
+    yield
+    metrics.reset()
+    set_note_log_mode("info")
+
+
+def metric_value(text, line_start):
+    """Return the value of the first exposition line starting with line_start."""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@given("an empty metrics registry")
+def empty_registry():
+    """Start from a clean registry."""
+    metrics.reset()
+
+
+@given(parsers.parse("a vault with {count:d} metric notes"))
+def metric_notes(vault_path, count):
+    """Create notes with frontmatter tags."""
+    for i in range(count):
+        (vault_path / f"note_{i}.md").write_text(f"---\ntags: [metrics]\n---\n# Note {i}\n")
+
+
+@when(parsers.parse("the vault is scanned with {workers:d} worker"))
+@when(parsers.parse("the vault is scanned with {workers:d} workers"))
+def scan(note_processor, database, workers):
+    """Scan the vault."""
+    VaultScanner(note_processor, database, workers=workers).scan_existing_files()
+
+
+@then(parsers.parse("the metrics should count {processed:d} processed notes and {written:d} written notes"))
+def verify_counts(processed, written):
+    """Verify the note counters."""
+    text = metrics.render_prometheus()
+    assert metric_value(text, 'obsidian_index_notes_processed_total{status="success"}') == processed
+    assert metric_value(text, "obsidian_index_notes_written_total") == written
+
+
+@then(parsers.parse('the stages "{stages}" should have timings'))
+def verify_stages(stages):
+    """Verify every stage histogram has observations."""
+    text = metrics.render_prometheus()
+    assert "# TYPE obsidian_index_stage_seconds histogram" in text
+    for stage in stages.split(", "):
+        count = metric_value(text, f'obsidian_index_stage_seconds_count{{stage="{stage}"}}')
+        assert count and count > 0, stage
+        inf = metric_value(text, f'obsidian_index_stage_seconds_bucket{{stage="{stage}",le="+Inf"}}')
+        assert inf == count
+
+
+@given("a counter and a gauge have been recorded")
+def record_metrics():
+    """Record a labelled counter and a gauge."""
+    metrics.inc("file_events_total", type="modified")
+    metrics.inc("file_events_total", 2, type="modified")
+    metrics.register_gauge("writer_queue_depth", lambda: 7)
+
+
+@then("the metrics endpoint should serve them in the Prometheus text format")
+def verify_endpoint():
+    """Verify the HTTP endpoint."""
+    server = MetricsServer(metrics, 0)
+    server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            text = response.read().decode("utf-8")
+    finally:
+        server.stop()
+    assert metric_value(text, 'obsidian_index_file_events_total{type="modified"}') == 3
+    assert metric_value(text, "obsidian_index_writer_queue_depth") == 7
+
+
+@then("the stats file should contain them in the Prometheus text format")
+def verify_stats_file(temp_dir):
+    """Verify the stats file is written on stop."""
+    path = temp_dir / "stats" / "metrics.prom"
+    writer = StatsFileWriter(metrics, str(path), interval=60)
+    writer.start()
+    writer.stop()
+    text = path.read_text()
+    assert metric_value(text, 'obsidian_index_file_events_total{type="modified"}') == 3
+    assert metric_value(text, "obsidian_index_writer_queue_depth") == 7
+
+
+@given(parsers.parse("per-note logging sampled one in {sample:d}"))
+def sampled_logging(sample):
+    """Switch per-note logging to sampled mode."""
+    set_note_log_mode("sampled", sample)
+
+
+@when(parsers.parse("{count:d} notes are logged"))
+def log_notes(caplog, context, count):
+    """Emit per-note log lines."""
+    logger = logging.getLogger("tests.note_logging")
+    with caplog.at_level(logging.DEBUG, logger="tests.note_logging"):
+        for i in range(count):
+            log_note(logger, "Processed note: %s", f"note_{i}.md")
+    context["records"] = [r for r in caplog.records if r.name == "tests.note_logging"]
+
+
+@then(parsers.parse("{count:d} note lines should be logged at info"))
+def verify_sampling(context, count):
+    """Verify one in N lines is logged at info and the rest at debug."""
+    levels = [record.levelno for record in context["records"]]
+    assert levels.count(logging.INFO) == count
+    assert len(levels) == 20
@@ -2,9 +2,12 @@
 
 import json
 from pathlib import Path
+import frontmatter
 import pytest
 from pytest_bdd import scenarios, given, when, then, parsers
 
+from obsidian_index_service.note_processor.frontmatter_parser import parse_frontmatter
+
 # Import test scenarios from the feature file
 scenarios('./features/note_processing.feature')
 
@@ -154,4 +157,47 @@ def verify_error_recorded(note_operations, attempt_process_invalid_note):
     
     # Check error status
     assert error_note['status'] == 'error'
-    assert error_note['error_message'] != '' 
\ No newline at end of file
+    assert error_note['error_message'] != '' 
+
+
+@given("notes with simple, complex, malformed and missing frontmatter", target_fixture="note_texts")
+def frontmatter_samples():
+    """Note texts covering the fast path, the YAML fallback and parse errors."""
+    malformed = Path(__file__).parent.parent / "example-vault" / "test-malformed-yaml.md"
+    return [
+        malformed.read_text(),
+        "---\ntags: [test, example]\n---\n\n# Test Note\n\nBody.\n",
+        "---\ntitle: Plan\ndraft: yes\npriority: 2\ndue: 2024-05-01\ntags:\n  - project/alpha\n  - 2024\n---\nBody\n",
+        "---\ntags: work, home\naliases: ~\n---\nBody\n",
+        "---\ntitle: \"Quoted: title\"\nnested:\n  key: value\n---\nBody\n",
+        "---\ntags: [a, b\n---\nBody\n",
+        "---\ncontent: clashes with the Post argument\n---\nBody\n",
+        "  \n---\ntags: [late]\n---\nBody\n",
+        "---\nno closing delimiter\n",
+        "---foo\nbar\n---\nk: v\n---\nqux",
+        "# No frontmatter\n\nJust text.\n",
+        "",
+    ]
+
+
+@when("each note is parsed by both frontmatter parsers", target_fixture="parse_results")
+def parse_with_both(note_texts):
+    """Parse every sample with python-frontmatter and the fast parser."""
+    def outcome(parse, text):
+        try:
+            return parse(text)
+        except Exception as e:
+            return type(e), str(e)
+
+    def library(text):
+        post = frontmatter.loads(text)
+        return post.metadata, post.content
+
+    return [(outcome(library, text), outcome(parse_frontmatter, text)) for text in note_texts]
+
+
+@then("the metadata, content and errors should be identical")
+def verify_identical(parse_results):
+    """Verify the fast parser never diverges from the library."""
+    for expected, actual in parse_results:
+        assert actual == expected
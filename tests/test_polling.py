@@ -0,0 +1,195 @@
+"""Test the polling watcher."""
+
+import os
+import time
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+from watchdog.events import FileSystemEventHandler
+
+from obsidian_index_service.file_watcher.poller import VaultPoller, detect_watch_mode
+from obsidian_index_service.file_watcher.watcher import FileWatcher
+from obsidian_index_service.note_processor.ignore import IgnoreMatcher
+
+# Import test scenarios from the feature file
+scenarios('./features/polling.feature')
+
+
+class RecordingHandler(FileSystemEventHandler):
+    """Collects the events a poller dispatches."""
+
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def on_any_event(self, event):
+        self.events.append(event)
+
+
+def split_list(text):
+    """Split a comma-separated step argument."""
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+@pytest.fixture
+def context():
+    """Shared state between steps."""
+    state = {}
+    yield state
+    if state.get("watcher"):
+        state["watcher"].stop_watching()
+
+
+def make_poller(context, vault_path, paths, stat_budget=1000):
+    """Write the notes and take the poller's initial snapshot."""
+    for path in split_list(paths):
+        note = vault_path / path
+        note.parent.mkdir(parents=True, exist_ok=True)
+        note.write_text(f"# {path}\n")
+    handler = RecordingHandler()
+    poller = VaultPoller(vault_path, handler, IgnoreMatcher(), stat_budget=stat_budget)
+    # Folders touched by the test would otherwise be listed on every poll
+    poller.racy_ns = 0
+    poller.poll(emit=False)
+    context.update(poller=poller, handler=handler, vault=vault_path)
+
+
+@given(parsers.parse('a polled vault with notes "{paths}" and a stat budget of {budget:d}'))
+def polled_vault_with_budget(context, vault_path, paths, budget):
+    """Snapshot a vault with a small stat budget."""
+    make_poller(context, vault_path, paths, budget)
+
+
+@given(parsers.parse('a polled vault with notes "{paths}"'))
+def polled_vault(context, vault_path, paths):
+    """Snapshot a vault."""
+    make_poller(context, vault_path, paths)
+
+
+def edit_in_place(note):
+    """Append to a note without touching its folder."""
+    with open(note, "a", encoding="utf-8") as f:
+        f.write("More text.\n")
+
+
+@when(parsers.parse('"{path}" is edited in place'))
+def edit_note(context, path):
+    """Change a note's size and mtime."""
+    edit_in_place(context["vault"] / path)
+
+
+@when("every note is edited in place")
+def edit_every_note(context):
+    """Change every note."""
+    for note in context["vault"].rglob("*.md"):
+        edit_in_place(note)
+
+
+@when(parsers.parse('"{old_path}" is renamed to "{new_path}"'))
+@when(parsers.parse('folder "{old_path}" is renamed to "{new_path}"'))
+def rename(context, old_path, new_path):
+    """Rename a note or folder."""
+    os.rename(context["vault"] / old_path, context["vault"] / new_path)
+
+
+@when(parsers.parse('"{path}" is created'))
+def create_note(context, path):
+    """Write a new note."""
+    (context["vault"] / path).write_text("New.\n")
+
+
+@when(parsers.parse('"{path}" is deleted'))
+def delete_note(context, path):
+    """Delete a note."""
+    os.remove(context["vault"] / path)
+
+
+@when(parsers.parse('folder "{path}" is deleted'))
+def delete_folder(context, path):
+    """Delete a folder and its notes."""
+    for note in (context["vault"] / path).rglob("*.md"):
+        os.remove(note)
+    os.rmdir(context["vault"] / path)
+
+
+def describe(context, event):
+    """Render an event the way the steps write it."""
+    def rel(path):
+        return os.path.relpath(path, context["vault"]).replace(os.sep, "/")
+    if event.event_type == "moved" and not event.is_directory:
+        return f"moved {rel(event.src_path)}>{rel(event.dest_path)}"
+    if event.event_type == "moved":
+        return f"moved {rel(event.dest_path)}"
+    return f"{event.event_type} {rel(event.src_path)}"
+
+
+def poll(context):
+    """Run one poll and return what it dispatched."""
+    context["handler"].events.clear()
+    context["poller"].poll()
+    return [describe(context, event) for event in context["handler"].events]
+
+
+@then(parsers.parse('the next poll should report "{expected}"'))
+def verify_poll(context, expected):
+    """Verify the events of the next poll."""
+    assert poll(context) == split_list(expected)
+
+
+@then("the next poll should report nothing")
+def verify_quiet_poll(context):
+    """Verify an unchanged vault produces no events."""
+    assert poll(context) == []
+
+
+@then(parsers.parse("the next poll should report {count:d} modified notes"))
+def verify_modified_count(context, count):
+    """Verify the stat budget limits how many notes one poll checks."""
+    events = poll(context)
+    assert len(events) == count
+    assert all(event.startswith("modified ") for event in events)
+
+
+@given(parsers.parse('a mount table with "{vault_mount}" on "{vault_type}" and "/" on "{root_type}"'))
+def mount_table(context, temp_dir, vault_mount, vault_type, root_type):
+    """Write a mount table in the /proc/mounts format."""
+    mounts = temp_dir / "mounts"
+    mounts.write_text(
+        f"/dev/sda1 / {root_type} rw,relatime 0 0\n"
+        f"server:/export {vault_mount} {vault_type} rw,relatime 0 0\n"
+    )
+    context["mounts"] = str(mounts)
+
+
+@then(parsers.parse('the watch mode for "{path}" should be "{mode}"'))
+def verify_watch_mode(context, path, mode):
+    """Verify the detected watch mode."""
+    assert detect_watch_mode(path, context["mounts"]) == mode
+
+
+@given("a file watcher in polling mode")
+def polling_watcher(context, note_processor, database):
+    """Start a file watcher that polls quickly."""
+    watcher = FileWatcher(
+        note_processor, database, debounce_seconds=0.05, watch_mode="polling", poll_interval=0.1
+    )
+    watcher.start()
+    context["watcher"] = watcher
+    deadline = time.monotonic() + 5
+    while watcher.observer.polls == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+@when(parsers.parse('a note "{path}" is written to the vault'))
+def write_note(vault_path, path):
+    """Write a note the watcher has to find."""
+    (vault_path / path).write_text("# Polled\n\nFound by polling.\n")
+
+
+@then(parsers.parse('"{path}" should be indexed within {seconds:d} seconds'))
+def verify_indexed(database, path, seconds):
+    """Wait for the note to reach the database."""
+    deadline = time.monotonic() + seconds
+    while database.get_content_hash(path) is None:
+        assert time.monotonic() < deadline, f"{path} was not indexed"
+        time.sleep(0.05)
@@ -0,0 +1,73 @@
+"""Test the streaming, paginated read API."""
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from obsidian_index_service.db.reader import METADATA_COLUMNS
+
+# Import test scenarios from the feature file
+scenarios('./features/reading.feature')
+
+
+@given(parsers.parse('{first:d} indexed notes in "{folder}", {second:d} in "{subfolder}" and {third:d} in ""'))
+def indexed_notes(database, first, folder, second, subfolder, third):
+    """Index notes across a folder, a subfolder and the vault root."""
+    notes = []
+    for count, parent in ((first, folder), (second, subfolder), (third, "")):
+        for i in range(count):
+            path = f"{parent}/note_{i}.md" if parent else f"note_{i}.md"
+            notes.append({
+                "path": path,
+                "title": f"note_{i}",
+                "parent_folder": parent,
+                "tags": "[]",
+                "modified_date": f"2024-01-{len(notes) + 1:02d}T00:00:00",
+                "content": f"Content of {path}",
+                "status": "error" if len(notes) == 0 else "success",
+            })
+    assert database.bulk_insert_or_update_notes(notes) == len(notes)
+
+
+@then(parsers.parse("iterating with a page size of {page_size:d} should yield {count:d} notes in path order"))
+def verify_iteration(database, page_size, count):
+    """Verify pagination yields every note once, in order, with content."""
+    notes = list(database.iter_notes(page_size=page_size))
+    paths = [note["path"] for note in notes]
+    assert len(paths) == count
+    assert paths == sorted(paths)
+    assert all(note["content"] == f"Content of {note['path']}" for note in notes)
+
+
+@then("a metadata-only iteration should not include content")
+def verify_projection(database):
+    """Verify column projection leaves content out."""
+    notes = list(database.iter_notes(columns=METADATA_COLUMNS))
+    assert notes and all("content" not in note for note in notes)
+    only_titles = next(database.iter_notes(columns=["title"]))
+    assert set(only_titles) == {"path", "title"}
+
+
+@then(parsers.parse('notes directly in "{folder}" should number {count:d}'))
+def verify_folder_filter(database, folder, count):
+    """Verify the exact parent folder filter."""
+    assert len(list(database.iter_notes(parent_folder=folder, page_size=2))) == count
+
+
+@then(parsers.parse('notes in or below "{folder}" should number {count:d}'))
+def verify_subfolder_filter(database, folder, count):
+    """Verify the recursive parent folder filter."""
+    notes = database.iter_notes(parent_folder=folder, include_subfolders=True, page_size=2)
+    assert len(list(notes)) == count
+
+
+@then(parsers.parse('notes modified from "{start}" until "{end}" should number {count:d}'))
+def verify_date_filter(database, start, end, count):
+    """Verify the modified date range filter."""
+    notes = database.iter_notes(modified_after=start, modified_before=end)
+    assert len(list(notes)) == count
+
+
+@then(parsers.parse('notes with status "{status}" should number {count:d}'))
+def verify_status_filter(database, status, count):
+    """Verify the status filter."""
+    assert len(list(database.iter_notes(status=status))) == count
@@ -0,0 +1,111 @@
+"""Test versioned schema migrations."""
+
+import sqlite3
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from obsidian_index_service.db.database import Database
+from obsidian_index_service.db.migrations import SCHEMA_VERSION, get_schema_version, migrate
+
+# Import test scenarios from the feature file
+scenarios('./features/schema_migrations.feature')
+
+
+@pytest.fixture
+def context():
+    """Shared state between steps."""
+    state = {"runs": []}
+    yield state
+    for key in ("db", "conn"):
+        if state.get(key):
+            state[key].close()
+
+
+@given(parsers.parse("a database written before schema versioning with {count:d} notes"))
+def legacy_database(db_path, count):
+    """Write a notes table the way releases without migrations did."""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE notes (path TEXT PRIMARY KEY, title TEXT, parent_folder TEXT, tags TEXT, "
+        "created_date TEXT, modified_date TEXT, content TEXT, status TEXT DEFAULT 'success', "
+        "error_message TEXT, last_indexed TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO notes (path, title, parent_folder, tags, content) VALUES (?, ?, 'folder', '[]', '')",
+        [(f"folder/note{i}.md", f"note{i}") for i in range(count)],
+    )
+    conn.commit()
+    conn.close()
+
+
+@when("the database is opened")
+def open_database(context, db_path):
+    """Open the database, which migrates it."""
+    context["db"] = Database(db_path)
+
+
+@then("the schema should be at the latest version")
+def verify_latest(context):
+    """Verify every migration was applied."""
+    assert get_schema_version(context["db"].connection.conn) == SCHEMA_VERSION
+    assert context["db"].connection.schema_version == SCHEMA_VERSION
+
+
+@then(parsers.parse("{count:d} notes should still be stored"))
+def verify_notes_kept(context, count):
+    """Verify the upgrade kept the existing rows."""
+    assert len(context["db"].get_all_notes(include_content=False)) == count
+
+
+@then("listing a folder should use an index")
+def verify_folder_plan(context):
+    """Verify folder listings no longer scan the whole table."""
+    plan = context["db"].connection.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT path, title FROM notes WHERE parent_folder = ? ORDER BY path",
+        ("folder",),
+    ).fetchall()
+    assert any("idx_notes_folder" in row[3] for row in plan)
+
+
+@given("a fresh connection")
+def fresh_connection(context):
+    """Open an empty in-memory database in autocommit mode."""
+    context["conn"] = sqlite3.connect(":memory:", isolation_level=None)
+
+
+def recording_migrations(context, failing_version=None):
+    """Three migrations that record their runs; one of them may fail."""
+    def step(version):
+        def run(conn):
+            if version == failing_version:
+                raise sqlite3.OperationalError(f"migration {version} failed")
+            conn.execute(f"CREATE TABLE t{version} (x)")
+            context["runs"].append(version)
+        return run
+    return tuple((version, f"table t{version}", (step(version),)) for version in (1, 2, 3))
+
+
+@when(parsers.parse("migrations are applied where version {version:d} fails"))
+def apply_failing(context, version):
+    """Apply migrations until one raises."""
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(context["conn"], recording_migrations(context, version))
+
+
+@when("the migrations are applied again without the failure")
+def apply_again(context):
+    """Apply the same migrations without the failure."""
+    migrate(context["conn"], recording_migrations(context))
+
+
+@then(parsers.parse("the schema version should be {version:d}"))
+def verify_version(context, version):
+    """Verify the recorded schema version."""
+    assert get_schema_version(context["conn"]) == version
+
+
+@then("each migration should have run once")
+def verify_runs(context):
+    """Verify no migration ran twice and the failed one left nothing behind."""
+    assert context["runs"] == [1, 2, 3]
@@ -0,0 +1,83 @@
+"""Test full-text search functionality."""
+
+import json
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+# Import test scenarios from the feature file
+scenarios('./features/search.feature')
+
+
+def make_note(topic):
+    """Build note data for a note about a topic."""
+    return {
+        "path": f"{topic}.md",
+        "title": topic,
+        "tags": json.dumps([topic]),
+        "content": f"Some notes about {topic}. More detail on {topic} follows.",
+    }
+
+
+@given(parsers.parse('indexed notes about "{first}" and "{second}"'))
+def indexed_notes(database, first, second):
+    """Index two notes one at a time."""
+    for topic in (first, second):
+        assert database.insert_or_update_note(make_note(topic))
+
+
+@given(parsers.parse('notes about "{first}" and "{second}" written without updating the search index'))
+def bulk_written_notes(database, first, second):
+    """Bulk write two notes while deferring the search index."""
+    notes = [make_note(first), make_note(second)]
+    assert database.bulk_insert_or_update_notes(notes, update_search_index=False) == 2
+    assert database.search(second) == []
+
+
+@when(parsers.parse('I search for "{query}"'), target_fixture="results")
+def search(database, query):
+    """Run a full-text search."""
+    return database.search(query)
+
+
+@when(parsers.parse('the note "{path}" is rewritten to be about "{topic}"'))
+def rewrite_note(database, path, topic):
+    """Update a note's content."""
+    note = make_note(topic)
+    note["path"] = path
+    assert database.insert_or_update_note(note)
+
+
+@when(parsers.parse('the note "{path}" is deleted'))
+def delete_note(database, path):
+    """Delete a note."""
+    assert database.delete_note(path)
+
+
+@when("the search index is rebuilt")
+def rebuild_index(database):
+    """Rebuild the full-text index from the notes table."""
+    assert database.rebuild_search_index()
+
+
+@then(parsers.parse('the first result should be "{path}"'))
+def verify_first_result(results, path):
+    """Verify the best match."""
+    assert results[0]["path"] == path
+
+
+@then(parsers.parse('its snippet should highlight "{term}"'))
+def verify_snippet(results, term):
+    """Verify the snippet marks the matched term."""
+    assert f"[{term}]" in results[0]["snippet"]
+
+
+@then(parsers.parse('searching for "{query}" should return nothing'))
+def verify_no_results(database, query):
+    """Verify a query matches no note."""
+    assert database.search(query) == []
+
+
+@then(parsers.parse('searching for "{query}" should return "{path}"'))
+def verify_single_result(database, query, path):
+    """Verify a query matches exactly one note."""
+    assert [result["path"] for result in database.search(query)] == [path]
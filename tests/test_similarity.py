@@ -0,0 +1,106 @@
+"""Test similarity search over hashed TF-IDF note vectors."""
+
+import os
+
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from obsidian_index_service.db.database import Database
+from obsidian_index_service.db.vectors import vector_file_path
+
+# Similarity search is optional and needs NumPy
+pytest.importorskip("numpy")
+
+# Import test scenarios from the feature file
+scenarios('./features/similarity.feature')
+
+NOTES = {
+    "databases/sqlite.md": "SQLite keeps a write ahead log and checkpoints it into the database file",
+    "databases/postgres.md": "Postgres ships its write ahead log to standby database servers",
+    "garden/tomatoes.md": "Tomatoes need compost, sunny soil and regular watering",
+    "garden/basil.md": "Basil grows well next to tomatoes in warm soil",
+}
+
+
+@pytest.fixture
+def context(database):
+    """Hold the database, which a scenario may reopen."""
+    context = {"db": database}
+    yield context
+    if context["db"] is not database:
+        context["db"].close()
+
+
+def index_note(vault_path, note_processor, db, path, content):
+    """Write a note to the vault and index it."""
+    note_path = vault_path / path
+    note_path.parent.mkdir(parents=True, exist_ok=True)
+    note_path.write_text(content)
+    assert db.insert_or_update_note(note_processor.process_file(note_path))
+
+
+@given('the notes about databases and gardening')
+def topic_notes(vault_path, note_processor, context):
+    """Index two notes on each of two unrelated topics."""
+    for path, content in NOTES.items():
+        index_note(vault_path, note_processor, context["db"], path, content)
+
+
+@when(parsers.parse('"{path}" is rewritten as "{content}"'))
+@when(parsers.parse('a note "{path}" is added with content "{content}"'))
+def write_note(vault_path, note_processor, context, path, content):
+    """Write and reindex a note."""
+    index_note(vault_path, note_processor, context["db"], path, content)
+
+
+@when(parsers.parse('"{old_folder}" is moved to "{new_folder}" as a folder'))
+def move_folder(context, old_folder, new_folder):
+    """Move every note below a folder."""
+    assert context["db"].move_folder(old_folder, new_folder)
+
+
+@when(parsers.parse('"{path}" is deleted'))
+def delete_note(context, path):
+    """Delete a note from the index."""
+    assert context["db"].delete_note(path)
+
+
+@when('the vector file is deleted and the database is reopened')
+def reopen_without_vectors(context, db_path):
+    """Remove the vector matrix and open the database again."""
+    context["db"].close()
+    os.remove(vector_file_path(db_path))
+    context["db"] = Database(db_path)
+
+
+@then(parsers.parse('the notes similar to "{path}" should start with "{expected}"'))
+def verify_similar_notes(context, path, expected):
+    """Verify the best match for an indexed note."""
+    results = context["db"].similar_notes(path, 3)
+    assert results and results[0]["path"] == expected
+    assert all(0 < result["score"] <= 1 for result in results)
+
+
+@then(parsers.parse('the notes similar to "{path}" should not include "{excluded}"'))
+def verify_excluded(context, path, excluded):
+    """Verify a note is left out of its own results."""
+    assert excluded not in [result["path"] for result in context["db"].similar_notes(path)]
+
+
+@then(parsers.parse('the notes similar to the text "{text}" should start with "{expected}"'))
+def verify_similar_to_text(context, text, expected):
+    """Verify the best match for free text."""
+    assert context["db"].similar_to_text(text, 3)[0]["path"] == expected
+
+
+@then(parsers.parse('no note should be similar to the text "{text}"'))
+def verify_no_match(context, text):
+    """Verify that text sharing no words with any note matches nothing."""
+    assert context["db"].similar_to_text(text) == []
+
+
+@then(parsers.parse('the vector matrix should have {count:d} rows in use'))
+def verify_rows(context, count):
+    """Verify that rows of deleted notes are reused rather than appended."""
+    conn = context["db"].connection.conn
+    assert tuple(conn.execute('SELECT COUNT(*), MAX(row) FROM note_vectors').fetchone()) == (count, count)
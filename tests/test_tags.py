@@ -0,0 +1,55 @@
+"""Test the normalized tag index."""
+
+import json
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+# Import test scenarios from the feature file
+scenarios('./features/tags.feature')
+
+
+def split_list(text):
+    """Split a comma-separated step argument."""
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+@given(parsers.parse('a note "{path}" tagged "{tags}"'))
+@when(parsers.parse('"{path}" is retagged "{tags}"'))
+def tagged_note(database, path, tags):
+    """Index a note with the given tags."""
+    note = {"path": path, "title": path[:-3], "tags": json.dumps(split_list(tags))}
+    assert database.insert_or_update_note(note)
+
+
+@when(parsers.parse('"{path}" is deleted'))
+def delete_note(database, path):
+    """Delete a note."""
+    assert database.delete_note(path)
+
+
+@then(parsers.parse('notes tagged "{tag}" should be "{paths}"'))
+def verify_tag_lookup(database, tag, paths):
+    """Verify an exact tag lookup."""
+    assert database.get_notes_by_tag(tag) == split_list(paths)
+
+
+@then(parsers.parse('notes under tag "{prefix}" should be "{paths}"'))
+def verify_prefix_lookup(database, prefix, paths):
+    """Verify a nested tag lookup."""
+    assert database.get_notes_by_tag_prefix(prefix) == split_list(paths)
+
+
+@then(parsers.parse('the tag counts should be "{counts}"'))
+def verify_tag_counts(database, counts):
+    """Verify the per-tag note counts."""
+    expected = {}
+    for item in split_list(counts):
+        tag, count = item.split("=")
+        expected[tag] = int(count)
+    assert database.get_tag_counts() == expected
+
+
+@then(parsers.parse('no notes should be tagged "{tag}"'))
+def verify_tag_unused(database, tag):
+    """Verify no note carries a tag."""
+    assert database.get_notes_by_tag(tag) == []
@@ -0,0 +1,180 @@
+"""Test vault scanning functionality."""
+
+import os
+import pytest
+from pytest_bdd import scenarios, given, when, then, parsers
+
+from obsidian_index_service.db.database import Database
+from obsidian_index_service.file_watcher.scanner import VaultScanner
+from obsidian_index_service.note_processor.ignore import DEFAULT_IGNORE_PATTERNS, IgnoreMatcher
+from obsidian_index_service.note_processor.processor import NoteProcessor
+
+# Import test scenarios from the feature file
+scenarios('./features/vault_scanning.feature')
+
+
+@given(parsers.parse("a vault with {count:d} notes"), target_fixture="note_paths")
+def vault_with_notes(vault_path, count):
+    """Create a number of simple notes in the vault."""
+    note_paths = []
+    for i in range(1, count + 1):
+        note_path = vault_path / f"note_{i}.md"
+        note_path.write_text(f"---\ntags: [scan]\n---\n\n# Note {i}\n\nOriginal content {i}.\n")
+        note_paths.append(note_path)
+    return note_paths
+
+
+@given("the vault has been scanned once")
+def initial_scan(vault_scanner):
+    """Run the initial scan so every note has a stored fingerprint."""
+    vault_scanner.scan_existing_files()
+
+
+@when(parsers.parse("note {number:d} is modified"))
+def modify_note(note_paths, number):
+    """Rewrite a note and move its mtime forward so the change is detectable."""
+    note_path = note_paths[number - 1]
+    note_path.write_text(f"# Note {number}\n\nUpdated content {number}.\n")
+    stats = note_path.stat()
+    os.utime(note_path, ns=(stats.st_atime_ns, stats.st_mtime_ns + 1_000_000_000))
+
+
+@when("the vault is scanned again", target_fixture="scan_result")
+def rescan(vault_scanner):
+    """Scan the vault a second time."""
+    return vault_scanner.scan_existing_files()
+
+
+@then(parsers.parse("{count:d} files should be skipped"))
+def verify_skipped(scan_result, count):
+    """Verify the number of unchanged files the scan skipped."""
+    assert scan_result[3] == count
+
+
+@then(parsers.parse("{count:d} files should be parsed"))
+def verify_parsed(scan_result, count):
+    """Verify the number of files the scan parsed."""
+    assert scan_result[4] == count
+
+
+@then(parsers.parse("the stored content of note {number:d} should be updated"))
+def verify_updated_content(database, number):
+    """Verify the modified note was rewritten in the database."""
+    notes = {note['path']: note for note in database.get_all_notes()}
+    assert f"Updated content {number}." in notes[f"note_{number}.md"]['content']
+
+
+@given(parsers.parse("a scanner with a batch size of {batch_size:d}"))
+def small_batch_scanner(vault_scanner, batch_size):
+    """Shrink the scanner batch size so several batches are written."""
+    vault_scanner.batch_size = batch_size
+
+
+@then(parsers.parse("{count:d} notes should be stored in the database"))
+def verify_note_count(database, scan_result, count):
+    """Verify every note was written."""
+    assert scan_result[0] == count
+    assert len(database.get_all_notes()) == count
+
+
+@given("an invalid markdown file in the vault")
+def invalid_note(vault_path):
+    """Create a note that isn't valid UTF-8 so processing it fails."""
+    (vault_path / "invalid_note.md").write_bytes(b"\xff\xfe\x00 not utf-8\n")
+
+
+@given(parsers.parse("a scanner with {workers:d} workers"))
+def parallel_scanner(vault_scanner, workers):
+    """Configure the scanner to parse in worker processes with small chunks."""
+    vault_scanner.workers = workers
+    vault_scanner.chunk_size = 16
+
+
+@then("the stored notes should match a serial scan")
+def verify_matches_serial(database, note_processor, temp_dir):
+    """Scan the same vault serially into a second database and compare rows."""
+    serial_db = Database(str(temp_dir / "serial.db"))
+    try:
+        VaultScanner(note_processor, serial_db).scan_existing_files()
+        parallel_notes = sorted(database.get_all_notes(), key=lambda note: note['path'])
+        serial_notes = sorted(serial_db.get_all_notes(), key=lambda note: note['path'])
+    finally:
+        serial_db.close()
+
+    strip = lambda note: {k: v for k, v in note.items() if k != 'last_indexed'}
+    assert len(parallel_notes) == 151
+    assert [strip(note) for note in parallel_notes] == [strip(note) for note in serial_notes]
+    assert any(note['status'] == 'error' for note in parallel_notes)
+
+
+@given(parsers.parse('notes inside "{first}", "{second}" and "{third}"'))
+def notes_in_folders(vault_path, first, second, third):
+    """Create notes in folders that the ignore rules should prune."""
+    for folder in (first, second, third):
+        (vault_path / folder / "nested").mkdir(parents=True)
+        (vault_path / folder / "nested" / "hidden.md").write_text("Hidden\n")
+    (vault_path / "scratch.tmp.md").write_text("Scratch\n")
+
+
+@given(parsers.parse('a scanner ignoring "{folder}" and "{pattern}"'))
+def ignoring_scanner(vault_scanner, vault_path, folder, pattern):
+    """Give the scanner a note processor with extra ignore patterns."""
+    vault_scanner.note_processor = NoteProcessor(
+        str(vault_path), DEFAULT_IGNORE_PATTERNS + [folder, pattern]
+    )
+
+
+@given(parsers.parse('the ignore patterns "{patterns}"'), target_fixture="ignore_matcher")
+def ignore_matcher(patterns):
+    """Compile semicolon-separated ignore patterns."""
+    return IgnoreMatcher([pattern.strip() for pattern in patterns.split(";")])
+
+
+@then(parsers.parse('"{path}" should be ignored'))
+def verify_ignored(ignore_matcher, path):
+    """Verify the patterns exclude a path."""
+    assert ignore_matcher.is_ignored(path)
+
+
+@then(parsers.parse('"{path}" should not be ignored'))
+def verify_not_ignored(ignore_matcher, path):
+    """Verify the patterns keep a path."""
+    assert not ignore_matcher.is_ignored(path)
+
+
+@when(parsers.parse("note {number:d} is deleted from disk"))
+def delete_note_file(note_paths, number):
+    """Delete a note file without the watcher seeing it."""
+    note_paths[number - 1].unlink()
+
+
+@when(parsers.parse('note {number:d} is renamed to "{name}" on disk'))
+def rename_note_file(note_paths, number, name):
+    """Rename a note file without the watcher seeing it."""
+    note_path = note_paths[number - 1]
+    note_path.rename(note_path.with_name(name))
+
+
+@when("every note is deleted from disk")
+def delete_every_note(note_paths):
+    """Empty the vault."""
+    for note_path in note_paths:
+        note_path.unlink()
+
+
+@then(parsers.parse('the removed paths should be "{paths}"'))
+def verify_removed(vault_scanner, paths):
+    """Verify the notes reconciliation removed."""
+    assert vault_scanner.removed_paths == paths.split(", ")
+
+
+@then("no paths should have been removed")
+def verify_nothing_removed(vault_scanner):
+    """Verify reconciliation left the index alone."""
+    assert vault_scanner.removed_paths == []
+
+
+@then(parsers.parse('the stored paths should be "{paths}"'))
+def verify_stored_paths(database, paths):
+    """Verify the paths left in the index."""
+    assert sorted(database.get_indexed_paths()) == paths.split(", ")